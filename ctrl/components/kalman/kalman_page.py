@@ -17,6 +17,8 @@ class KalmanPage(ttk.Frame):
         on_time_unit_changed: Callable[[], None],
         on_span_selected: Callable[[str, int, int], None],
         on_tuning_changed: Callable[[], None],
+        on_auto_tune: Callable[[], None] | None = None,
+        on_auto_spans: Callable[[], None] | None = None,
     ):
         super().__init__(parent, padding=0)
 
@@ -35,5 +37,7 @@ class KalmanPage(ttk.Frame):
             on_time_unit_changed=on_time_unit_changed,
             on_span_selected=on_span_selected,
             on_tuning_changed=on_tuning_changed,
+            on_auto_tune=on_auto_tune,
+            on_auto_spans=on_auto_spans,
         )
         self.view.pack(side=tk.TOP, fill=tk.BOTH, expand=True)
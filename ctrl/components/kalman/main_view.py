@@ -20,6 +20,8 @@ class MainView(ttk.Frame):
         on_time_unit_changed: Callable[[], None],
         on_span_selected: Callable[[str, int, int], None],
         on_tuning_changed: Callable[[], None],
+        on_auto_tune: Callable[[], None] | None = None,
+        on_auto_spans: Callable[[], None] | None = None,
     ):
         super().__init__(parent, padding=0)
 
@@ -32,6 +34,7 @@ class MainView(ttk.Frame):
             on_load_csv=on_load_csv,
             on_export_json=on_export_json,
             on_time_unit_changed=on_time_unit_changed,
+            on_auto_spans=on_auto_spans,
             time_unit_var=self.time_unit_var,
             active_span_var=self.active_span_var,
         )
@@ -66,7 +69,7 @@ class MainView(ttk.Frame):
         self.panes.add(self.results_container, weight=1)
 
         # Right
-        self.tuning_controls = TuningControlsPanel(self, on_change=on_tuning_changed)
+        self.tuning_controls = TuningControlsPanel(self, on_change=on_tuning_changed, on_auto_tune=on_auto_tune)
         self.tuning_controls.grid(row=1, column=1, sticky="nsew", padx=(0, 8), pady=8)
 
         self.after(50, self._set_initial_sash)
@@ -1,5 +1,6 @@
 from __future__ import annotations
 
+import tempfile
 import tkinter as tk
 from tkinter import ttk
 from typing import Callable, Optional, Tuple
@@ -7,7 +8,7 @@ from typing import Callable, Optional, Tuple
 import matplotlib
 
 from ctrl.models import KalmanRunConfig
-from ctrl.services import run_procedural_kalman
+from ctrl.services import ArrayLRUCache, min_max_decimate, run_chunked_kalman, run_steady_state_kalman
 
 matplotlib.use("TkAgg")
 from matplotlib.figure import Figure
@@ -15,10 +16,22 @@ from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg, NavigationToolb
 from matplotlib.widgets import SpanSelector
 import numpy as np
 
+# Longer traces are drawn min/max-decimated, re-decimated on zoom/pan.
+_MAX_PLOT_POINTS = 200_000
+_PLOT_BUCKETS = 2000
+# Longer traces get their Kalman overlay written to temp-file memmaps.
+_OVERLAY_MEMMAP_SAMPLES = 1 << 24
 
 
 class PlotPanel(ttk.Frame):
-    def __init__(self, parent, *, on_span_selected: Callable[[str, int, int], None], active_span_var: tk.StringVar):
+    def __init__(
+        self,
+        parent,
+        *,
+        on_span_selected: Callable[[str, int, int], None],
+        active_span_var: tk.StringVar,
+        kalman_cache_bytes: int = 256 * 1024 * 1024,
+    ):
         super().__init__(parent, padding=8)
 
         self._on_span_selected = on_span_selected
@@ -32,6 +45,18 @@ class PlotPanel(ttk.Frame):
         self._kalman_cfg: Optional[KalmanRunConfig] = None
         self._show_kalman: bool = True
 
+        # Kalman overlays keyed on (series version, cfg); set_series bumps the
+        # version and drops the previous signal's entries.
+        self._series_version = 0
+        self._kalman_cache = ArrayLRUCache(max_bytes=kalman_cache_bytes)
+        # Memmap-backed overlays count as 0 resident bytes, so the cache would
+        # never evict them; only the latest one is kept.
+        self._mapped_key: Optional[tuple] = None
+
+        # (line, y) pairs redrawn from the visible range when decimating
+        self._decimated_lines: list = []
+        self._xlim_cid: Optional[int] = None
+
         self.fig = Figure(figsize=(11.5, 7.5), dpi=100)
         self.ax_full = self.fig.add_subplot(1, 1, 1)
 
@@ -55,6 +80,9 @@ class PlotPanel(ttk.Frame):
     def set_series(self, t: np.ndarray, x: np.ndarray) -> None:
         self._t = t
         self._x = x
+        self._series_version += 1
+        self._kalman_cache.clear()
+        self._mapped_key = None
         self.redraw()
 
     def set_spans(self, steady_span: Optional[Tuple[int, int]], ramp_span: Optional[Tuple[int, int]]) -> None:
@@ -82,13 +110,49 @@ class PlotPanel(ttk.Frame):
         span_type = self._active_span_var.get().strip().lower()
         self._on_span_selected(span_type, a, b)
 
+    def _kalman_overlay(self, cfg: KalmanRunConfig) -> tuple[np.ndarray, np.ndarray]:
+        key = (self._series_version, cfg)
+        hit = self._kalman_cache.get(key)
+        if hit is not None:
+            return hit
+        if len(self._x) > _OVERLAY_MEMMAP_SAMPLES:
+            if self._mapped_key is not None:
+                # dropping the last reference closes and frees its temp files
+                self._kalman_cache.pop(self._mapped_key)
+            self._mapped_key = key
+            n = len(self._x)
+            out = tuple(np.memmap(tempfile.TemporaryFile(), dtype=float, mode="w+", shape=(n,)) for _ in range(2))
+            return self._kalman_cache.put(key, run_chunked_kalman(self._t, self._x, cfg, out=out))
+        return self._kalman_cache.put(key, run_steady_state_kalman(self._t, self._x, cfg))
+
+    def _plot_series(self, y: np.ndarray, **kwargs) -> None:
+        if len(y) <= _MAX_PLOT_POINTS:
+            self.ax_full.plot(self._t, y, **kwargs)
+            return
+        (line,) = self.ax_full.plot(*min_max_decimate(self._t, y, buckets=_PLOT_BUCKETS), **kwargs)
+        self._decimated_lines.append((line, y))
+
+    def _on_xlim_changed(self, ax) -> None:
+        if not self._decimated_lines or self._t is None:
+            return
+        lo, hi = ax.get_xlim()
+        a = max(int(np.searchsorted(self._t, lo, side="left")) - 1, 0)
+        b = int(np.searchsorted(self._t, hi, side="right")) + 1
+        for line, y in self._decimated_lines:
+            line.set_data(*min_max_decimate(self._t, y, a, b, buckets=_PLOT_BUCKETS))
+        self.canvas.draw_idle()
+
     def redraw(self) -> None:
         self._draw_full()
         self.canvas.draw_idle()
 
     def _draw_full(self) -> None:
+        if self._xlim_cid is not None:
+            self.ax_full.callbacks.disconnect(self._xlim_cid)
         self.ax_full.clear()
         self.ax_full.grid(True)
+        self._decimated_lines = []
+        self._xlim_cid = self.ax_full.callbacks.connect("xlim_changed", self._on_xlim_changed)
 
         if self._t is None or self._x is None:
             self.ax_full.set_title("Full signal (drag to select span)")
@@ -96,7 +160,7 @@ class PlotPanel(ttk.Frame):
             self.ax_full.set_ylabel("x")
             return
 
-        self.ax_full.plot(self._t, self._x, label="x (measured)")
+        self._plot_series(self._x, label="x (measured)")
 
         # spans
         if self._steady_span is not None:
@@ -108,8 +172,8 @@ class PlotPanel(ttk.Frame):
 
         # kalman overlay
         if self._show_kalman and self._kalman_cfg is not None:
-            y, y_dot = run_procedural_kalman(self._t, self._x, self._kalman_cfg)
-            self.ax_full.plot(self._t, y, label="kalman y (x̂)")
+            y, y_dot = self._kalman_overlay(self._kalman_cfg)
+            self._plot_series(y, label="kalman y (x̂)")
 
         self.ax_full.set_title("Signal + spans + procedural Kalman overlay")
         self.ax_full.set_xlabel("time (s)")
@@ -12,6 +12,7 @@ class ToolbarPanel(ttk.Frame):
         on_load_csv,
         on_export_json,
         on_time_unit_changed,
+        on_auto_spans=None,
         time_unit_var: tk.StringVar,
         active_span_var: tk.StringVar,
     ):
@@ -36,5 +37,7 @@ class ToolbarPanel(ttk.Frame):
         ttk.Label(mid2, text="Selecting:").pack(side=tk.LEFT, padx=(0, 6))
         ttk.Radiobutton(mid2, text="STEADY", value="steady", variable=active_span_var).pack(side=tk.LEFT)
         ttk.Radiobutton(mid2, text="RAMP", value="ramp", variable=active_span_var).pack(side=tk.LEFT)
+        if on_auto_spans is not None:
+            ttk.Button(mid2, text="Auto spans", command=on_auto_spans).pack(side=tk.LEFT, padx=(10, 0))
 
         ttk.Button(right, text="Export…", command=on_export_json).pack(side=tk.RIGHT)
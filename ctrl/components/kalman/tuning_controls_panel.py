@@ -4,10 +4,11 @@ import tkinter as tk
 from tkinter import ttk
 
 class TuningControlsPanel(ttk.LabelFrame):
-    def __init__(self, parent, *, on_change):
+    def __init__(self, parent, *, on_change, on_auto_tune=None):
         super().__init__(parent, text="Tuning Controls (Auto vs Manual)", padding=8)
 
         self._on_change = on_change
+        self._on_auto_tune = on_auto_tune
 
         self.use_r = tk.BooleanVar(value=False)
         self.use_qx = tk.BooleanVar(value=False)
@@ -19,6 +20,8 @@ class TuningControlsPanel(ttk.LabelFrame):
         grid = ttk.Frame(self)
         grid.pack(fill="x", expand=True)
 
+        self._syncs = []
+
         def row(i, label, use_var, val_var):
             cb = ttk.Checkbutton(
                 grid, text=f"Manual {label}", variable=use_var, command=lambda: (sync(), self._on_change())
@@ -32,6 +35,7 @@ class TuningControlsPanel(ttk.LabelFrame):
                 e.state(["!disabled"] if use_var.get() else ["disabled"])
 
             sync()
+            self._syncs.append(sync)
             e.bind("<Return>", lambda _e: self._on_change())
             e.bind("<FocusOut>", lambda _e: self._on_change())
 
@@ -41,6 +45,11 @@ class TuningControlsPanel(ttk.LabelFrame):
 
         self._btn_map = ttk.Button(grid, text="Set q_x = q_x_dot * dt²", command=self._on_map_qx)
         self._btn_map.grid(row=3, column=0, columnspan=2, sticky="w", pady=(8, 0))
+
+        if on_auto_tune is not None:
+            self._btn_auto = ttk.Button(grid, text="Auto-tune (max likelihood)", command=on_auto_tune)
+            self._btn_auto.grid(row=4, column=0, columnspan=2, sticky="w", pady=(4, 0))
+
         self._dt_s = None
 
     def set_dt(self, dt_s: float | None) -> None:
@@ -67,6 +76,16 @@ class TuningControlsPanel(ttk.LabelFrame):
             "manual_q_x_dot": self.q_x_dot.get(),
         }
 
+    def set_manual(self, *, r_x: float, q_x: float, q_x_dot: float) -> None:
+        self.r_x.set(f"{r_x:.9g}")
+        self.q_x.set(f"{q_x:.9g}")
+        self.q_x_dot.set(f"{q_x_dot:.9g}")
+        self.use_r.set(True)
+        self.use_qx.set(True)
+        self.use_qxd.set(True)
+        for sync in self._syncs:
+            sync()
+
     def set_suggested(self, *, r_x: float | None, q_x: float | None, q_x_dot: float | None):
         if not self.use_r.get() and r_x is not None:
             self.r_x.set(f"{r_x:.9g}")
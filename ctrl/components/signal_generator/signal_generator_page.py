@@ -13,7 +13,10 @@ from matplotlib.figure import Figure
 from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
 
 from ctrl.models import RampHoldProfile
-from ctrl.services import generate_signal_csv
+from ctrl.services import generate_signal_csv, signal_preview
+
+# The preview plots this many leading samples of the file.
+_PREVIEW_MAX_SAMPLES = 100_000
 
 
 class SignalGeneratorPage(ttk.Frame):
@@ -268,52 +271,28 @@ class SignalGeneratorPage(ttk.Frame):
             T_HOLD_LO_MS=int(self.t_hold_lo.get()),
         )
 
-    @staticmethod
-    def _ramp_hold_value(profile: RampHoldProfile, t_ms: int) -> float:
-        period = profile.T_UP_MS + profile.T_HOLD_HI_MS + profile.T_DOWN_MS + profile.T_HOLD_LO_MS
-        u = t_ms % period
-
-        if u < profile.T_UP_MS:
-            frac = u / max(profile.T_UP_MS, 1)
-            return profile.X_LO + frac * (profile.X_HI - profile.X_LO)
-
-        u -= profile.T_UP_MS
-        if u < profile.T_HOLD_HI_MS:
-            return profile.X_HI
-
-        u -= profile.T_HOLD_HI_MS
-        if u < profile.T_DOWN_MS:
-            frac = u / max(profile.T_DOWN_MS, 1)
-            return profile.X_HI - frac * (profile.X_HI - profile.X_LO)
-
-        return profile.X_LO
-
     def _preview_series(self) -> tuple[np.ndarray, np.ndarray]:
         dt_ms = int(self.dt_ms.get())
         seconds = int(self.seconds.get())
-        noise_amp = float(self.noise_amp.get())
-        rng_seed = int(self.rng_seed.get())
 
         if dt_ms <= 0:
             raise ValueError("DT_MS must be > 0")
         if seconds <= 0:
             raise ValueError("SECONDS must be > 0")
 
-        profile = self._build_profile()
-
         n = int((seconds * 1000) / dt_ms)
         if n <= 1:
             raise ValueError("SECONDS must be long enough for at least 2 samples.")
 
-        t_ms = np.arange(n) * dt_ms
-        t = (t_ms / 1000.0) if self.time_unit_seconds.get() else t_ms.astype(float)
-
-        sigma = noise_amp / 3.0
-        rng = np.random.default_rng(rng_seed)
-
-        x_true = np.array([self._ramp_hold_value(profile, int(tm)) for tm in t_ms], dtype=float)
-        x = x_true + rng.normal(0.0, sigma, size=n)
-        return t, x
+        return signal_preview(
+            dt_ms=dt_ms,
+            seconds=seconds,
+            profile=self._build_profile(),
+            noise_amp=float(self.noise_amp.get()),
+            rng_seed=int(self.rng_seed.get()),
+            time_unit_seconds=bool(self.time_unit_seconds.get()),
+            max_samples=_PREVIEW_MAX_SAMPLES,
+        )
 
 
     # UI actions
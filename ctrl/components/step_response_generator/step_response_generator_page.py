@@ -7,7 +7,7 @@ from typing import Callable
 import matplotlib
 
 from ctrl.models import SOPDTUnderdampedParams, IPDTParams, FOPDTParams, ActuatorParams, StepSpec
-from ctrl.services import export_step_csv, simulate_step_response
+from ctrl.services import ArrayLRUCache, export_step_csv, simulate_step_response
 
 matplotlib.use("TkAgg")
 from matplotlib.figure import Figure
@@ -17,11 +17,16 @@ from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
 
 
 class StepResponsePage(ttk.Frame):
-    def __init__(self, parent, *, on_back: Callable[[], None]):
+    def __init__(self, parent, *, on_back: Callable[[], None], sim_cache_bytes: int = 64 * 1024 * 1024):
         super().__init__(parent, padding=0)
         self._preview_job: str | None = None
         self._suppress_preview = False
 
+        # Simulations keyed on the frozen (spec, actuator, model, params), so
+        # edits that do not change them (file name, time unit) and exports of
+        # the previewed configuration reuse the arrays.
+        self._sim_cache = ArrayLRUCache(max_bytes=sim_cache_bytes)
+
         self._setup_style()
 
         # Header
@@ -352,31 +357,32 @@ class StepResponsePage(ttk.Frame):
         m = self.model.get()
 
         if m == "FOPDT":
-            p = FOPDTParams(
+            params = {"fopdt": FOPDTParams(
                 K=float(self.f_k.get()),
                 tau_s=float(self.f_tau.get()),
                 theta_s=float(self.f_theta.get()),
-            )
-            return simulate_step_response(spec=spec, actuator=actuator, model="FOPDT", fopdt=p)
-
-        if m == "IPDT":
-            i = IPDTParams(
+            )}
+        elif m == "IPDT":
+            params = {"ipdt": IPDTParams(
                 K=float(self.i_k.get()),
                 theta_s=float(self.i_theta.get()),
                 leak_tau_s=float(self.i_leak_tau.get()),
-            )
-            return simulate_step_response(spec=spec, actuator=actuator, model="IPDT", ipdt=i)
-
-        if m == "SOPDT_UNDERDAMPED":
-            p = SOPDTUnderdampedParams(
+            )}
+        elif m == "SOPDT_UNDERDAMPED":
+            params = {"sopdt": SOPDTUnderdampedParams(
                 K=float(self.s_k.get()),
                 zeta=float(self.s_zeta.get()),
                 wn=float(self.s_wn.get()),
                 theta_s=float(self.s_theta.get()),
-            )
-            return simulate_step_response(spec=spec, actuator=actuator, model="SOPDT_UNDERDAMPED", sopdt=p)
-
-        raise ValueError(f"Unknown model: {m}")
+            )}
+        else:
+            raise ValueError(f"Unknown model: {m}")
+
+        key = (spec, actuator, m, *params.values())
+        hit = self._sim_cache.get(key)
+        if hit is not None:
+            return hit
+        return self._sim_cache.put(key, simulate_step_response(spec=spec, actuator=actuator, model=m, **params))
 
 
     # Plot + actions
@@ -1,7 +1,13 @@
 from .signal_models.span_selection_model import SpanSelections, SpanSelection
+from .signal_models.span_candidate_model import SpanCandidate
 from .signal_models.timeseries_model import TimeSeriesData
+from .signal_models.span_stats_index_model import SpanStatsIndex
+from .signal_models.multichannel_timeseries_model import MultiChannelTimeSeries
 from .signal_models.tuning_result_model import TuningResult
+from .signal_models.rolling_noise_stats_model import RollingNoiseStats
+from .signal_models.auto_tune_result_model import AutoTuneResult
 from .signal_models.kalman_run_config_model import KalmanRunConfig
+from .signal_models.kalman_filter_state_model import KalmanFilterState
 from .signal_models.tuning_overrides_model import TuningOverrides
 from .signal_models.ramp_hold_profile_model import RampHoldProfile
 from .step_response_models.selections_model import StepTuneSelections
@@ -11,14 +17,24 @@ from .step_response_models.ipdt_params_model import IPDTParams
 from .step_response_models.sopdt_params import SOPDTUnderdampedParams
 from .step_response_models.step_spec_model import StepSpec
 from .step_response_models.accuator_params_model import ActuatorParams
+from .step_response_models.step_response_ensemble_model import StepResponseEnsemble
+from .step_response_models.closed_loop_spec_model import ClosedLoopSpec
+from .step_response_models.closed_loop_result_model import ClosedLoopResult
+from .step_response_models.pacing_stats_model import PacingStats
 
 
 __all__ = [
     "SpanSelections",
     "SpanSelection",
+    "SpanCandidate",
     "TimeSeriesData",
+    "SpanStatsIndex",
+    "MultiChannelTimeSeries",
     "TuningResult",
+    "RollingNoiseStats",
+    "AutoTuneResult",
     "KalmanRunConfig",
+    "KalmanFilterState",
     "TuningOverrides",
     "RampHoldProfile",
     "StepTuneSelections",
@@ -28,4 +44,8 @@ __all__ = [
     "SOPDTUnderdampedParams",
     "StepSpec",
     "ActuatorParams",
+    "StepResponseEnsemble",
+    "ClosedLoopSpec",
+    "ClosedLoopResult",
+    "PacingStats",
 ]
\ No newline at end of file
@@ -0,0 +1,13 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+
+
+@dataclass(frozen=True)
+class AutoTuneResult:
+    r_x: float
+    q_x: float
+    q_x_dot: float
+
+    log_likelihood: float
+    evaluations: int
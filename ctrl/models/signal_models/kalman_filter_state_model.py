@@ -0,0 +1,19 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Optional
+
+
+@dataclass(frozen=True)
+class KalmanFilterState:
+    t_last: Optional[float] = None  # None until the first sample is seen
+
+    x_pred: float = 0.0
+    x_dot_pred: float = 0.0
+
+    P00: float = 1.0
+    P01: float = 0.0
+    P10: float = 0.0
+    P11: float = 10.0
+
+    n_seen: int = 0
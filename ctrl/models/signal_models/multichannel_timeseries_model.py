@@ -0,0 +1,26 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Tuple
+
+import numpy as np
+
+from .timeseries_model import TimeSeriesData
+
+
+@dataclass(frozen=True)
+class MultiChannelTimeSeries:
+    t: np.ndarray
+    X: np.ndarray  # (channels, samples); NaN where a channel has no reading
+    channels: Tuple[str, ...]
+    dt_s: float
+    source_path: str
+
+    def index(self, name: str) -> int:
+        try:
+            return self.channels.index(name)
+        except ValueError:
+            raise KeyError(f"Unknown channel: {name!r}") from None
+
+    def channel(self, name: str) -> TimeSeriesData:
+        return TimeSeriesData(t=self.t, x=self.X[self.index(name)], dt_s=self.dt_s, source_path=self.source_path)
@@ -0,0 +1,15 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+
+import numpy as np
+
+
+@dataclass(frozen=True)
+class RollingNoiseStats:
+    # Per-sample statistics of the window centred on each sample of t;
+    # nan where the window would run off either end or the sample is not finite.
+    t: np.ndarray
+    r_x: np.ndarray
+    q_x_dot: np.ndarray
+    window: int
@@ -0,0 +1,17 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+
+
+@dataclass(frozen=True)
+class SpanCandidate:
+    kind: str  # "steady" | "ramp"
+    a: int
+    b: int
+    score: float
+
+    slope_per_s: float
+    sigma_x: float
+
+    def as_tuple(self) -> tuple[int, int]:
+        return self.a, self.b
@@ -0,0 +1,100 @@
+from __future__ import annotations
+
+import numpy as np
+
+_EPS = float(np.finfo(float).eps)
+
+
+class SpanStatsIndex:
+    # Prefix sums over the finite samples of x (and their second differences)
+    # so the variance of any span [a, b) is O(1). Sums are taken about the
+    # global mean; a span whose estimated rounding error exceeds rtol of its
+    # result is recomputed directly from the slice.
+    #
+    # Non-finite samples are dropped before differencing, exactly like
+    # rx_from_steady_span / qx_dot_from_ramp_span_excel_like do per slice:
+    # the finite samples of x[a:b] are always the run xf[cnt[a]:cnt[b]].
+
+    def __init__(self, x: np.ndarray, *, rtol: float = 1e-9):
+        x = np.asarray(x, dtype=float)
+        finite = np.isfinite(x)
+        self.n = int(x.size)
+        self.rtol = float(rtol)
+        self._cnt = np.concatenate(([0], np.cumsum(finite, dtype=np.int64)))
+        self._xf = x[finite] if not finite.all() else x
+        self._x1, self._x2 = _prefix(self._xf)
+
+        dv = np.diff(self._xf, n=2) if self._xf.size >= 3 else np.empty(0)
+        dv_ok = np.isfinite(dv)
+        self._dv = dv
+        self._dv_bad = np.concatenate(([0], np.cumsum(~dv_ok, dtype=np.int64)))
+        self._d1, self._d2 = _prefix(dv, dv_ok)
+
+    def finite_count(self, a, b):
+        i0, i1 = self._bounds(a, b)
+        return _out(i1 - i0, int)
+
+    def steady_variance(self, a, b):
+        # Same contract as rx_from_steady_span: (var, sigma), nan below 3 samples.
+        i0, i1 = self._bounds(a, b)
+        var = self._variance(self._xf, self._x1, self._x2, i0, i1)
+        var = np.where(i1 - i0 >= 3, var, np.nan)
+        sigma = np.where(var >= 0, np.sqrt(np.abs(var)), np.nan)
+        return _out(var), _out(sigma)
+
+    def ramp_q_x_dot(self, a, b):
+        # Same contract as qx_dot_from_ramp_span_excel_like: (q_x_dot, dv_count).
+        i0, i1 = self._bounds(a, b)
+        m = i1 - i0
+        j0 = i0
+        j1 = np.maximum(i1 - 2, j0)
+        bad = self._dv_bad[j1] - self._dv_bad[j0]
+        count = np.where(m >= 4, (j1 - j0) - bad, 0)
+
+        q = self._variance(self._dv, self._d1, self._d2, j0, j1, skip=bad)
+        q = np.where((m >= 4) & (count >= 2), q, np.nan)
+        return _out(q), _out(count, int)
+
+    def _bounds(self, a, b):
+        a = np.clip(np.asarray(a, dtype=np.int64), 0, self.n)
+        b = np.clip(np.asarray(b, dtype=np.int64), 0, self.n)
+        b = np.maximum(a, b)
+        return self._cnt[a], self._cnt[b]
+
+    def _variance(self, v, p1, p2, i0, i1, *, skip=None):
+        n = (i1 - i0) - (0 if skip is None else skip)
+        nf = n.astype(float)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            s1 = p1[i1] - p1[i0]
+            s2 = p2[i1] - p2[i0]
+            m2 = s2 - s1 * s1 / nf
+            var = m2 / (nf - 1.0)
+
+            # Rounding in the running sums grows with the prefix magnitude,
+            # not the span's, so long offset traces can cancel badly.
+            err = 4.0 * _EPS * np.sqrt(i1 + 1.0) * (p2[i1] + p2[i0])
+            redo = (n >= 2) & ~(err <= self.rtol * np.abs(m2))
+
+        if np.any(redo):
+            var = np.array(var, dtype=float, copy=True)
+            for k in zip(*np.nonzero(redo)) if var.ndim else [()]:
+                seg = v[i0[k]:i1[k]]
+                var[k] = np.var(seg[np.isfinite(seg)], ddof=1)
+        return var
+
+
+def _prefix(v: np.ndarray, ok: np.ndarray | None = None):
+    if ok is not None and not ok.all():
+        c = float(np.mean(v[ok])) if ok.any() else 0.0
+        d = np.where(ok, v - c, 0.0)
+    else:
+        c = float(np.mean(v)) if v.size else 0.0
+        d = v - c
+    p1 = np.concatenate(([0.0], np.cumsum(d)))
+    p2 = np.concatenate(([0.0], np.cumsum(d * d)))
+    return p1, p2
+
+
+def _out(v, kind=float):
+    v = np.asarray(v)
+    return kind(v) if v.ndim == 0 else v.astype(kind)
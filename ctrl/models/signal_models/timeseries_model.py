@@ -1,12 +1,51 @@
 from __future__ import annotations
 
-from dataclasses import dataclass
+from dataclasses import dataclass, replace
+from functools import cached_property
+from typing import Optional
 import numpy as np
 
+from .span_stats_index_model import SpanStatsIndex
+
+# time-column units per second
+TIME_UNITS_PER_S = {"s": 1.0, "ms": 1000.0}
+
 
 @dataclass(frozen=True)
 class TimeSeriesData:
-    t: np.ndarray
+    t: np.ndarray  # seconds, whatever time_unit the file was read in
     x: np.ndarray
     dt_s: float
     source_path: str
+
+    # time column as read from the file, before conversion to seconds;
+    # None when only t was kept (load_csv_memmap)
+    t_raw: Optional[np.ndarray] = None
+    time_unit: str = "s"
+
+    @cached_property
+    def span_index(self) -> SpanStatsIndex:
+        # Built on first use; frozen only guards __setattr__, not the cache.
+        return SpanStatsIndex(self.x)
+
+    def with_time_unit(self, time_unit: str) -> "TimeSeriesData":
+        # Reinterpret the raw time column in another unit without touching x,
+        # so sample indices (and any spans over them) stay valid.
+        if time_unit not in TIME_UNITS_PER_S:
+            raise ValueError(f"time_unit must be one of {sorted(TIME_UNITS_PER_S)}")
+        if time_unit == self.time_unit:
+            return self
+
+        old = TIME_UNITS_PER_S[self.time_unit]
+        new = TIME_UNITS_PER_S[time_unit]
+        t_raw = self.t_raw if self.t_raw is not None else self.t * old
+        out = replace(
+            self,
+            t=t_raw if new == 1.0 else t_raw / new,
+            dt_s=self.dt_s * old / new,
+            t_raw=t_raw,
+            time_unit=time_unit,
+        )
+        if "span_index" in self.__dict__:
+            out.__dict__["span_index"] = self.span_index
+        return out
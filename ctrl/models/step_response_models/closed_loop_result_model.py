@@ -0,0 +1,28 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+
+import numpy as np
+
+
+@dataclass(frozen=True)
+class ClosedLoopResult:
+    # One row per gain set.
+    t: np.ndarray
+    sp: np.ndarray
+    pv: np.ndarray  # (gain_sets, samples)
+    cv: np.ndarray  # actuator output, (gain_sets, samples)
+
+    Kp: np.ndarray
+    Ki: np.ndarray
+    Kd: np.ndarray
+
+    iae: np.ndarray
+    overshoot_pct: np.ndarray
+    settling_time_s: np.ndarray  # inf if still outside the band at the end
+
+    def best(self, metric: str = "iae") -> int:
+        # row index of the lowest finite value of the metric
+        v = np.asarray(getattr(self, metric), dtype=float)
+        v = np.where(np.isfinite(v), v, np.inf)
+        return int(np.argmin(v))
@@ -0,0 +1,13 @@
+from dataclasses import dataclass
+
+
+@dataclass(frozen=True)
+class ClosedLoopSpec:
+    dt_s: float = 0.05
+    duration_s: float = 20.0
+    t_step_s: float = 1.0
+    sp_step: float = 10.0  # setpoint change, PV units
+    cv0: float = 0.0  # CV that holds the plant at rest
+
+    settle_band: float = 0.02  # fraction of |sp_step|
+    d_filter_n: float = 10.0  # derivative filter: Tf = Td / N
@@ -0,0 +1,18 @@
+from dataclasses import dataclass
+
+
+@dataclass(frozen=True)
+class PacingStats:
+    # Wall-clock pacing of a real-time run. "Late" is how far each scan
+    # started after its deadline; an overrun is a scan more than one period
+    # late.
+    scans: int
+    period_s: float
+
+    late_mean_s: float
+    late_std_s: float
+    late_max_s: float
+    overruns: int
+
+    exec_mean_s: float  # time spent inside a scan
+    exec_max_s: float
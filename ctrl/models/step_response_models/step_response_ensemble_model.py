@@ -0,0 +1,29 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Tuple
+
+import numpy as np
+
+
+@dataclass(frozen=True)
+class StepResponseEnsemble:
+    model: str
+    t: np.ndarray
+    cv_cmd: np.ndarray
+    cv_eff: np.ndarray
+
+    pv: np.ndarray  # (runs, samples)
+    percentiles: Tuple[float, ...]
+    pv_percentiles: np.ndarray  # (len(percentiles), samples)
+    pv_mean: np.ndarray
+
+    @property
+    def runs(self) -> int:
+        return int(self.pv.shape[0])
+
+    def envelope(self, q: float) -> np.ndarray:
+        try:
+            return self.pv_percentiles[self.percentiles.index(float(q))]
+        except ValueError:
+            raise KeyError(f"Percentile {q} was not computed") from None
@@ -1,18 +1,70 @@
 from .math_helpers import (
+    StreamingMoments,
+    StreamingSpanStats,
     sample_variance_excel,
     rx_from_steady_span,
     qx_dot_from_ramp_span_excel_like,
     median_dt_seconds,
+    rolling_variance,
+    linear_recursion,
+    linear_state_recursion,
 )
-from .csv_service import load_csv
+from .array_cache_service import ArrayLRUCache
+from .decimation_service import min_max_decimate
+from .csv_cache_service import CsvSidecarCache, default_csv_cache
+from .csv_service import load_csv, load_csv_channels, load_csv_memmap
 from .export_service import export_spans_json
-from .kalman_service import run_procedural_kalman
-from .tuning_service import compute_tuning
-from .signal_generator_service import generate_signal_csv
+from .kalman_service import (
+    run_procedural_kalman,
+    run_steady_state_kalman,
+    run_chunked_kalman,
+    steady_state_gain,
+    is_uniform_time_base,
+    run_batched_kalman,
+    as_kalman_configs,
+    run_multichannel_kalman,
+    StreamingKalmanFilter,
+    solve_steady_state_gain,
+)
+from .tuning_service import compute_tuning, compute_tuning_from_stats, span_stats_from_chunks
+from .span_detection_service import detect_span_candidates, suggest_spans
+from .rolling_noise_service import rolling_noise_stats
+from .kalman_autotune_service import auto_tune_kalman, steady_state_log_likelihood
+from .signal_generator_service import generate_signal_csv, signal_preview, ramp_hold_values
+from .signal_pipeline_service import (
+    SignalPipeline,
+    SignalStage,
+    RampHoldStage,
+    StepStage,
+    SineStage,
+    ChirpStage,
+    PRBSStage,
+    DriftStage,
+    NoiseStage,
+)
+from .signal_impairment_service import (
+    apply_stages,
+    AR1NoiseStage,
+    PinkNoiseStage,
+    QuantizeStage,
+    SampleHoldStage,
+    DropoutStage,
+    SpikeStage,
+    TimestampJitterStage,
+)
 from .step_response_generator_service import (
     simulate_step_response,
+    simulate_step_response_batch,
     export_step_csv,
 )
+from .closed_loop_service import simulate_closed_loop
+from .plant_simulator_service import PlantSimulator, run_paced, UdpPlantEndpoint
+from .batch_generation_service import (
+    expand_grid,
+    case_seeds,
+    generate_signal_batch,
+    generate_step_batch,
+)
 from .step_identification_service import (
     load_step_csv,
     auto_detect_step_index,
@@ -23,17 +75,72 @@ from .step_identification_service import (
 
 
 __all__ = [
+    "StreamingMoments",
+    "StreamingSpanStats",
     "sample_variance_excel",
     "rx_from_steady_span",
     "qx_dot_from_ramp_span_excel_like",
     "median_dt_seconds",
+    "rolling_variance",
+    "linear_recursion",
+    "linear_state_recursion",
+    "ArrayLRUCache",
+    "min_max_decimate",
+    "CsvSidecarCache",
+    "default_csv_cache",
     "load_csv",
+    "load_csv_channels",
+    "load_csv_memmap",
     "export_spans_json",
     "run_procedural_kalman",
+    "run_steady_state_kalman",
+    "run_chunked_kalman",
+    "steady_state_gain",
+    "is_uniform_time_base",
+    "run_batched_kalman",
+    "as_kalman_configs",
+    "run_multichannel_kalman",
+    "StreamingKalmanFilter",
+    "solve_steady_state_gain",
     "compute_tuning",
+    "compute_tuning_from_stats",
+    "span_stats_from_chunks",
+    "detect_span_candidates",
+    "suggest_spans",
+    "rolling_noise_stats",
+    "auto_tune_kalman",
+    "steady_state_log_likelihood",
     "generate_signal_csv",
+    "signal_preview",
+    "ramp_hold_values",
+    "SignalPipeline",
+    "SignalStage",
+    "RampHoldStage",
+    "StepStage",
+    "SineStage",
+    "ChirpStage",
+    "PRBSStage",
+    "DriftStage",
+    "NoiseStage",
+    "apply_stages",
+    "AR1NoiseStage",
+    "PinkNoiseStage",
+    "QuantizeStage",
+    "SampleHoldStage",
+    "DropoutStage",
+    "SpikeStage",
+    "TimestampJitterStage",
     "simulate_step_response",
+    "simulate_step_response_batch",
     "export_step_csv",
+    "simulate_closed_loop",
+    "PlantSimulator",
+    "run_paced",
+    "UdpPlantEndpoint",
+    "expand_grid",
+    "case_seeds",
+    "generate_signal_batch",
+    "generate_step_batch",
     "load_step_csv",
     "auto_detect_step_index",
     "auto_detect_deadtime_index",
@@ -0,0 +1,127 @@
+from __future__ import annotations
+
+import dataclasses
+import itertools
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Callable, Dict, List, Mapping, Optional, Sequence
+
+import numpy as np
+
+from .signal_generator_service import generate_signal_csv
+from .step_response_generator_service import export_step_csv, simulate_step_response
+
+Case = Mapping[str, Any]
+
+MANIFEST_NAME = "manifest.json"
+
+_SIGNAL_KEYS = {"dt_ms", "seconds", "profile", "noise_amp", "time_unit_seconds"}
+_STEP_KEYS = {"spec", "actuator", "model", "fopdt", "ipdt", "sopdt", "pv_noise", "time_unit_seconds"}
+
+
+def expand_grid(**axes: Sequence[Any]) -> List[Dict[str, Any]]:
+    # Cartesian product of the given parameter lists, last axis fastest:
+    # expand_grid(noise_amp=[1, 5], dt_ms=[10, 50]) -> 4 cases.
+    names = list(axes)
+    return [dict(zip(names, values)) for values in itertools.product(*(axes[k] for k in names))]
+
+
+def case_seeds(seed: int, n: int) -> List[int]:
+    # One independent 63-bit seed per case, spawned from SeedSequence(seed).
+    # Case i always gets the same seed, whatever the batch is split into.
+    children = np.random.SeedSequence(int(seed)).spawn(int(n))
+    return [int(c.generate_state(1, np.uint64)[0] >> np.uint64(1)) for c in children]
+
+
+def _jsonable(value: Any) -> Any:
+    if dataclasses.is_dataclass(value) and not isinstance(value, type):
+        return dataclasses.asdict(value)
+    if isinstance(value, np.generic):
+        return value.item()
+    return value
+
+
+def _signal_case(job) -> Dict[str, Any]:
+    i, case, seed, out_dir = job
+    name = f"signal_{i:05d}.csv"
+    generate_signal_csv(out_filename=name, out_dir=out_dir, rng_seed=seed, **case)
+    return {"file": name, "seed": seed, "params": {k: _jsonable(v) for k, v in case.items()}}
+
+
+def _step_case(job) -> Dict[str, Any]:
+    i, case, seed, out_dir = job
+    case = dict(case)
+    pv_noise = float(case.pop("pv_noise", 0.0))
+    time_unit_seconds = bool(case.pop("time_unit_seconds", True))
+
+    t, cv_cmd, pv, _ = simulate_step_response(**case)
+    if pv_noise > 0.0:
+        pv = pv + np.random.default_rng(seed).normal(0.0, pv_noise, size=pv.size)
+
+    name = f"step_{i:05d}.csv"
+    export_step_csv(out_filename=name, out_dir=out_dir, t=t, cv_cmd=cv_cmd, pv=pv,
+                    time_unit_seconds=time_unit_seconds)
+    params = {k: _jsonable(v) for k, v in case.items()}
+    params["pv_noise"] = pv_noise
+    params["time_unit_seconds"] = time_unit_seconds
+    return {"file": name, "seed": seed, "params": params}
+
+
+def _run_batch(
+    kind: str,
+    worker: Callable,
+    allowed: set,
+    out_dir: str,
+    cases: Sequence[Case],
+    seed: int,
+    workers: Optional[int],
+) -> str:
+    cases = [dict(c) for c in cases]
+    for i, case in enumerate(cases):
+        unknown = set(case) - allowed
+        if unknown:
+            raise ValueError(f"Case {i}: unknown {kind} parameters {sorted(unknown)}")
+
+    os.makedirs(out_dir, exist_ok=True)
+    seeds = case_seeds(seed, len(cases))
+    jobs = [(i, case, s, out_dir) for i, (case, s) in enumerate(zip(cases, seeds))]
+
+    if workers == 1 or len(jobs) <= 1:
+        entries = [worker(job) for job in jobs]
+    else:
+        n_workers = workers or os.cpu_count() or 1
+        chunk = max(1, len(jobs) // (4 * n_workers))
+        with ProcessPoolExecutor(max_workers=n_workers) as pool:
+            # map() keeps case order, so the manifest does not depend on scheduling
+            entries = list(pool.map(worker, jobs, chunksize=chunk))
+
+    manifest = {"kind": kind, "seed": int(seed), "count": len(entries), "cases": entries}
+    path = os.path.join(out_dir, MANIFEST_NAME)
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=2)
+    return path
+
+
+def generate_signal_batch(
+    out_dir: str,
+    cases: Sequence[Case],
+    *,
+    seed: int = 0,
+    workers: Optional[int] = None,
+) -> str:
+    # One generate_signal_csv file per case (keys: dt_ms, seconds, profile,
+    # noise_amp, time_unit_seconds) plus a manifest.json; returns its path.
+    return _run_batch("signal", _signal_case, _SIGNAL_KEYS, out_dir, cases, seed, workers)
+
+
+def generate_step_batch(
+    out_dir: str,
+    cases: Sequence[Case],
+    *,
+    seed: int = 0,
+    workers: Optional[int] = None,
+) -> str:
+    # One simulate_step_response file per case (its keyword arguments, plus
+    # optional Gaussian pv_noise sigma and time_unit_seconds) and a manifest.
+    return _run_batch("step", _step_case, _STEP_KEYS, out_dir, cases, seed, workers)
@@ -0,0 +1,180 @@
+from __future__ import annotations
+
+from typing import Mapping, Sequence, Tuple, Union
+
+import numpy as np
+
+from ctrl.models import (
+    ActuatorParams,
+    ClosedLoopResult,
+    ClosedLoopSpec,
+    FOPDTParams,
+    IPDTParams,
+    SOPDTUnderdampedParams,
+)
+
+from .step_response_generator_service import PVModelType, _zoh_mode, split_deadtime, zoh_state_space
+
+Gains = Union[Mapping[str, object], Sequence[Mapping[str, float]]]
+
+
+def _gain_columns(gains: Gains) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    # {"Kp": array, "Ki": ..., "Kd": ...} (scalars broadcast), or a list of
+    # compute_pid_gains-style dicts. Missing gains are zero.
+    names = ("Kp", "Ki", "Kd")
+    if isinstance(gains, Mapping):
+        raw = [gains.get(k, 0.0) for k in names]
+    else:
+        gains = list(gains)
+        raw = [[float(g.get(k, 0.0)) for g in gains] for k in names]
+    cols = np.broadcast_arrays(*(np.atleast_1d(np.asarray(v, dtype=float)) for v in raw))
+    if cols[0].ndim != 1 or cols[0].size == 0:
+        raise ValueError("Gains must broadcast to a non-empty 1-D batch")
+    return tuple(np.array(c) for c in cols)
+
+
+def discrete_plant(
+    model: PVModelType,
+    dt_s: float,
+    *,
+    fopdt: FOPDTParams | None = None,
+    ipdt: IPDTParams | None = None,
+    sopdt: SOPDTUnderdampedParams | None = None,
+):
+    # Exact ZOH plant as x[k+1] = Ad x[k] + b_cur u[k-m] + b_prev u[k-1-m],
+    # PV deviation y = x[0]; same discretization as simulate_step_response.
+    if model == "FOPDT":
+        p = fopdt or FOPDTParams()
+    elif model == "IPDT":
+        p = ipdt or IPDTParams()
+    elif model == "SOPDT_UNDERDAMPED":
+        p = sopdt or SOPDTUnderdampedParams()
+    else:
+        raise ValueError(f"Unknown model: {model}")
+    m, frac = split_deadtime(dt_s, float(p.theta_s))
+
+    if model == "SOPDT_UNDERDAMPED":
+        wn = max(float(p.wn), 1e-6)
+        A = np.array([[0.0, 1.0], [-wn * wn, -2.0 * float(p.zeta) * wn]])
+        B = np.array([0.0, float(p.K) * wn * wn])
+        Ad, b_cur, b_prev = zoh_state_space(A, B, dt_s, frac)
+        return Ad, b_cur, b_prev, m
+
+    if model == "FOPDT":
+        tau = max(float(p.tau_s), 1e-9)
+        lam, residue = -1.0 / tau, float(p.K) / tau
+    else:
+        leak_tau = float(p.leak_tau_s)
+        lam, residue = (-1.0 / leak_tau if leak_tau > 1e-9 else 0.0), float(p.K)
+    a, c_prev, c_cur = _zoh_mode(lam, dt_s, frac)
+    return np.array([[a]]), np.array([residue * c_cur]), np.array([residue * c_prev]), m
+
+
+def simulate_closed_loop(
+    *,
+    spec: ClosedLoopSpec,
+    actuator: ActuatorParams,
+    model: PVModelType,
+    gains: Gains,
+    fopdt: FOPDTParams | None = None,
+    ipdt: IPDTParams | None = None,
+    sopdt: SOPDTUnderdampedParams | None = None,
+) -> ClosedLoopResult:
+    # Setpoint step response of a discrete PID around the plant, for every
+    # gain set at once: each sample updates (gain_sets,) state vectors.
+    #   PID: parallel form, derivative on the measurement through a first
+    #        order filter Tf = Kd / (Kp * N); integrator starts at cv0.
+    #   Actuator: actuator_block's clip -> rate limit -> Euler lag, per sample.
+    #   Anti-windup: back-calculation from the clipped, rate-limited command
+    #        with tracking time Ti = Kp / Ki.
+    #   Plant: exact ZOH, dead time through a ring of past inputs.
+    if float(spec.sp_step) == 0.0:
+        raise ValueError("sp_step must be non-zero")
+    dt_s = max(float(spec.dt_s), 1e-6)
+    n = int(round(float(spec.duration_s) / dt_s)) + 1
+    if n < 2:
+        raise ValueError("duration_s must be >= dt_s")
+    t = np.linspace(0.0, float(spec.duration_s), n)
+
+    Kp, Ki, Kd = _gain_columns(gains)
+    G = Kp.size
+    Ad, b_cur, b_prev, m = discrete_plant(model, dt_s, fopdt=fopdt, ipdt=ipdt, sopdt=sopdt)
+
+    pv0 = float(actuator.pv0)
+    cv0 = float(spec.cv0)
+    sp = np.where(t >= float(spec.t_step_s), pv0 + float(spec.sp_step), pv0)
+
+    lo, hi = float(actuator.pv_min), float(actuator.pv_max)
+    max_step = float(actuator.rate_limit) * dt_s
+    lag = dt_s / max(float(actuator.tau_s), 1e-12) if float(actuator.tau_s) > 0.0 else None
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        tf = np.where(Kp != 0.0, Kd / (Kp * float(spec.d_filter_n)), 0.0)
+        kt = np.where(Kp != 0.0, Ki / Kp, 0.0)
+
+    x = np.zeros((G, Ad.shape[0]))
+    ring = np.zeros((m + 2, G))
+    integ = np.full(G, cv0)
+    d_term = np.zeros(G)
+    pv_prev = np.full(G, pv0)
+    rl = np.full(G, cv0)
+    act = np.full(G, cv0)
+    Ad_T = Ad.T
+
+    pv = np.empty((G, n))
+    cv = np.empty((G, n))
+    with np.errstate(over="ignore", invalid="ignore"):
+        for k in range(n):
+            y = pv0 + x[:, 0]
+            pv[:, k] = y
+            e = sp[k] - y
+
+            d_term = (tf * d_term - Kd * (y - pv_prev)) / (tf + dt_s)
+            pv_prev = y
+            u = integ + Kp * e + d_term
+
+            u_lim = np.clip(u, lo, hi)
+            if max_step > 0.0:
+                u_lim = rl + np.clip(u_lim - rl, -max_step, max_step)
+                rl = u_lim
+            act = act + lag * (u_lim - act) if lag is not None else u_lim
+            cv[:, k] = act
+
+            integ = integ + (Ki * e + kt * (u_lim - u)) * dt_s
+
+            ring[k % (m + 2)] = act - cv0
+            x = x @ Ad_T + np.outer(ring[(k - m) % (m + 2)], b_cur) + np.outer(ring[(k - 1 - m) % (m + 2)], b_prev)
+
+    iae, overshoot, settling = _step_metrics(t, sp, pv, spec)
+    return ClosedLoopResult(
+        t=t,
+        sp=sp,
+        pv=pv,
+        cv=cv,
+        Kp=Kp,
+        Ki=Ki,
+        Kd=Kd,
+        iae=iae,
+        overshoot_pct=overshoot,
+        settling_time_s=settling,
+    )
+
+
+def _step_metrics(t: np.ndarray, sp: np.ndarray, pv: np.ndarray, spec: ClosedLoopSpec):
+    post = t >= float(spec.t_step_s)
+    tp = t[post]
+    err = pv[:, post] - sp[post]
+    step = float(spec.sp_step)
+    dt_s = float(t[1] - t[0])
+
+    iae = np.sum(np.abs(err), axis=1) * dt_s
+    peak = np.max(np.sign(step) * err, axis=1)
+    overshoot = np.maximum(peak, 0.0) / abs(step) * 100.0
+
+    # last sample outside the band (nan counts as outside)
+    outside = ~(np.abs(err) <= float(spec.settle_band) * abs(step))
+    last = outside.shape[1] - 1 - np.argmax(outside[:, ::-1], axis=1)
+    any_out = outside.any(axis=1)
+    settled_at = tp[np.minimum(last + 1, tp.size - 1)] - tp[0]
+    settling = np.where(~any_out, 0.0, np.where(last == tp.size - 1, np.inf, settled_at))
+    return iae, overshoot, settling
@@ -0,0 +1,188 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import shutil
+import struct
+import tempfile
+from pathlib import Path
+from typing import Any, Callable, Dict, Mapping, Optional, Tuple
+
+import numpy as np
+
+Arrays = Dict[str, np.ndarray]
+Meta = Dict[str, Any]
+
+_FORMAT = 1
+
+
+def default_cache_dir() -> Path:
+    env = os.environ.get("CTRL_CACHE_DIR")
+    if env:
+        return Path(env) / "csv"
+    return Path.home() / ".cache" / "ctrl" / "csv"
+
+
+class CsvSidecarCache:
+    # Parsed CSV arrays as raw .npy files, one directory per entry, keyed on
+    # the source's absolute path, size, mtime and the loader options. Hits
+    # are memory-mapped read-only. Total size is capped; the least recently
+    # used entries (by the mtime of their meta.json, touched on every hit)
+    # are evicted first. The cache is best-effort: any I/O failure just
+    # falls back to parsing.
+    def __init__(self, directory: Optional[os.PathLike] = None, *, max_bytes: int = 2 * 1024 ** 3):
+        self.directory = Path(directory) if directory is not None else default_cache_dir()
+        self.max_bytes = int(max_bytes)
+
+    def key(self, path: str, loader: str, options: Mapping[str, Any]) -> Optional[str]:
+        try:
+            st = os.stat(path)
+        except OSError:
+            return None
+        ident = json.dumps(
+            [_FORMAT, os.path.abspath(path), st.st_size, st.st_mtime_ns, loader, sorted(options.items())],
+            default=str,
+        )
+        return hashlib.sha1(ident.encode("utf-8")).hexdigest()
+
+    def get(self, key: str) -> Optional[Tuple[Arrays, Meta]]:
+        entry = self.directory / key
+        try:
+            meta = json.loads((entry / "meta.json").read_text(encoding="utf-8"))
+            arrays = {name: np.load(entry / f"{name}.npy", mmap_mode="r") for name in meta["arrays"]}
+            os.utime(entry / "meta.json")
+        except (OSError, ValueError, KeyError):
+            return None
+        return arrays, meta["meta"]
+
+    def put(self, key: str, arrays: Mapping[str, np.ndarray], meta: Meta) -> None:
+        try:
+            self.directory.mkdir(parents=True, exist_ok=True)
+            tmp = Path(tempfile.mkdtemp(prefix=".tmp-", dir=self.directory))
+        except OSError:
+            return
+        try:
+            for name, a in arrays.items():
+                np.save(tmp / f"{name}.npy", np.ascontiguousarray(a), allow_pickle=False)
+            (tmp / "meta.json").write_text(json.dumps({"arrays": list(arrays), "meta": meta}), encoding="utf-8")
+            # fails if another process already published this key; keep theirs
+            os.replace(tmp, self.directory / key)
+        except OSError:
+            shutil.rmtree(tmp, ignore_errors=True)
+            return
+        self.evict()
+
+    def build(self, key: str, write: Callable[[Path], Tuple[list, Meta]]) -> Tuple[Arrays, Meta]:
+        # For entries too large to hold in memory: write(tmp_dir) streams its
+        # .npy files into tmp_dir (see NpyAppender) and returns (names, meta).
+        # Unlike put(), failures propagate; there is nothing to fall back to.
+        self.directory.mkdir(parents=True, exist_ok=True)
+        tmp = Path(tempfile.mkdtemp(prefix=".tmp-", dir=self.directory))
+        try:
+            names, meta = write(tmp)
+            (tmp / "meta.json").write_text(json.dumps({"arrays": list(names), "meta": meta}), encoding="utf-8")
+            os.replace(tmp, self.directory / key)
+        except OSError:
+            shutil.rmtree(tmp, ignore_errors=True)
+            if not (self.directory / key / "meta.json").exists():
+                raise
+        except BaseException:
+            shutil.rmtree(tmp, ignore_errors=True)
+            raise
+        # pinned: an entry over max_bytes on its own would otherwise be
+        # evicted before it is read back
+        self.evict(keep=key)
+        hit = self.get(key)
+        if hit is None:
+            raise OSError(f"Could not read back cache entry {key}")
+        return hit
+
+    def evict(self, keep: Optional[str] = None) -> None:
+        entries = []
+        total = 0
+        try:
+            listing = list(self.directory.iterdir())
+        except OSError:
+            return
+        for entry in listing:
+            if not entry.is_dir() or entry.name.startswith(".tmp-"):
+                continue
+            try:
+                size = sum(f.stat().st_size for f in entry.iterdir())
+                used = (entry / "meta.json").stat().st_mtime
+            except OSError:
+                continue
+            total += size
+            if entry.name != keep:
+                entries.append((used, size, entry))
+
+        for _, size, entry in sorted(entries, key=lambda e: e[0]):
+            if total <= self.max_bytes:
+                break
+            shutil.rmtree(entry, ignore_errors=True)
+            total -= size
+
+    def clear(self) -> None:
+        shutil.rmtree(self.directory, ignore_errors=True)
+
+    def load(
+        self,
+        path: str,
+        loader: str,
+        options: Mapping[str, Any],
+        parse: Callable[[], Tuple[Arrays, Meta]],
+    ) -> Tuple[Arrays, Meta]:
+        key = self.key(path, loader, options)
+        if key is not None:
+            hit = self.get(key)
+            if hit is not None:
+                return hit
+        arrays, meta = parse()
+        # read-only either way, so callers see the same thing on a hit or a miss
+        for a in arrays.values():
+            a.flags.writeable = False
+        if key is not None:
+            self.put(key, arrays, meta)
+        return arrays, meta
+
+
+class NpyAppender:
+    # 1-D float64 .npy file written chunk by chunk. The header is reserved
+    # up front and filled in on close(), once the length is known.
+    _HEADER = 128
+
+    def __init__(self, path: os.PathLike):
+        self.path = Path(path)
+        self.n = 0
+        self._f = open(self.path, "wb")
+        self._f.write(b"\0" * self._HEADER)
+
+    def append(self, a: np.ndarray) -> None:
+        a = np.ascontiguousarray(a, dtype="<f8")
+        a.tofile(self._f)
+        self.n += a.size
+
+    def close(self) -> None:
+        d = "{'descr': '<f8', 'fortran_order': False, 'shape': (%d,), }" % self.n
+        h = d.ljust(self._HEADER - 10 - 1) + "\n"
+        self._f.seek(0)
+        self._f.write(b"\x93NUMPY\x01\x00" + struct.pack("<H", len(h)) + h.encode("latin1"))
+        self._f.close()
+
+    def __enter__(self) -> "NpyAppender":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        if not self._f.closed:
+            self.close()
+
+
+_default_cache: Optional[CsvSidecarCache] = None
+
+
+def default_csv_cache() -> CsvSidecarCache:
+    global _default_cache
+    if _default_cache is None:
+        _default_cache = CsvSidecarCache()
+    return _default_cache
@@ -1,27 +1,256 @@
 from __future__ import annotations
 
+import csv
+import re
+from importlib.util import find_spec
+from typing import Dict, Iterable, Iterator, Optional, Sequence, Tuple
+
 import numpy as np
 import pandas as pd
 
-from ctrl.models import TimeSeriesData
-from ctrl.services import median_dt_seconds
+from ctrl.models import TimeSeriesData, MultiChannelTimeSeries
+from ctrl.models.signal_models.timeseries_model import TIME_UNITS_PER_S
+from ctrl.services import median_dt_seconds, default_csv_cache, CsvSidecarCache
+from ctrl.services.csv_cache_service import NpyAppender
+
+
+_HAS_PYARROW = find_spec("pyarrow") is not None
+
+
+_DECIMAL_COMMA = re.compile(r"^[+-]?\d*,\d+(?:[eE][+-]?\d+)?$")
+_DECIMAL_POINT = re.compile(r"^[+-]?\d*\.\d+(?:[eE][+-]?\d+)?$")
+
+
+def csv_columns(path: str) -> list:
+    return list(pd.read_csv(path, nrows=0).columns)
+
+
+def sniff_csv_dialect(path: str, *, sample_bytes: int = 64 * 1024) -> Tuple[str, str]:
+    # (delimiter, decimal) from the head of the file. A decimal comma is only
+    # assumed when the delimiter is not a comma and the data cells use it.
+    with open(path, "r", encoding="utf-8-sig", newline="") as f:
+        sample = f.read(sample_bytes)
+    lines = sample.splitlines()
+    if len(lines) > 1 and not sample.endswith(("\n", "\r")):
+        lines = lines[:-1]  # last line may be cut off
+    if not lines:
+        raise ValueError("CSV is empty")
+
+    try:
+        delimiter = csv.Sniffer().sniff("\n".join(lines), delimiters=",;\t|").delimiter
+    except csv.Error:
+        counts = {d: lines[0].count(d) for d in ",;\t|"}
+        delimiter = max(counts, key=counts.get) if max(counts.values()) else ","
+
+    decimal = "."
+    if delimiter != ",":
+        cells = [c.strip() for row in csv.reader(lines[1:], delimiter=delimiter) for c in row]
+        commas = sum(1 for c in cells if _DECIMAL_COMMA.match(c))
+        points = sum(1 for c in cells if _DECIMAL_POINT.match(c))
+        if commas > points:
+            decimal = ","
+    return delimiter, decimal
+
+
+def pick_column(columns: Iterable[str], primary: Optional[str], alts: Tuple[str, ...] = ()) -> Optional[str]:
+    # Header name for primary, else the first alias present. Exact (stripped)
+    # matches win over case-insensitive ones.
+    by_name = {}
+    by_fold = {}
+    for c in columns:
+        by_name.setdefault(str(c).strip(), c)
+        by_fold.setdefault(str(c).strip().casefold(), c)
+    names = ((primary,) if primary else ()) + tuple(alts)
+    for n in names:
+        if n in by_name:
+            return by_name[n]
+    for n in names:
+        if n.casefold() in by_fold:
+            return by_fold[n.casefold()]
+    return None
+
+
+def iter_float_columns(
+    path: str,
+    columns: Sequence[str],
+    *,
+    chunksize: Optional[int] = None,
+) -> Iterator[Dict[str, np.ndarray]]:
+    # Parse only `columns`, straight to float64, dropping rows where any of
+    # them is non-finite. pyarrow's multithreaded parser is used when it is
+    # installed; chunksize (rows) bounds the parser's working memory and
+    # always goes through the C engine, which is the one that can stream.
+    columns = list(columns)
+    dtype = {c: np.float64 for c in columns}
+
+    if chunksize is None:
+        engine = "pyarrow" if _HAS_PYARROW else "c"
+        frames = [pd.read_csv(path, usecols=columns, dtype=dtype, engine=engine)]
+    else:
+        frames = pd.read_csv(path, usecols=columns, dtype=dtype, engine="c", chunksize=int(chunksize))
+
+    for df in frames:
+        cols = [df[c].to_numpy(dtype=float) for c in columns]
+        ok = np.logical_and.reduce([np.isfinite(v) for v in cols])
+        yield {c: (v if ok.all() else v[ok]) for c, v in zip(columns, cols)}
+
+
+def read_float_columns(
+    path: str,
+    columns: Sequence[str],
+    *,
+    chunksize: Optional[int] = None,
+) -> Dict[str, np.ndarray]:
+    parts = {c: [] for c in columns}
+    for chunk in iter_float_columns(path, columns, chunksize=chunksize):
+        for c, v in chunk.items():
+            parts[c].append(v)
+    return {c: np.concatenate(v) if v else np.empty(0) for c, v in parts.items()}
+
+
+def load_csv(
+    path: str,
+    *,
+    time_unit: str = "s",
+    chunksize: Optional[int] = None,
+    use_cache: bool = True,
+) -> TimeSeriesData:
+    # Re-opening an unchanged file memory-maps the arrays from the sidecar
+    # cache. The raw time column is what gets cached, so any unit shares it.
+    if time_unit not in TIME_UNITS_PER_S:
+        raise ValueError("time_unit must be 's' or 'ms'")
+
+    def parse():
+        t_raw, x = _parse_csv(path, chunksize)
+        return {"t_raw": t_raw, "x": x}, {}
 
+    if use_cache:
+        arrays, _ = default_csv_cache().load(path, "load_csv", {}, parse)
+    else:
+        arrays, _ = parse()
 
-def load_csv(path: str, *, time_unit: str = "s") -> TimeSeriesData:
-    df = pd.read_csv(path)
+    t_raw = arrays["t_raw"]
+    per_s = TIME_UNITS_PER_S[time_unit]
+    t = t_raw if per_s == 1.0 else t_raw / per_s
 
-    if "time" not in df.columns or "x" not in df.columns:
+    dt_s = median_dt_seconds(t)
+    if not np.isfinite(dt_s) or dt_s <= 0:
+        raise ValueError("Could not determine a positive dt from time column")
+
+    return TimeSeriesData(
+        t=t, x=arrays["x"], dt_s=float(dt_s), source_path=path, t_raw=t_raw, time_unit=time_unit,
+    )
+
+
+def load_csv_memmap(
+    path: str,
+    *,
+    time_unit: str = "s",
+    chunksize: int = 1_000_000,
+    cache: Optional[CsvSidecarCache] = None,
+) -> TimeSeriesData:
+    # load_csv for recordings larger than RAM: the CSV is streamed once into
+    # .npy files in the sidecar cache and the result is memory-mapped, so
+    # only the pages that are touched are ever loaded. t is stored in
+    # seconds (the unit is part of the cache key). dt_s is the median of the
+    # per-chunk median steps, which equals the global median on any time
+    # base that is uniform within each chunk.
+    if time_unit not in TIME_UNITS_PER_S:
+        raise ValueError("time_unit must be 's' or 'ms'")
+    cache = cache if cache is not None else default_csv_cache()
+    per_s = TIME_UNITS_PER_S[time_unit]
+
+    key = cache.key(path, "load_csv_memmap", {"time_unit": time_unit})
+    if key is None:
+        raise ValueError(f"Cannot read {path!r}")
+
+    def write(directory):
+        header = csv_columns(path)
+        if "time" not in header or "x" not in header:
+            raise ValueError("CSV must contain headers: time, x")
+
+        steps = []
+        t_last = None
+        with NpyAppender(directory / "t.npy") as t_out, NpyAppender(directory / "x.npy") as x_out:
+            for chunk in iter_float_columns(path, ("time", "x"), chunksize=chunksize):
+                t = chunk["time"] if per_s == 1.0 else chunk["time"] / per_s
+                if t.size == 0:
+                    continue
+                dt_c = median_dt_seconds(t if t_last is None else np.concatenate(([t_last], t)))
+                if np.isfinite(dt_c):
+                    steps.append(dt_c)
+                t_last = float(t[-1])
+                t_out.append(t)
+                x_out.append(chunk["x"])
+            n = t_out.n
+
+        if n < 10:
+            raise ValueError("Not enough valid samples after filtering NaNs/Infs")
+        dt_s = float(np.median(steps)) if steps else float("nan")
+        if not np.isfinite(dt_s) or dt_s <= 0:
+            raise ValueError("Could not determine a positive dt from time column")
+        return ("t", "x"), {"dt_s": dt_s}
+
+    hit = cache.get(key)
+    arrays, meta = hit if hit is not None else cache.build(key, write)
+    return TimeSeriesData(
+        t=arrays["t"], x=arrays["x"], dt_s=float(meta["dt_s"]), source_path=path, time_unit=time_unit,
+    )
+
+
+def _parse_csv(path: str, chunksize: Optional[int]):
+    header = csv_columns(path)
+    if "time" not in header or "x" not in header:
         raise ValueError("CSV must contain headers: time, x")
 
-    t = df["time"].to_numpy(dtype=float)
-    x = df["x"].to_numpy(dtype=float)
+    data = read_float_columns(path, ("time", "x"), chunksize=chunksize)
+    if data["time"].size < 10:
+        raise ValueError("Not enough valid samples after filtering NaNs/Infs")
+    return data["time"], data["x"]
+
+
+def load_csv_channels(
+    path: str,
+    *,
+    time_unit: str = "s",
+    channels: Optional[Sequence[str]] = None,
+    min_numeric: float = 0.9,
+) -> MultiChannelTimeSeries:
+    # Without an explicit channel list, a column is a channel when at least
+    # min_numeric of its non-blank cells are numbers, so quality/status text
+    # columns are left out. Rows are only dropped for a bad timestamp; a
+    # channel's own blanks and text cells stay in X as NaN gaps.
+    header = csv_columns(path)
 
-    ok = np.isfinite(t) & np.isfinite(x)
+    if "time" not in header:
+        raise ValueError("CSV must contain a time header")
+
+    if channels is None:
+        df = pd.read_csv(path)
+        raw = df.drop(columns=["time"])
+        data = raw.apply(pd.to_numeric, errors="coerce")
+        numeric = data.notna().sum()
+        data = data.loc[:, (numeric > 0) & (numeric >= min_numeric * raw.notna().sum())]
+    else:
+        missing = [c for c in channels if c not in header]
+        if missing:
+            raise ValueError(f"CSV is missing channels: {missing}")
+        df = pd.read_csv(path, usecols=["time", *channels], engine="pyarrow" if _HAS_PYARROW else "c")
+        data = df[list(channels)].apply(pd.to_numeric, errors="coerce")
+
+    if data.shape[1] == 0:
+        raise ValueError("CSV has no numeric channels besides time")
+
+    t = pd.to_numeric(df["time"], errors="coerce").to_numpy(dtype=float)
+    X = data.to_numpy(dtype=float).T
+
+    ok = np.isfinite(t)
     t = t[ok]
-    x = x[ok]
+    X = np.ascontiguousarray(X[:, ok])
+    X[~np.isfinite(X)] = np.nan
 
     if t.size < 10:
-        raise ValueError("Not enough valid samples after filtering NaNs/Infs")
+        raise ValueError("Not enough valid timestamps after filtering NaNs/Infs")
 
     if time_unit == "ms":
         t = t / 1000.0
@@ -32,4 +261,10 @@ def load_csv(path: str, *, time_unit: str = "s") -> TimeSeriesData:
     if not np.isfinite(dt_s) or dt_s <= 0:
         raise ValueError("Could not determine a positive dt from time column")
 
-    return TimeSeriesData(t=t, x=x, dt_s=float(dt_s), source_path=path)
+    return MultiChannelTimeSeries(
+        t=t,
+        X=X,
+        channels=tuple(str(c) for c in data.columns),
+        dt_s=float(dt_s),
+        source_path=path,
+    )
@@ -0,0 +1,43 @@
+from __future__ import annotations
+
+import numpy as np
+
+
+def min_max_decimate(
+    t: np.ndarray,
+    x: np.ndarray,
+    a: int = 0,
+    b: int | None = None,
+    *,
+    buckets: int = 2000,
+    chunk: int = 1 << 22,
+) -> tuple[np.ndarray, np.ndarray]:
+    # Plot-friendly view of x[a:b]: each of ~buckets equal slices contributes
+    # its min and max sample in time order, so spikes and the envelope survive.
+    # x is read `chunk` samples at a time and only the picked samples of t
+    # are touched, which keeps memory-mapped traces cheap to draw.
+    n = len(x)
+    b = n if b is None else min(int(b), n)
+    a = max(int(a), 0)
+    if b - a <= 2 * buckets:
+        return np.asarray(t[a:b], dtype=float), np.asarray(x[a:b], dtype=float)
+
+    s = -(-(b - a) // buckets)
+    step = max(1, chunk // s) * s
+    picks = []
+    for lo in range(a, b, step):
+        seg = np.asarray(x[lo:min(lo + step, b)], dtype=float)
+        full = seg.size // s * s
+        if full:
+            rows = seg[:full].reshape(-1, s)
+            base = lo + np.arange(rows.shape[0]) * s
+            i_min = base + rows.argmin(axis=1)
+            i_max = base + rows.argmax(axis=1)
+            picks.append(np.stack([np.minimum(i_min, i_max), np.maximum(i_min, i_max)], axis=1).ravel())
+        if full < seg.size:
+            tail = seg[full:]
+            i = np.sort([lo + full + tail.argmin(), lo + full + tail.argmax()])
+            picks.append(i)
+
+    idx = np.concatenate(picks)
+    return np.asarray(t[idx], dtype=float), np.asarray(x[idx], dtype=float)
@@ -0,0 +1,204 @@
+from __future__ import annotations
+
+from typing import Optional
+
+import numpy as np
+
+from ctrl.models import AutoTuneResult, TimeSeriesData, TuningResult
+from ctrl.services import solve_steady_state_gain
+from ctrl.services.kalman_service import _steady_state_tail
+
+
+def steady_state_log_likelihood(
+    x: np.ndarray,
+    dt_s: float,
+    r_x: np.ndarray,
+    q_x: np.ndarray,
+    q_x_dot: np.ndarray,
+    *,
+    burn_in: int = 0,
+    chunk: int = 32,
+) -> np.ndarray:
+    # Innovation log-likelihood of the steady-state constant-velocity filter
+    # for each (r_x, q_x, q_x_dot) row, over samples after burn_in. The
+    # filter starts at (x[0], 0) like run_procedural_kalman. Rows that have
+    # no valid steady state score -inf.
+    x = np.asarray(x, dtype=float)
+    r_x, q_x, q_x_dot = (np.asarray(v, dtype=float).ravel() for v in np.broadcast_arrays(r_x, q_x, q_x_dot))
+    m = r_x.size
+    n = x.size
+    ll = np.full(m, -np.inf)
+    if n < 2:
+        return ll
+
+    K0, K1, S = solve_steady_state_gain(dt_s, r_x, q_x, q_x_dot)
+    valid = np.isfinite(K0) & np.isfinite(K1) & np.isfinite(S) & (S > 0.0)
+
+    start = min(max(int(burn_in), 0), n - 2)
+    n_used = n - 1 - start
+    s0 = np.array([x[0], 0.0])
+
+    rows = np.flatnonzero(valid)
+    for lo in range(0, rows.size, chunk):
+        r = rows[lo:lo + chunk]
+        Y, Y_dot = _steady_state_tail(
+            dt_s, K0[r], K1[r], np.broadcast_to(x[1:], (r.size, n - 1)), np.broadcast_to(s0, (r.size, 2))
+        )
+        # prediction for sample k uses the posterior at k-1
+        pred = np.empty_like(Y)
+        pred[:, 0] = s0[0] + dt_s * s0[1]
+        pred[:, 1:] = Y[:, :-1] + dt_s * Y_dot[:, :-1]
+        e = x[1:] - pred[:, :]
+        e2 = np.einsum("ij,ij->i", e[:, start:], e[:, start:])
+        ll[r] = -0.5 * (n_used * np.log(2.0 * np.pi * S[r]) + e2 / S[r])
+
+    return ll
+
+
+def _start_point(ts: TimeSeriesData, start: Optional[TuningResult]) -> np.ndarray:
+    x = ts.x[np.isfinite(ts.x)]
+    dt = ts.dt_s
+
+    r0 = 0.5 * float(np.var(np.diff(x), ddof=1))
+    qxd0 = float(np.var(np.diff(x, n=2), ddof=1))
+    qx0 = qxd0 * dt * dt
+
+    if start is not None:
+        if np.isfinite(start.r_x) and start.r_x > 0:
+            r0 = float(start.r_x)
+        if np.isfinite(start.q_x_dot) and start.q_x_dot > 0:
+            qxd0 = float(start.q_x_dot)
+        if np.isfinite(start.q_x_user) and start.q_x_user > 0:
+            qx0 = float(start.q_x_user)
+
+    p = np.array([r0, qx0, qxd0])
+    p = np.where(np.isfinite(p) & (p > 0), p, 1e-6)
+    return np.log10(p)
+
+
+def _quadratic_step(grid: np.ndarray, ll: np.ndarray, spacing: float) -> np.ndarray:
+    # Maximizer of a quadratic fitted to ll over a log10 grid, at most one
+    # spacing from the grid centre along each axis. Directions without
+    # downward curvature (e.g. q_x -> 0, where ll goes flat) are left alone.
+    centre = grid.mean(axis=0)
+    ok = np.isfinite(ll)
+    if ok.sum() < 10:
+        return centre
+    d = (grid[ok] - centre) / spacing
+    i, j = np.triu_indices(3)
+    A = np.column_stack([np.ones(len(d)), d, d[:, i] * d[:, j]])
+    coef = np.linalg.lstsq(A, ll[ok], rcond=None)[0]
+    g = coef[1:4]
+    H = np.zeros((3, 3))
+    H[i, j] = coef[4:]
+    H = H + H.T
+    w, U = np.linalg.eigh(H)
+    down = w < -1e-9 * max(float(np.abs(w).max()), 1e-300)
+    step = -U[:, down] @ ((U[:, down].T @ g) / w[down])
+    return centre + spacing * np.clip(step, -1.0, 1.0)
+
+
+def auto_tune_kalman(
+    ts: TimeSeriesData,
+    start: Optional[TuningResult] = None,
+    *,
+    points: int = 5,
+    levels: int = 4,
+    span_decades: float = 2.0,
+    window: int = 10_000,
+    burn_in_frac: float = 0.05,
+    max_moves: int = 8,
+    polish: int = 3,
+) -> AutoTuneResult:
+    # Maximizes the steady-state innovation log-likelihood over
+    # (r_x, q_x, q_x_dot) with a coarse-to-fine log10 grid centred on the
+    # span-derived TuningResult (or noise heuristics when spans are missing).
+    # The first level is a points^3 grid over +-span_decades; each following
+    # level is a 3^3 grid at half the previous spacing around the best point
+    # (grids are re-centred, up to max_moves times in total, while their best
+    # point sits on the edge).
+    # All but the last level score a centred window of the trace, the last
+    # level scores the whole trace.
+    # The last spacing (0.125 decade with the defaults) is still coarser than
+    # the likelihood resolves the noise, so up to polish rounds follow on the
+    # whole trace: a Newton step on a quadratic fitted to the latest 3^3 grid
+    # (_quadratic_step), kept if it scores better, then a fresh 3^3 grid at
+    # half the spacing around the best point. On a 20k-sample trace this
+    # lands within a few percent of the true noise wherever it starts.
+    ok = np.isfinite(ts.x)
+    x = ts.x[ok]
+    if x.size < 10:
+        raise ValueError("Not enough valid samples to auto-tune")
+    dt = float(ts.dt_s)
+
+    n = x.size
+    if n > window:
+        a = (n - window) // 2
+        x_win = x[a:a + window]
+    else:
+        x_win = x
+
+    center = _start_point(ts, start)
+    half = float(span_decades)
+    n_points = max(int(points), 3)
+    evaluations = 0
+    best_ll = -np.inf
+
+    levels = max(int(levels), 1)
+    level = 0
+    moves = 0
+    while level < levels:
+        last = level == levels - 1
+        k = n_points if level == 0 else 3
+        axis = np.linspace(-half, half, k)
+        grid = center + np.stack(np.meshgrid(axis, axis, axis, indexing="ij"), axis=-1).reshape(-1, 3)
+
+        xs = x if last else x_win
+        p = 10.0 ** grid
+        ll = steady_state_log_likelihood(
+            xs, dt, p[:, 0], p[:, 1], p[:, 2], burn_in=int(burn_in_frac * xs.size)
+        )
+        evaluations += len(grid)
+
+        i = int(np.argmax(ll))
+        gain = float(ll[i]) - best_ll
+        center, best_ll = grid[i], float(ll[i])
+
+        # An optimum on the grid edge that still improves noticeably means the
+        # grid is off target; slide it over at the same spacing before
+        # refining. (A flat edge, e.g. q_x -> 0, is not worth chasing.)
+        on_edge = np.any(np.isin(np.unravel_index(i, (k, k, k)), (0, k - 1)))
+        if on_edge and gain > 1.0 and moves < max_moves and not last:
+            moves += 1
+            continue
+
+        half = (axis[1] - axis[0]) / 2.0
+        level += 1
+
+    spacing = 2.0 * half
+    burn_in = int(burn_in_frac * n)
+    unit = np.stack(np.meshgrid(*([np.array([-1.0, 0.0, 1.0])] * 3), indexing="ij"), axis=-1).reshape(-1, 3)
+    for r in range(max(int(polish), 0)):
+        if not np.isfinite(best_ll):
+            break
+        if r:
+            grid = center + spacing * unit
+            p = 10.0 ** grid
+            ll = steady_state_log_likelihood(x, dt, p[:, 0], p[:, 1], p[:, 2], burn_in=burn_in)
+            evaluations += len(grid)
+            i = int(np.argmax(ll))
+            if ll[i] > best_ll:
+                center, best_ll = grid[i], float(ll[i])
+        step = _quadratic_step(grid, ll, spacing)
+        p = 10.0 ** step
+        ll_step = float(steady_state_log_likelihood(x, dt, p[0], p[1], p[2], burn_in=burn_in)[0])
+        evaluations += 1
+        if ll_step > best_ll:
+            center, best_ll = step, ll_step
+        spacing /= 2.0
+
+    if not np.isfinite(best_ll):
+        raise ValueError("Auto-tune found no valid filter settings")
+
+    r_x, q_x, q_x_dot = (float(v) for v in 10.0 ** center)
+    return AutoTuneResult(r_x=r_x, q_x=q_x, q_x_dot=q_x_dot, log_likelihood=best_ll, evaluations=evaluations)
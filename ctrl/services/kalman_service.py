@@ -1,7 +1,24 @@
 from __future__ import annotations
+from dataclasses import fields
+from typing import Iterable, Iterator, Mapping, Optional, Sequence
+
 import numpy as np
 
-from ctrl.models import KalmanRunConfig
+from ctrl.models import KalmanRunConfig, KalmanFilterState, MultiChannelTimeSeries
+from ctrl.services import linear_recursion, linear_state_recursion
+
+# Below this many rows the per-step NumPy overhead of the batched loop costs
+# more than running run_procedural_kalman row by row.
+_MIN_VECTOR_ROWS = 6
+# Samples between gain checks while rows settle in run_batched_kalman.
+_SETTLE_BLOCK = 64
+# Rows still settling below which the batched loop's per-step overhead costs
+# more than finishing each row in closed form (_settle_row).
+_SETTLE_SCAN_ROWS = 64
+# How far a row's prior covariance may be from steady state, relative to it
+# in the closed loop's modal basis, before _transient_gains takes over (its
+# rounding is about 1e-16 times this ratio).
+_CLOSED_FORM_REACH = 1e3
 
 
 def run_procedural_kalman(
@@ -9,67 +26,949 @@ def run_procedural_kalman(
     x: np.ndarray,
     cfg: KalmanRunConfig,
 ) -> tuple[np.ndarray, np.ndarray]:
-    n = len(x)
-    y = np.empty(n, dtype=float)
-    y_dot = np.empty(n, dtype=float)
+    return StreamingKalmanFilter(cfg).update(t_s, x)
+
+
+class StreamingKalmanFilter:
+    # Procedural filter whose state survives between update() calls, so a
+    # trace can be fed in chunks (or sample by sample) with constant memory.
+    # Feeding the chunks of a trace gives bit-identical output to a one-shot
+    # run_procedural_kalman over the concatenated arrays.
+    def __init__(self, cfg: KalmanRunConfig, state: Optional[KalmanFilterState] = None):
+        self.cfg = cfg
+        self.reset()
+        if state is not None:
+            self.restore(state)
+
+    def reset(self) -> None:
+        self._t_last: Optional[float] = None
+        self._x_pred = 0.0
+        self._x_dot_pred = 0.0
+        self._P00 = float(self.cfg.p00)
+        self._P01 = float(self.cfg.p01)
+        self._P10 = float(self.cfg.p01)
+        self._P11 = float(self.cfg.p11)
+        self._n_seen = 0
+
+    def snapshot(self) -> KalmanFilterState:
+        return KalmanFilterState(
+            t_last=self._t_last,
+            x_pred=self._x_pred,
+            x_dot_pred=self._x_dot_pred,
+            P00=self._P00,
+            P01=self._P01,
+            P10=self._P10,
+            P11=self._P11,
+            n_seen=self._n_seen,
+        )
+
+    def restore(self, state: KalmanFilterState) -> None:
+        self._t_last = None if state.t_last is None else float(state.t_last)
+        self._x_pred = float(state.x_pred)
+        self._x_dot_pred = float(state.x_dot_pred)
+        self._P00 = float(state.P00)
+        self._P01 = float(state.P01)
+        self._P10 = float(state.P10)
+        self._P11 = float(state.P11)
+        self._n_seen = int(state.n_seen)
+
+    @property
+    def n_seen(self) -> int:
+        return self._n_seen
+
+    def step(self, t_s: float, x: float) -> tuple[float, float]:
+        y, y_dot = self.update(np.array([t_s], dtype=float), np.array([x], dtype=float))
+        return float(y[0]), float(y_dot[0])
+
+    def process_chunks(self, chunks: Iterable[tuple[np.ndarray, np.ndarray]]) -> Iterator[tuple[np.ndarray, np.ndarray]]:
+        for t_s, x in chunks:
+            yield self.update(t_s, x)
+
+    def update(self, t_s: np.ndarray, x: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+        cfg = self.cfg
+        n = len(x)
+        y = np.empty(n, dtype=float)
+        y_dot = np.empty(n, dtype=float)
+        if n == 0:
+            return y, y_dot
+
+        x_pred = self._x_pred
+        x_dot_pred = self._x_dot_pred
+
+        P00 = self._P00
+        P01 = self._P01
+        P10 = self._P10
+        P11 = self._P11
+
+        k0 = 0
+        t_last = self._t_last
+        if t_last is None:
+            # starts at the first finite measurement; earlier samples pass through
+            while k0 < n and not np.isfinite(x[k0]):
+                y[k0] = x[k0]
+                y_dot[k0] = 0.0
+                k0 += 1
+            if k0 < n:
+                x_pred = float(x[k0])
+                x_dot_pred = 0.0
+
+                y[k0] = x_pred
+                y_dot[k0] = x_dot_pred
+                t_last = float(t_s[k0])
+                k0 += 1
+
+        for k in range(k0, n):
+            t_k = float(t_s[k])
+            dt_s = t_k - t_last
+            t_last = t_k
+            if not np.isfinite(dt_s) or dt_s <= 0.0:
+                # pass-through
+                y[k] = float(x[k])
+                y_dot[k] = 0.0
+                continue
+
+            # PREDICT
+            x_pred = x_pred + (dt_s * x_dot_pred)
 
-    x_pred = float(x[0])
-    x_dot_pred = 0.0
+            # Tracking covariance (scalar expanded intentionally avoiding matrices)
+            xcov00 = (P00 + dt_s * P10) + dt_s * (P01 + dt_s * P11)
+            xcov01 = (P01 + dt_s * P11)
+            xcov10 = (P10 + dt_s * P11)
+            xcov11 = (P11)
 
+            # Accounting for process noise
+            xcov00 = xcov00 + cfg.q_x
+            xcov11 = xcov11 + cfg.q_x_dot
+
+            # UPDATE
+            y_res = float(x[k] - x_pred)
+            S = xcov00 + cfg.r_x
+
+            # a missing (non-finite) measurement leaves the prediction
+            if S > 0.0 and np.isfinite(S) and np.isfinite(y_res):
+                K0 = xcov00 / S
+                K1 = xcov10 / S
+
+                x_pred = x_pred + (K0 * y_res)
+                x_dot_pred = x_dot_pred + (K1 * y_res)
+
+                if cfg.bleed_enable:
+                    if abs(x[k] - x_pred) < cfg.bleed_thresh:
+                        x_dot_pred = x_dot_pred * cfg.bleed_factor
+
+                # Tracking covariance
+                P00 = (1.0 - K0) * xcov00
+                P01 = (1.0 - K0) * xcov01
+                P10 = xcov10 - (K1 * xcov00)
+                P11 = xcov11 - (K1 * xcov01)
+
+                # Enforcing symmetry
+                P10 = P01
+
+            y[k] = x_pred
+            y_dot[k] = x_dot_pred
+
+        self._t_last = t_last
+        self._x_pred = x_pred
+        self._x_dot_pred = x_dot_pred
+        self._P00 = P00
+        self._P01 = P01
+        self._P10 = P10
+        self._P11 = P11
+        self._n_seen += n
+        return y, y_dot
+
+
+def is_uniform_time_base(t_s: np.ndarray, *, rtol: float = 1e-6, chunk: int = 1 << 22) -> bool:
+    # True when every step is within rtol * dt_mean of the mean step, plus
+    # what float64 can resolve at these timestamps: each t carries up to half
+    # an ulp of rounding, so a step can be off by eps * max|t| with no jitter
+    # at all (7e-8 * dt at 1 kHz a week in). Scanned in chunks so a
+    # memory-mapped time base is only paged through.
+    n = len(t_s)
+    if n < 2:
+        return False
+    t0, t1 = float(t_s[0]), float(t_s[-1])
+    dt_mean = (t1 - t0) / (n - 1)
+    if not np.isfinite(dt_mean) or dt_mean <= 0.0:
+        return False
+    # t is increasing (checked below), so its ends bound |t|
+    tol = rtol * dt_mean + 4.0 * np.finfo(float).eps * max(abs(t0), abs(t1))
+    for lo in range(0, n - 1, chunk):
+        dt = np.diff(np.asarray(t_s[lo:lo + chunk + 1], dtype=float))
+        if not np.all(np.isfinite(dt)) or dt.min() <= 0.0:
+            return False
+        if np.max(np.abs(dt - dt_mean)) > tol:
+            return False
+    return True
+
+
+def steady_state_gain(
+    dt_s: float,
+    cfg: KalmanRunConfig,
+    *,
+    gain_tol: float = 1e-12,
+    max_iter: int = 10_000,
+) -> tuple[float, float, int] | None:
+    # Iterates the same covariance recursion as run_procedural_kalman for a
+    # fixed dt. Returns (K0, K1, k) where k is the update count after which
+    # the gain stopped moving by more than gain_tol (relative), or None if it
+    # never settles within max_iter.
     P00 = float(cfg.p00)
     P01 = float(cfg.p01)
     P10 = float(cfg.p01)
     P11 = float(cfg.p11)
 
-    y[0] = x_pred
-    y_dot[0] = x_dot_pred
+    K0_prev = K1_prev = float("nan")
+    for k in range(1, max_iter + 1):
+        xcov00 = (P00 + dt_s * P10) + dt_s * (P01 + dt_s * P11) + cfg.q_x
+        xcov01 = (P01 + dt_s * P11)
+        xcov10 = (P10 + dt_s * P11)
+        xcov11 = P11 + cfg.q_x_dot
+
+        S = xcov00 + cfg.r_x
+        if not (S > 0.0 and np.isfinite(S)):
+            return None
+
+        K0 = xcov00 / S
+        K1 = xcov10 / S
+
+        P00 = (1.0 - K0) * xcov00
+        P01 = (1.0 - K0) * xcov01
+        P11 = xcov11 - (K1 * xcov01)
+        P10 = P01
+
+        if abs(K0 - K0_prev) <= gain_tol * abs(K0) and abs(K1 - K1_prev) <= gain_tol * abs(K1):
+            return K0, K1, k
+        K0_prev, K1_prev = K0, K1
+
+    return None
+
+
+def solve_steady_state_gain(
+    dt_s: float,
+    r_x: float | np.ndarray,
+    q_x: float | np.ndarray,
+    q_x_dot: float | np.ndarray,
+    *,
+    max_iter: int = 64,
+) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    # Closed-form steady state of the covariance recursion (the filtering
+    # DARE) via the structure-preserving doubling algorithm, vectorized over
+    # broadcast r_x/q_x/q_x_dot. Converges quadratically, so it needs a few
+    # dozen iterations even where steady_state_gain would take thousands.
+    # Returns (K0, K1, S); NaN where r_x <= 0.
+    r_x, q_x, q_x_dot = np.broadcast_arrays(
+        np.asarray(r_x, dtype=float), np.asarray(q_x, dtype=float), np.asarray(q_x_dot, dtype=float)
+    )
+    shape = r_x.shape
+    r = r_x.ravel()
+    m = r.size
+    ok = r > 0.0
+
+    A = np.broadcast_to(np.array([[1.0, 0.0], [dt_s, 1.0]]), (m, 2, 2)).copy()  # F^T
+    G = np.zeros((m, 2, 2))
+    G[:, 0, 0] = np.where(ok, 1.0 / np.where(ok, r, 1.0), 0.0)
+    H = np.zeros((m, 2, 2))
+    H[:, 0, 0] = q_x.ravel()
+    H[:, 1, 1] = q_x_dot.ravel()
+    eye = np.eye(2)
+
+    for _ in range(max_iter):
+        W = np.linalg.inv(eye + G @ H)
+        AW = A @ W
+        At = np.swapaxes(A, -1, -2)
+        G_next = G + AW @ G @ At
+        H_next = H + At @ H @ W @ A
+        A = AW @ A
+        settled = np.array_equal(H_next, H)
+        G, H = G_next, H_next
+        if settled:
+            break
+
+    # H is the prior (predicted) covariance
+    S = H[:, 0, 0] + r
+    K0 = H[:, 0, 0] / S
+    K1 = H[:, 1, 0] / S
+    nan = np.full(m, np.nan)
+    return (
+        np.where(ok, K0, nan).reshape(shape),
+        np.where(ok, K1, nan).reshape(shape),
+        np.where(ok, S, nan).reshape(shape),
+    )
+
+
+def _settling_rows(
+    dt_s: float,
+    X: np.ndarray,
+    rows: np.ndarray,
+    cfgs: list[KalmanRunConfig],
+    K0_ss: np.ndarray,
+    K1_ss: np.ndarray,
+    S_ss: np.ndarray,
+    Y: np.ndarray,
+    Y_dot: np.ndarray,
+    *,
+    gain_tol: float = 1e-12,
+) -> np.ndarray:
+    # The procedural filter at a fixed dt on rows X[rows] (complete, non-bleed
+    # configs cfgs), each run only until its gain is within gain_tol
+    # (relative) of its steady state K0_ss/K1_ss (innovation variance S_ss).
+    # Writes Y/Y_dot[rows] up to the returned settle index (n - 1 for rows
+    # that never settle). Settled rows leave the vectorized loop; once
+    # _SETTLE_SCAN_ROWS are left, rows whose covariance is near enough to
+    # steady state (_CLOSED_FORM_REACH) finish in _settle_row.
+    n = X.shape[1]
+    settled_at = np.full(rows.size, n - 1)
+
+    def col(name: str) -> np.ndarray:
+        return np.array([getattr(c, name) for c in cfgs], dtype=float)
+
+    pos = np.arange(rows.size)
+    r_x, q_x, q_x_dot = col("r_x"), col("q_x"), col("q_x_dot")
+    tol0, tol1 = gain_tol * np.abs(K0_ss), gain_tol * np.abs(K1_ss)
+    M_ss = _steady_prior(dt_s, r_x, K0_ss, K1_ss, S_ss)
+    log_lam, V, Vi = _closed_loop_modes(dt_s, K0_ss, K1_ss)
+    reach = _CLOSED_FORM_REACH * np.abs(Vi @ M_ss @ np.swapaxes(Vi, -1, -2)).max(axis=(1, 2))
+    reach[np.isnan(log_lam[:, 0])] = -1.0
+    x_pred = X[rows, 0]
+    x_dot_pred = np.zeros(rows.size)
+    P00, P01, P11 = col("p00"), col("p01"), col("p11")
+    P10 = P01.copy()
+    Y[rows, 0] = x_pred
+    Y_dot[rows, 0] = x_dot_pred
+
+    # Blocks of _SETTLE_BLOCK samples: the block is gathered sample-major so
+    # each step reads and writes contiguous memory, and rows leave at block
+    # ends (settling a little late costs nothing).
+    k = 1
+    while k < n and rows.size:
+        hi = min(k + _SETTLE_BLOCK, n)
+        Z = X[rows, k:hi].T.copy()
+        Y_b = np.empty_like(Z)
+        Y_dot_b = np.empty_like(Z)
+        for j in range(hi - k):
+            x_pred = x_pred + (dt_s * x_dot_pred)
+
+            xcov00 = (P00 + dt_s * P10) + dt_s * (P01 + dt_s * P11) + q_x
+            xcov01 = (P01 + dt_s * P11)
+            xcov10 = (P10 + dt_s * P11)
+            xcov11 = P11 + q_x_dot
+
+            # S >= r_x > 0 for the PSD covariances run_batched_kalman sends here
+            y_res = Z[j] - x_pred
+            S = xcov00 + r_x
+            K0 = xcov00 / S
+            K1 = xcov10 / S
+
+            x_pred = x_pred + (K0 * y_res)
+            x_dot_pred = x_dot_pred + (K1 * y_res)
+            P00 = (1.0 - K0) * xcov00
+            P01 = (1.0 - K0) * xcov01
+            P11 = xcov11 - (K1 * xcov01)
+            P10 = P01
+
+            Y_b[j] = x_pred
+            Y_dot_b[j] = x_dot_pred
+        Y[rows, k:hi] = Y_b.T
+        Y_dot[rows, k:hi] = Y_dot_b.T
+        k = hi
+
+        done = (np.abs(K0 - K0_ss) <= tol0) & (np.abs(K1 - K1_ss) <= tol1)
+        settled_at[pos[done]] = k - 1
+        out = done.copy()
+        if k < n and rows.size - done.sum() <= _SETTLE_SCAN_ROWS:
+            E = _transient_prior(dt_s, P00, P01, P11, q_x, q_x_dot, M_ss, Vi)
+            ready = ~done & (np.abs(E).max(axis=(1, 2)) <= reach)
+            for i in np.flatnonzero(ready):
+                settled_at[pos[i]] = _settle_row(
+                    dt_s, X[rows[i]], Y[rows[i]], Y_dot[rows[i]], k,
+                    (float(x_pred[i]), float(x_dot_pred[i])),
+                    float(r_x[i]), M_ss[i], log_lam[i], V[i], E[i],
+                    (float(K0_ss[i]), float(tol0[i]), float(K1_ss[i]), float(tol1[i])),
+                    gain_tol,
+                )
+            out |= ready
+        if out.any():
+            keep = ~out
+            pos, rows, x_pred, x_dot_pred, P00, P01, P10, P11 = (
+                a[keep] for a in (pos, rows, x_pred, x_dot_pred, P00, P01, P10, P11)
+            )
+            r_x, q_x, q_x_dot, K0_ss, K1_ss, tol0, tol1 = (
+                a[keep] for a in (r_x, q_x, q_x_dot, K0_ss, K1_ss, tol0, tol1)
+            )
+            M_ss, log_lam, V, Vi, reach = (a[keep] for a in (M_ss, log_lam, V, Vi, reach))
+    return settled_at
+
+
+def _settle_row(
+    dt_s: float,
+    x: np.ndarray,
+    y: np.ndarray,
+    y_dot: np.ndarray,
+    k0: int,
+    s0: tuple,
+    r_x: float,
+    M_ss: np.ndarray,
+    log_lam: np.ndarray,
+    V: np.ndarray,
+    E: np.ndarray,
+    target: tuple,
+    gain_tol: float,
+) -> int:
+    # One row of _settling_rows from sample k0 on, from state s0 and modal
+    # prior offset E; returns its settle index. The gains come from
+    # _transient_gains in chunks of growing length and the state from
+    # _varying_gain_filter, so a row that takes the whole trace to settle
+    # costs O(n) vectorized work, not a Python loop per sample.
+    K0_ss, tol0, K1_ss, tol1 = target
+    n = len(x)
+
+    def late(j: np.ndarray) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+        K0, K1 = _transient_gains(r_x, M_ss, log_lam, V, E, j)
+        return K0, K1, np.flatnonzero((np.abs(K0 - K0_ss) > tol0) | (np.abs(K1 - K1_ss) > tol1))
+
+    # |K - K_ss| shrinks like rho^(2j), rho the slower closed-loop pole
+    L = int(min(max(np.log(gain_tol) / (2.0 * float(np.max(log_lam.real))), 1 << 8), 1 << 18))
+    s = s0
+    k = k0
+    while k < n:
+        hi = min(k + L, n)
+        # a coarse pass bounds the settle point so the full gain sequence is
+        # only taken as far as it is needed
+        grid = np.unique(np.r_[np.arange(k, hi, max(1, (hi - k) >> 6)), hi - 1])
+        _, _, bad = late(grid - k0)
+        if not bad.size:
+            hi = k + 1
+        elif bad[-1] < grid.size - 1:
+            hi = int(grid[bad[-1] + 1]) + 1
+        K0, K1, bad = late(np.arange(k - k0, hi - k0))
+        # run through the first sample after which every gain has settled
+        end = min(k + int(bad[-1]) + 2 if bad.size else k + 1, hi)
+        y[k:end], y_dot[k:end] = _varying_gain_filter(
+            dt_s, K0[: end - k], K1[: end - k], np.asarray(x[k:end], dtype=float), s
+        )
+        if not bad.size or bad[-1] < hi - k - 1:
+            return end - 1
+        s = (float(y[end - 1]), float(y_dot[end - 1]))
+        k = end
+        L = min(2 * L, 1 << 18)
+    return n - 1
+
+
+def _steady_prior(dt_s: float, r_x: np.ndarray, K0_ss: np.ndarray, K1_ss: np.ndarray, S_ss: np.ndarray) -> np.ndarray:
+    # Steady-state prior covariance M_ss (rows, 2, 2) recovered from the
+    # gains: M00 = S - r_x, M10 = K1 S, and M11 from the M01 update.
+    M = np.empty(r_x.shape + (2, 2))
+    M[..., 0, 0] = S_ss - r_x
+    M[..., 0, 1] = M[..., 1, 0] = K1_ss * S_ss
+    M[..., 1, 1] = K1_ss * S_ss * (K0_ss / dt_s + K1_ss)
+    return M
+
+
+def _closed_loop_modes(
+    dt_s: float, K0_ss: np.ndarray, K1_ss: np.ndarray, *, max_cond: float = 1e6
+) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    # Eigen-decomposition A = V diag(lam) V^-1 of each row's steady-state
+    # closed loop A = F (I - K H), taken as 1 + eig(A - I) so poles near 1
+    # keep their distance from it. Returns (log lam, V, V^-1); log lam is
+    # NaN where V is near-degenerate or a pole is not inside the unit circle.
+    N = np.zeros(K0_ss.shape + (2, 2))
+    N[..., 0, 0] = -K0_ss - dt_s * K1_ss
+    N[..., 0, 1] = dt_s
+    N[..., 1, 0] = -K1_ss
+    mu, V = np.linalg.eig(N)
+    mu = mu.astype(complex)
+    V = V.astype(complex)
+    log_lam = 0.5 * np.log1p(2.0 * mu.real + (mu.real * mu.real + mu.imag * mu.imag)) + 1j * np.arctan2(
+        mu.imag, 1.0 + mu.real
+    )
+    cond = np.linalg.cond(V)
+    ok = np.isfinite(cond) & (cond <= max_cond) & np.all(log_lam.real < 0.0, axis=-1)
+    V[~ok] = np.eye(2)
+    log_lam[~ok] = np.nan
+    return log_lam, V, np.linalg.inv(V)
+
+
+def _transient_prior(
+    dt_s: float,
+    P00: np.ndarray,
+    P01: np.ndarray,
+    P11: np.ndarray,
+    q_x: np.ndarray,
+    q_x_dot: np.ndarray,
+    M_ss: np.ndarray,
+    Vi: np.ndarray,
+) -> np.ndarray:
+    # Modal offset E = V^-1 (M - M_ss) V^-T of the prior M = F P F^T + Q that
+    # follows posterior P, which is where _transient_gains starts from.
+    d = np.empty(P00.shape + (2, 2))
+    d[..., 0, 0] = (P00 + dt_s * P01) + dt_s * (P01 + dt_s * P11) + q_x
+    d[..., 0, 1] = d[..., 1, 0] = P01 + dt_s * P11
+    d[..., 1, 1] = P11 + q_x_dot
+    d -= M_ss
+    return Vi @ d @ np.swapaxes(Vi, -1, -2)
+
+
+def _cexpm1(z: np.ndarray) -> np.ndarray:
+    # exp(z) - 1 without cancellation for small complex z
+    if not np.any(z.imag):
+        return np.expm1(z.real).astype(complex)
+    return np.expm1(z.real) * np.cos(z.imag) - 2.0 * np.sin(0.5 * z.imag) ** 2 + 1j * np.exp(z.real) * np.sin(z.imag)
+
 
+def _transient_gains(
+    r_x: float, M_ss: np.ndarray, log_lam: np.ndarray, V: np.ndarray, E: np.ndarray, j: np.ndarray
+) -> tuple[np.ndarray, np.ndarray]:
+    # Gains (K0, K1) of the covariance recursion j steps after a prior with
+    # modal offset E, in closed form: with lam, V the steady-state closed
+    # loop's modes and u = V[0],
+    #   M_(j+1) - M_ss = V lam^j (I + E C_j)^-1 E lam^j V^T,
+    #   C_j[a, b] = u_a u_b sum_(t<j) (lam_a lam_b)^t / S_ss,
+    # so every step is elementwise work and none depends on the last. The
+    # rounding grows with |E| / |M_ss|, hence _CLOSED_FORM_REACH.
+    u = V[0]
+    S_ss = M_ss[0, 0] + r_x
+    jj = j.astype(float)
+    # a complex pair is conjugate, so its second mode needs no work of its own
+    pair = log_lam[0].imag != 0.0
+
+    def geo(a: int, b: int) -> np.ndarray:
+        z = log_lam[a] + log_lam[b]
+        return u[a] * u[b] * (_cexpm1(z * jj) / _cexpm1(np.array(z))) / S_ss
+
+    lam_j0 = np.exp(log_lam[0] * jj)
+    lam_j1 = np.conj(lam_j0) if pair else np.exp(log_lam[1] * jj)
+    C00, C01 = geo(0, 0), geo(0, 1)
+    C11 = np.conj(C00) if pair else geo(1, 1)
+    X00 = 1.0 + E[0, 0] * C00 + E[0, 1] * C01
+    X01 = E[0, 0] * C01 + E[0, 1] * C11
+    X10 = E[1, 0] * C00 + E[1, 1] * C01
+    X11 = 1.0 + E[1, 0] * C01 + E[1, 1] * C11
+    det = X00 * X11 - X01 * X10
+
+    v0, v1 = lam_j0 * u[0], lam_j1 * u[1]
+    e0 = E[0, 0] * v0 + E[0, 1] * v1
+    e1 = E[1, 0] * v0 + E[1, 1] * v1
+    w0 = lam_j0 * (X11 * e0 - X01 * e1) / det
+    w1 = lam_j1 * (X00 * e1 - X10 * e0) / det
+
+    m00 = M_ss[0, 0] + (V[0, 0] * w0 + V[0, 1] * w1).real
+    m10 = M_ss[1, 0] + (V[1, 0] * w0 + V[1, 1] * w1).real
+    S = m00 + r_x
+    return m00 / S, m10 / S
+
+
+def _varying_gain_filter(dt_s: float, K0: np.ndarray, K1: np.ndarray, z: np.ndarray, s0: tuple):
+    # s[k] = A_k s[k-1] + K_k z[k], A_k = (I - K_k H) F, from s[-1] = s0: the
+    # filter for a known gain sequence.
+    a00 = 1.0 - K0
+    a01 = a00 * dt_s
+    a10 = -K1
+    a11 = 1.0 - K1 * dt_s
+    b0 = K0 * z
+    b1 = K1 * z
+    b0[0] += a00[0] * s0[0] + a01[0] * s0[1]
+    b1[0] += a10[0] * s0[0] + a11[0] * s0[1]
+    return _pair_scan(a00, a01, a10, a11, b0, b1)
+
+
+def _pair_scan(a00, a01, a10, a11, b0, b1) -> tuple[np.ndarray, np.ndarray]:
+    # s[k] = A_k s[k-1] + b_k from s[-1] = 0, A_k as its four component
+    # arrays. Adjacent steps are composed pairwise and the half-length
+    # recursion solved first; the even steps then follow from the odd ones,
+    # so the work is O(n) over log2(n) levels.
+    n = b0.size
+    if n == 1:
+        return b0.copy(), b1.copy()
+    l, r = slice(0, n - 1, 2), slice(1, n, 2)
+    y_odd, y_dot_odd = _pair_scan(
+        a00[r] * a00[l] + a01[r] * a10[l],
+        a00[r] * a01[l] + a01[r] * a11[l],
+        a10[r] * a00[l] + a11[r] * a10[l],
+        a10[r] * a01[l] + a11[r] * a11[l],
+        a00[r] * b0[l] + a01[r] * b1[l] + b0[r],
+        a10[r] * b0[l] + a11[r] * b1[l] + b1[r],
+    )
+    y = np.empty(n)
+    y_dot = np.empty(n)
+    y[1::2], y_dot[1::2] = y_odd, y_dot_odd
+    y[0], y_dot[0] = b0[0], b1[0]
+    e = slice(2, n, 2)
+    p, p_dot = y[1:n - 1:2], y_dot[1:n - 1:2]
+    y[e] = a00[e] * p + a01[e] * p_dot + b0[e]
+    y_dot[e] = a10[e] * p + a11[e] * p_dot + b1[e]
+    return y, y_dot
+
+
+def run_steady_state_kalman(
+    t_s: np.ndarray,
+    x: np.ndarray,
+    cfg: KalmanRunConfig,
+    *,
+    rtol: float = 1e-6,
+    gain_tol: float = 1e-12,
+    max_transient: int = 10_000,
+) -> tuple[np.ndarray, np.ndarray]:
+    # Fast path for uniformly sampled data: the first samples run through the
+    # exact procedural filter until the gain settles, the remainder uses the
+    # frozen steady-state gain as a vectorized linear recursion.
+    #
+    # Tolerance: the transient is bit-identical to run_procedural_kalman.
+    # After it, the estimates differ only by the residual gain drift (below
+    # gain_tol relative) and by timestamp jitter (below rtol * dt plus the
+    # float64 resolution of t, see is_uniform_time_base). The error follows
+    # the jitter: ~1e-10 * max|x| a week into a 1 kHz trace, ~1e-7 at
+    # Unix-epoch timestamps, where t itself only resolves ~0.2 us.
+    #
+    # Falls back to run_procedural_kalman when the time base is not uniform,
+    # bleed is enabled (data-dependent, not linear), x has missing samples
+    # (predict-only steps break the fixed-gain recursion) or the gain never
+    # settles.
+    n = len(x)
+    if cfg.bleed_enable or n < 3 or not is_uniform_time_base(t_s, rtol=rtol) or not np.isfinite(x).all():
+        return run_procedural_kalman(t_s, x, cfg)
+
+    dt_s = float(t_s[-1] - t_s[0]) / (n - 1)
+    ss = steady_state_gain(dt_s, cfg, gain_tol=gain_tol, max_iter=max_transient)
+    if ss is None or ss[2] + 1 >= n:
+        return run_procedural_kalman(t_s, x, cfg)
+    K0, K1, m = ss
+
+    y = np.empty(n, dtype=float)
+    y_dot = np.empty(n, dtype=float)
+    y[: m + 1], y_dot[: m + 1] = run_procedural_kalman(t_s[: m + 1], x[: m + 1], cfg)
+
+    y_tail, y_dot_tail = _steady_state_tail(
+        dt_s,
+        np.array([K0]),
+        np.array([K1]),
+        np.asarray(x[m + 1:], dtype=float)[None, :],
+        np.array([[y[m], y_dot[m]]]),
+    )
+    y[m + 1:] = y_tail[0]
+    y_dot[m + 1:] = y_dot_tail[0]
+    return y, y_dot
+
+
+def run_chunked_kalman(
+    t_s: np.ndarray,
+    x: np.ndarray,
+    cfg: KalmanRunConfig,
+    *,
+    out: Optional[tuple[np.ndarray, np.ndarray]] = None,
+    chunk: int = 1 << 22,
+    rtol: float = 1e-6,
+    gain_tol: float = 1e-12,
+    max_transient: int = 10_000,
+) -> tuple[np.ndarray, np.ndarray]:
+    # run_steady_state_kalman for inputs that should not be materialized
+    # whole, e.g. memory-mapped recordings: t_s/x are read `chunk` samples at
+    # a time and written into `out` (y, y_dot), which may itself be a memmap.
+    # The steady-state tail carries its state across chunks; the slow path
+    # carries a StreamingKalmanFilter instead.
+    n = len(x)
+    y, y_dot = out if out is not None else (np.empty(n), np.empty(n))
+
+    ss = None
+    if (
+        not cfg.bleed_enable
+        and n >= 3
+        and is_uniform_time_base(t_s, rtol=rtol, chunk=chunk)
+        and all(np.isfinite(x[lo:lo + chunk]).all() for lo in range(0, n, chunk))
+    ):
+        dt_s = float(t_s[-1] - t_s[0]) / (n - 1)
+        ss = steady_state_gain(dt_s, cfg, gain_tol=gain_tol, max_iter=max_transient)
+        if ss is not None and ss[2] + 1 >= n:
+            ss = None
+
+    kf = StreamingKalmanFilter(cfg)
+    if ss is None:
+        for lo in range(0, n, chunk):
+            y[lo:lo + chunk], y_dot[lo:lo + chunk] = kf.update(t_s[lo:lo + chunk], x[lo:lo + chunk])
+        return y, y_dot
+
+    K0, K1, m = ss
+    y[: m + 1], y_dot[: m + 1] = kf.update(t_s[: m + 1], x[: m + 1])
+    s = np.array([[y[m], y_dot[m]]])
+    for lo in range(m + 1, n, chunk):
+        y_c, y_dot_c = _steady_state_tail(
+            dt_s, np.array([K0]), np.array([K1]), np.asarray(x[lo:lo + chunk], dtype=float)[None, :], s
+        )
+        y[lo:lo + chunk] = y_c[0]
+        y_dot[lo:lo + chunk] = y_dot_c[0]
+        s = np.array([[y_c[0, -1], y_dot_c[0, -1]]])
+    return y, y_dot
+
+
+def _steady_state_tail(
+    dt_s: float,
+    K0: np.ndarray,
+    K1: np.ndarray,
+    Z: np.ndarray,
+    s0: np.ndarray,
+    *,
+    max_cond: float = 1e6,
+    chunk_elems: int = 1 << 16,
+) -> tuple[np.ndarray, np.ndarray]:
+    # Fixed-gain filter s[k] = A s[k-1] + K z[k], A = (I - K H) F, for rows of
+    # gains K0/K1 (m,), measurements Z (m, n) and start states s0 (m, 2).
+    # A is diagonalized per row so each mode is a scalar linear_recursion; a
+    # complex-conjugate pair only needs one mode. Rows whose eigenvectors are
+    # near-degenerate use linear_state_recursion on A directly.
+    m, n = Z.shape
+    Y = np.empty((m, n), dtype=float)
+    Y_dot = np.empty((m, n), dtype=float)
+    if n == 0:
+        return Y, Y_dot
+
+    A = np.empty((m, 2, 2))
+    A[:, 0, 0] = 1.0 - K0
+    A[:, 0, 1] = (1.0 - K0) * dt_s
+    A[:, 1, 0] = -K1
+    A[:, 1, 1] = 1.0 - K1 * dt_s
+    Kv = np.stack([K0, K1], axis=-1)
+
+    lam, V = np.linalg.eig(A)
+    cond = np.linalg.cond(V)
+    modal = np.isfinite(cond) & (cond <= max_cond)
+
+    for i in np.flatnonzero(~modal):
+        s = linear_state_recursion(A[i], Z[i][:, None] * Kv[i], s0[i])
+        Y[i], Y_dot[i] = s[:, 0], s[:, 1]
+
+    rows = np.flatnonzero(modal)
+    if rows.size == 0:
+        return Y, Y_dot
+
+    Vinv = np.linalg.inv(V[rows])
+    c = np.einsum("rij,rj->ri", Vinv, Kv[rows])
+    w0 = np.einsum("rij,rj->ri", Vinv, s0[rows])
+    pair = np.abs(lam[rows, 0].imag) > 0.0
+
+    step = max(1, chunk_elems // n)
+    for sel, n_modes in ((rows[pair], 1), (rows[~pair], 2)):
+        idx = np.searchsorted(rows, sel)
+        for lo in range(0, sel.size, step):
+            r, j = sel[lo:lo + step], idx[lo:lo + step]
+            y = np.zeros((r.size, n))
+            y_dot = np.zeros((r.size, n))
+            for mode in range(n_modes):
+                lam_k, c_k, w0_k, V_k = lam[r, mode], c[j, mode], w0[j, mode], V[r, :, mode]
+                if n_modes == 2:
+                    lam_k, c_k, w0_k, V_k = lam_k.real, c_k.real, w0_k.real, V_k.real
+                w = linear_recursion(lam_k, c_k[:, None] * Z[r], w0_k)
+                y += (V_k[:, 0, None] * w).real
+                y_dot += (V_k[:, 1, None] * w).real
+            if n_modes == 1:
+                # conjugate mode contributes the complex conjugate
+                y *= 2.0
+                y_dot *= 2.0
+            Y[r], Y_dot[r] = y, y_dot
+
+    return Y, Y_dot
+
+
+def as_kalman_configs(cfgs: Sequence[KalmanRunConfig] | np.ndarray) -> list[KalmanRunConfig]:
+    if isinstance(cfgs, np.ndarray) and cfgs.dtype.names is not None:
+        names = [f.name for f in fields(KalmanRunConfig) if f.name in cfgs.dtype.names]
+        return [KalmanRunConfig(**{k: row[k].item() for k in names}) for row in cfgs.ravel()]
+    return list(cfgs)
+
+
+def run_batched_kalman(
+    t_s: np.ndarray,
+    x: np.ndarray,
+    cfgs: Sequence[KalmanRunConfig] | np.ndarray,
+    *,
+    steady_state: bool = True,
+    rtol: float = 1e-6,
+) -> tuple[np.ndarray, np.ndarray]:
+    # Runs every config against x in one sweep over time, with the filter
+    # state held as one NumPy vector per quantity (one entry per config).
+    # x is either a shared (n,) trace or one (configs, n) row per config.
+    # Returns (configs, n) arrays of y and y_dot.
+    #
+    # With steady_state=True, non-bleed configs on a uniform time base (see
+    # is_uniform_time_base for rtol) take their steady-state gain from
+    # solve_steady_state_gain, run the filter at the mean dt only until
+    # their own gain has settled on it (_settling_rows) and finish on the
+    # steady-state recursion; rows with missing samples stay on the exact
+    # loop.
+    #
+    # Tolerance: on an exact float64 grid y is within ~1e-12 * max|x| of
+    # run_procedural_kalman (1e-13 typical) and y_dot within ~1e-12 of
+    # max|y_dot|, up to ~1e-9 for extreme noise ratios whose velocity mode
+    # never settles. Timestamp jitter adds the same error as in
+    # run_steady_state_kalman, since the fast rows use the mean dt.
+    #
+    # Cost: O(n) NumPy work per row, a few times one run_procedural_kalman
+    # for a couple of hundred configs (e.g. 200 configs x 130k samples take
+    # 3-5 procedural runs' time), most of it in the steady-state tail.
+    cfg_list = as_kalman_configs(cfgs)
+    m = len(cfg_list)
+    x = np.asarray(x, dtype=float)
+    n = x.shape[-1]
+    X = np.broadcast_to(x, (m, n))
+
+    Y = np.empty((m, n), dtype=float)
+    Y_dot = np.empty((m, n), dtype=float)
+    if m == 0 or n == 0:
+        return Y, Y_dot
+
+    rows = np.arange(m)
+    if steady_state and n >= 3 and is_uniform_time_base(t_s, rtol=rtol):
+        dt_s = float(t_s[-1] - t_s[0]) / (n - 1)
+        K0, K1, S = solve_steady_state_gain(
+            dt_s,
+            np.array([c.r_x for c in cfg_list], dtype=float),
+            np.array([c.q_x for c in cfg_list], dtype=float),
+            np.array([c.q_x_dot for c in cfg_list], dtype=float),
+        )
+        bleed = np.array([c.bleed_enable for c in cfg_list], dtype=bool)
+        psd = np.array(
+            [c.p00 >= 0.0 and c.p11 >= 0.0 and c.p01 * c.p01 <= c.p00 * c.p11 and c.q_x >= 0.0 and c.q_x_dot >= 0.0
+             for c in cfg_list],
+            dtype=bool,
+        )
+        fast = ~bleed & psd & np.isfinite(K0) & np.isfinite(K1) & np.isfinite(X).all(axis=1)
+        if fast.any():
+            f = np.flatnonzero(fast)
+            settled_at = _settling_rows(dt_s, X, f, [cfg_list[i] for i in f], K0[f], K1[f], S[f], Y, Y_dot)
+            # each row's steady-state tail starts after its own settle index
+            for s in np.unique(settled_at[settled_at < n - 1]).tolist():
+                r = f[settled_at == s]
+                Y[r, s + 1:], Y_dot[r, s + 1:] = _steady_state_tail(
+                    dt_s, K0[r], K1[r], X[r, s + 1:], np.stack([Y[r, s], Y_dot[r, s]], axis=-1)
+                )
+        rows = np.flatnonzero(~fast)
+
+    if rows.size > _MIN_VECTOR_ROWS:
+        Y[rows], Y_dot[rows] = _run_kalman_rows(t_s, X[rows], [cfg_list[i] for i in rows])
+    else:
+        # a handful of rows is cheaper through the scalar loop
+        for i in rows:
+            Y[i], Y_dot[i] = run_procedural_kalman(t_s, X[i], cfg_list[i])
+    return Y, Y_dot
+
+
+def run_multichannel_kalman(
+    ts: MultiChannelTimeSeries,
+    cfgs: Sequence[KalmanRunConfig] | Mapping[str, KalmanRunConfig],
+    *,
+    steady_state: bool = True,
+) -> tuple[np.ndarray, np.ndarray]:
+    # One config per channel, either in channel order or keyed by name.
+    # All channels are filtered in a single run_batched_kalman sweep.
+    if isinstance(cfgs, Mapping):
+        missing = [c for c in ts.channels if c not in cfgs]
+        if missing:
+            raise ValueError(f"No KalmanRunConfig for channels: {missing}")
+        cfg_list = [cfgs[c] for c in ts.channels]
+    else:
+        cfg_list = as_kalman_configs(cfgs)
+        if len(cfg_list) != len(ts.channels):
+            raise ValueError(f"Expected {len(ts.channels)} configs, got {len(cfg_list)}")
+
+    return run_batched_kalman(ts.t, ts.X, cfg_list, steady_state=steady_state)
+
+
+def _run_kalman_rows(
+    t_s: np.ndarray,
+    X: np.ndarray,
+    cfgs: list[KalmanRunConfig],
+) -> tuple[np.ndarray, np.ndarray]:
+    # Row-vectorized transcription of run_procedural_kalman.
+    m, n = X.shape
+    Y = np.empty((m, n), dtype=float)
+    Y_dot = np.empty((m, n), dtype=float)
+    if n == 0:
+        return Y, Y_dot
+
+    # Rows that open with missing samples start at their first finite one,
+    # as the procedural filter does; each start index runs as its own batch.
+    finite = np.isfinite(X)
+    start = np.where(finite.any(axis=1), finite.argmax(axis=1), n)
+    if start.any():
+        for s0 in np.unique(start):
+            r = np.flatnonzero(start == s0)
+            Y[r, :s0] = X[r, :s0]
+            Y_dot[r, :s0] = 0.0
+            if s0 < n:
+                Y[r, s0:], Y_dot[r, s0:] = _run_kalman_rows(t_s[s0:], X[r, s0:], [cfgs[i] for i in r])
+        return Y, Y_dot
+
+    def col(name: str, dtype=float) -> np.ndarray:
+        return np.array([getattr(c, name) for c in cfgs], dtype=dtype)
+
+    r_x, q_x, q_x_dot = col("r_x"), col("q_x"), col("q_x_dot")
+    bleed_enable = col("bleed_enable", bool)
+    bleed_thresh, bleed_factor = col("bleed_thresh"), col("bleed_factor")
+    any_bleed = bool(bleed_enable.any())
+
+    x_pred = X[:, 0].copy()
+    x_dot_pred = np.zeros(m)
+
+    P00 = col("p00")
+    P01 = col("p01")
+    P10 = P01.copy()
+    P11 = col("p11")
+
+    Y[:, 0] = x_pred
+    Y_dot[:, 0] = x_dot_pred
+
+    dts = np.diff(np.asarray(t_s, dtype=float)).tolist()
     for k in range(1, n):
-        dt_s = float(t_s[k] - t_s[k - 1])
+        dt_s = dts[k - 1]
         if not np.isfinite(dt_s) or dt_s <= 0.0:
             # pass-through
-            y[k] = float(x[k])
-            y_dot[k] = 0.0
+            Y[:, k] = X[:, k]
+            Y_dot[:, k] = 0.0
             continue
 
         # PREDICT
         x_pred = x_pred + (dt_s * x_dot_pred)
 
-        # Tracking covariance (scalar expanded intentionally avoiding matrices)
         xcov00 = (P00 + dt_s * P10) + dt_s * (P01 + dt_s * P11)
         xcov01 = (P01 + dt_s * P11)
         xcov10 = (P10 + dt_s * P11)
-        xcov11 = (P11)
+        xcov11 = P11
 
-        # Accounting for process noise
-        xcov00 = xcov00 + cfg.q_x
-        xcov11 = xcov11 + cfg.q_x_dot
+        xcov00 = xcov00 + q_x
+        xcov11 = xcov11 + q_x_dot
 
         # UPDATE
-        y_res = float(x[k] - x_pred)
-        S = xcov00 + cfg.r_x
+        xk = X[:, k]
+        y_res = xk - x_pred
+        S = xcov00 + r_x
+        ok = (S > 0.0) & np.isfinite(S) & np.isfinite(y_res)
 
-        if S > 0.0 and np.isfinite(S):
-            K0 = xcov00 / S
-            K1 = xcov10 / S
+        K0 = xcov00 / S
+        K1 = xcov10 / S
 
-            x_pred = x_pred + (K0 * y_res)
-            x_dot_pred = x_dot_pred + (K1 * y_res)
+        x_upd = x_pred + (K0 * y_res)
+        x_dot_upd = x_dot_pred + (K1 * y_res)
 
-            if cfg.bleed_enable:
-                if abs(x[k] - x_pred) < cfg.bleed_thresh:
-                    x_dot_pred = x_dot_pred * cfg.bleed_factor
+        if any_bleed:
+            bleed = bleed_enable & (np.abs(xk - x_upd) < bleed_thresh)
+            x_dot_upd = np.where(bleed, x_dot_upd * bleed_factor, x_dot_upd)
 
-            # Tracking covariance
-            P00 = (1.0 - K0) * xcov00
-            P01 = (1.0 - K0) * xcov01
-            P10 = xcov10 - (K1 * xcov00)
-            P11 = xcov11 - (K1 * xcov01)
+        P00_upd = (1.0 - K0) * xcov00
+        P01_upd = (1.0 - K0) * xcov01
+        P11_upd = xcov11 - (K1 * xcov01)
 
-            # Enforcing symmetry
-            P10 = P01
+        if ok.all():
+            x_pred, x_dot_pred = x_upd, x_dot_upd
+            P00, P01, P11 = P00_upd, P01_upd, P11_upd
+        else:
+            x_pred = np.where(ok, x_upd, x_pred)
+            x_dot_pred = np.where(ok, x_dot_upd, x_dot_pred)
+            P00 = np.where(ok, P00_upd, P00)
+            P01 = np.where(ok, P01_upd, P01)
+            P11 = np.where(ok, P11_upd, P11)
+        P10 = P01
 
-        y[k] = x_pred
-        y_dot[k] = x_dot_pred
+        Y[:, k] = x_pred
+        Y_dot[:, k] = x_dot_pred
 
-    return y, y_dot
+    return Y, Y_dot
@@ -2,15 +2,97 @@ from __future__ import annotations
 
 import numpy as np
 
+# Largest |ln a| * block length used by linear_recursion, keeping a**-j finite.
+_LOG_RANGE = 600.0
+
+
+class StreamingMoments:
+    # Count, mean and sum of squared deviations (M2) of the finite values
+    # seen so far. Chunks are reduced two-pass and folded in with Chan's
+    # pairwise update, so large offsets do not cancel and partial results
+    # from separate workers merge exactly.
+
+    def __init__(self):
+        self.n = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+
+    def update(self, x: np.ndarray) -> "StreamingMoments":
+        x = np.asarray(x, dtype=float).ravel()
+        x = x[np.isfinite(x)]
+        if x.size:
+            mean = float(np.mean(x))
+            d = x - mean
+            self._fold(x.size, mean, float(np.dot(d, d)))
+        return self
+
+    def merge(self, other: "StreamingMoments") -> "StreamingMoments":
+        if other.n:
+            self._fold(other.n, other.mean, other.m2)
+        return self
+
+    def _fold(self, n_b: int, mean_b: float, m2_b: float) -> None:
+        n_a = self.n
+        n = n_a + n_b
+        delta = mean_b - self.mean
+        self.mean += delta * (n_b / n)
+        self.m2 += m2_b + delta * delta * (n_a * n_b / n)
+        self.n = n
+
+    def variance(self, ddof: int = 1) -> float:
+        return self.m2 / (self.n - ddof) if self.n > ddof else float("nan")
+
+
+class StreamingSpanStats:
+    # Chunked equivalent of rx_from_steady_span + qx_dot_from_ramp_span_excel_like:
+    # moments of the finite samples and of their second differences. The last
+    # two finite samples carry over between chunks; merge() joins a stats
+    # object for the data immediately following this one.
+
+    def __init__(self):
+        self.x = StreamingMoments()
+        self.dv = StreamingMoments()
+        self._head = np.empty(0)
+        self._tail = np.empty(0)
+
+    def update(self, chunk: np.ndarray) -> "StreamingSpanStats":
+        chunk = np.asarray(chunk, dtype=float).ravel()
+        xf = chunk[np.isfinite(chunk)]
+        if xf.size:
+            self.x.update(xf)
+            seq = np.concatenate((self._tail, xf))
+            self.dv.update(np.diff(seq, n=2))
+            if self._head.size < 2:
+                self._head = seq[:2]
+            self._tail = seq[-2:]
+        return self
+
+    def merge(self, other: "StreamingSpanStats") -> "StreamingSpanStats":
+        self.x.merge(other.x)
+        self.dv.update(np.diff(np.concatenate((self._tail, other._head)), n=2))
+        self.dv.merge(other.dv)
+        self._head = np.concatenate((self._head, other._head))[:2]
+        self._tail = np.concatenate((self._tail, other._tail))[-2:]
+        return self
+
+    def r_x(self) -> tuple[float, float]:
+        if self.x.n < 3:
+            return float("nan"), float("nan")
+        var = self.x.variance()
+        sigma = float(np.sqrt(var)) if np.isfinite(var) and var >= 0 else float("nan")
+        return var, sigma
+
+    def q_x_dot(self) -> tuple[float, int]:
+        if self.x.n < 4:
+            return float("nan"), 0
+        if self.dv.n < 2:
+            return float("nan"), int(self.dv.n)
+        return self.dv.variance(), int(self.dv.n)
+
 
 def sample_variance_excel(x: np.ndarray) -> float:
-    x = x[np.isfinite(x)]
-    n = x.size
-    if n < 2:
-        return float("nan")
-    s1 = float(np.sum(x))
-    s2 = float(np.sum(x * x))
-    return (s2 / (n - 1)) - (s1 * s1) / (n * (n - 1))
+    # Same result as Excel's VAR.S, without the sum-of-squares cancellation.
+    return StreamingMoments().update(x).variance()
 
 
 def median_dt_seconds(t_s: np.ndarray) -> float:
@@ -42,4 +124,134 @@ def qx_dot_from_ramp_span_excel_like(x: np.ndarray, a: int, b: int) -> tuple[flo
     dv_s = dv_s[np.isfinite(dv_s)]
     if dv_s.size < 2:
         return float("nan"), int(dv_s.size)
-    return float(sample_variance_excel(dv_s)), int(dv_s.size)
\ No newline at end of file
+    return float(sample_variance_excel(dv_s)), int(dv_s.size)
+
+
+def rolling_variance(v: np.ndarray, window: int) -> np.ndarray:
+    # Sample variance (ddof=1) of every full window v[s:s+window], s = 0..n-window.
+    # Running sums restart every `window` samples about the block mean, so
+    # rounding tracks the local spread of the data, not the trace's whole
+    # history. Each window spans at most two blocks; the second block's sums
+    # are re-centred onto the first block's mean before combining.
+    v = np.asarray(v, dtype=float)
+    L = int(window)
+    n = v.size
+    if L < 2:
+        raise ValueError("window must be >= 2")
+    if n < L:
+        return np.empty(0)
+
+    nb = -(-n // L) + 1
+    pad = np.zeros(nb * L)
+    pad[:n] = v
+    cnt = np.clip(n - np.arange(nb) * L, 0, L)
+    c = pad.reshape(nb, L).sum(axis=1) / np.maximum(cnt, 1)
+
+    d = pad.reshape(nb, L) - c[:, None]
+    d.ravel()[n:] = 0.0
+    C1 = np.zeros((nb, L + 1))
+    C2 = np.zeros((nb, L + 1))
+    np.cumsum(d, axis=1, out=C1[:, 1:])
+    np.cumsum(d * d, axis=1, out=C2[:, 1:])
+
+    # window s = j*L + o: tail [o, L) of block j plus head [0, o) of block j+1
+    m = n - L + 1
+    o = np.arange(L, dtype=float)
+    delta = (c[1:] - c[:-1])[:, None]
+    a1 = C1[:-1, L:] - C1[:-1, :L]
+    b1 = C1[1:, :L]
+    s1 = (a1 + b1 + o * delta).ravel()[:m]
+    s2 = (C2[:-1, L:] - C2[:-1, :L] + C2[1:, :L] + 2.0 * delta * b1 + o * delta * delta).ravel()[:m]
+    return np.maximum(s2 - s1 * s1 / L, 0.0) / (L - 1)
+
+
+def linear_recursion(
+    a: complex | np.ndarray,
+    b: np.ndarray,
+    y0: complex | np.ndarray | None = None,
+    *,
+    max_block: int = 1024,
+) -> np.ndarray:
+    # y[k] = a * y[k-1] + b[k], with y[-1] = y0 (zero if None).
+    # a: scalar or (...,) per row, b: (..., n). Blocked scan: each block of L
+    # samples is solved with one cumsum (y = a^j * cumsum(a^-j * b)), then the
+    # block boundaries are chained by recursing on the n/L block end values.
+    # L is capped so a^-L stays finite, so the cost is O(n) for any |a|.
+    b = np.asarray(b)
+    dtype = np.result_type(a, b, float)
+    y = np.array(b, dtype=dtype, copy=True)
+    n = y.shape[-1]
+    batch = y.shape[:-1]
+    a = np.broadcast_to(np.asarray(a, dtype=dtype), batch)[..., None]
+    if n == 0:
+        return y
+    if y0 is not None:
+        y[..., 0] += a[..., 0] * np.asarray(y0, dtype=dtype)
+
+    mag = np.abs(a)
+    zero = mag < 1e-200
+    has_zero = bool(zero.any())
+    if has_zero:
+        b_y0 = y.copy()
+        a = np.where(zero, 1.0, a)
+        mag = np.where(zero, 1.0, mag)
+    log_mag = float(np.max(np.abs(np.log(mag)), initial=0.0))
+    L = max_block if log_mag == 0.0 else int(min(max(_LOG_RANGE / log_mag, 2), max_block))
+    L = min(L, n)
+
+    nb = -(-n // L)
+    if nb * L == n:
+        loc = y.reshape(batch + (nb, L))
+    else:
+        loc = np.zeros(batch + (nb * L,), dtype=dtype)
+        loc[..., :n] = y
+        loc = loc.reshape(batch + (nb, L))
+
+    if np.iscomplexobj(a):
+        # complex ** is several times slower than exp(j * log a)
+        apow = np.exp(np.log(a)[..., None] * np.arange(L))
+    else:
+        apow = a[..., None] ** np.arange(L)
+    loc *= 1.0 / apow
+    np.cumsum(loc, axis=-1, out=loc)
+    loc *= apow
+
+    if nb > 1:
+        ends = linear_recursion(a[..., 0] ** L, loc[..., :-1, -1], max_block=max_block)
+        loc[..., 1:, :] += (a[..., None] * apow) * ends[..., None]
+
+    out = loc.reshape(batch + (nb * L,))[..., :n]
+    if has_zero:
+        out = np.where(zero, b_y0, out)
+    return out
+
+
+def linear_state_recursion(
+    A: np.ndarray,
+    b: np.ndarray,
+    s0: np.ndarray | None = None,
+    *,
+    tol: float = 1e-17,
+) -> np.ndarray:
+    # s[k] = A @ s[k-1] + b[k], with s[-1] = s0 (zeros if None).
+    # A: (..., d, d), b: (..., n, d). Evaluated by recursive doubling so the
+    # work is log2(n) vectorized passes instead of a Python loop per sample;
+    # passes stop once A^m has decayed below tol (the dropped tail is exactly
+    # A^m @ s[k-m], i.e. relative error ~tol for a stable A).
+    A = np.asarray(A)
+    s = np.array(b, dtype=np.result_type(A, b, float), copy=True)
+    n = s.shape[-2]
+    if n == 0:
+        return s
+
+    if s0 is not None:
+        s0 = np.asarray(s0, dtype=s.dtype)
+        s[..., 0, :] += np.squeeze(A @ s0[..., :, None], axis=-1)
+
+    M = A
+    m = 1
+    while m < n and np.max(np.abs(M)) > tol:
+        s[..., m:, :] += s[..., :-m, :] @ np.swapaxes(M, -1, -2)
+        M = M @ M
+        m *= 2
+    return s
@@ -0,0 +1,227 @@
+from __future__ import annotations
+
+import socket
+import struct
+import time
+from typing import Callable, Optional, Tuple
+
+from ctrl.models import ActuatorParams, FOPDTParams, IPDTParams, PacingStats, SOPDTUnderdampedParams
+
+from .closed_loop_service import discrete_plant
+from .step_response_generator_service import PVModelType
+
+# exchange(scan, t_s, pv) -> cv, called once per scan
+Exchange = Callable[[int, float, float], float]
+
+
+class PlantSimulator:
+    # Streaming twin of simulate_step_response: step(cv) holds cv for one
+    # dt_s through the actuator (clip -> rate limit -> Euler lag, as
+    # actuator_block) and the exact ZOH plant, and returns the PV at the end
+    # of the scan. Dead time is a ring of past plant inputs, so every scan
+    # costs the same. Starts at rest: PV = pv0 with CV = cv0.
+    def __init__(
+        self,
+        model: PVModelType,
+        dt_s: float,
+        *,
+        fopdt: FOPDTParams | None = None,
+        ipdt: IPDTParams | None = None,
+        sopdt: SOPDTUnderdampedParams | None = None,
+        actuator: Optional[ActuatorParams] = None,
+        cv0: float = 0.0,
+        pv0: Optional[float] = None,
+    ):
+        if not (dt_s > 0):
+            raise ValueError("dt_s must be > 0")
+        self.model = model
+        self.dt_s = float(dt_s)
+        self.actuator = actuator
+        self.cv0 = float(cv0)
+        self.pv0 = float(pv0) if pv0 is not None else (float(actuator.pv0) if actuator is not None else 0.0)
+
+        Ad, b_cur, b_prev, m = discrete_plant(model, self.dt_s, fopdt=fopdt, ipdt=ipdt, sopdt=sopdt)
+        # plain floats: at one scan per call numpy's per-op overhead dominates
+        self._Ad = [[float(v) for v in row] for row in Ad]
+        self._b_cur = [float(v) for v in b_cur]
+        self._b_prev = [float(v) for v in b_prev]
+        self._ring_len = m + 2
+        self.deadtime_samples = m
+
+        if actuator is not None:
+            self._lo = float(actuator.pv_min)
+            self._hi = float(actuator.pv_max)
+            self._max_step = float(actuator.rate_limit) * self.dt_s
+            tau = float(actuator.tau_s)
+            self._lag = self.dt_s / max(tau, 1e-12) if tau > 0.0 else None
+        self.reset()
+
+    def reset(self) -> None:
+        self._x = [0.0] * len(self._b_cur)
+        self._ring = [0.0] * self._ring_len
+        self._k = 0
+        self._rl = self.cv0
+        self._act = self.cv0
+
+    @property
+    def scans(self) -> int:
+        return self._k
+
+    @property
+    def t_s(self) -> float:
+        return self._k * self.dt_s
+
+    @property
+    def pv(self) -> float:
+        return self.pv0 + self._x[0]
+
+    @property
+    def cv_eff(self) -> float:
+        return self._act
+
+    def step(self, cv: float) -> float:
+        u = float(cv)
+        if self.actuator is not None:
+            u = min(max(u, self._lo), self._hi)
+            if self._max_step > 0.0:
+                u = self._rl + min(max(u - self._rl, -self._max_step), self._max_step)
+                self._rl = u
+            if self._lag is not None:
+                u = self._act + self._lag * (u - self._act)
+        self._act = u
+
+        k, R = self._k, self._ring_len
+        ring = self._ring
+        ring[k % R] = u - self.cv0
+        v_cur = ring[(k - self.deadtime_samples) % R]
+        v_prev = ring[(k - 1 - self.deadtime_samples) % R]
+
+        x = self._x
+        self._x = [
+            sum(a * xj for a, xj in zip(row, x)) + bc * v_cur + bp * v_prev
+            for row, bc, bp in zip(self._Ad, self._b_cur, self._b_prev)
+        ]
+        self._k = k + 1
+        return self.pv
+
+
+def run_paced(
+    sim: PlantSimulator,
+    scans: int,
+    exchange: Exchange,
+    *,
+    period_s: Optional[float] = None,
+    spin_s: float = 0.0005,
+    clock: Callable[[], float] = time.perf_counter,
+    sleep: Callable[[float], None] = time.sleep,
+) -> PacingStats:
+    # Runs `scans` scans paced to the wall clock: scan k is due at
+    # start + k * period_s (default sim.dt_s), so lateness does not
+    # accumulate. Sleeps until spin_s before each deadline and busy-waits
+    # the rest, since sleep() alone overshoots by about a scheduler tick.
+    # Each scan passes the PV out through exchange() and steps the plant with
+    # the CV it returns.
+    period = float(period_s) if period_s is not None else sim.dt_s
+    if not (period > 0):
+        raise ValueError("period_s must be > 0")
+
+    n = 0
+    late_mean = late_m2 = late_max = 0.0
+    exec_sum = exec_max = 0.0
+    overruns = 0
+
+    start = clock()
+    for k in range(int(scans)):
+        deadline = start + k * period
+        remaining = deadline - clock()
+        if remaining > spin_s:
+            sleep(remaining - spin_s)
+        now = clock()
+        while now < deadline:
+            now = clock()
+
+        late = now - deadline
+        n += 1
+        d = late - late_mean
+        late_mean += d / n
+        late_m2 += d * (late - late_mean)
+        late_max = max(late_max, late)
+        if late > period:
+            overruns += 1
+
+        cv = exchange(sim.scans, sim.t_s, sim.pv)
+        sim.step(cv)
+
+        spent = clock() - now
+        exec_sum += spent
+        exec_max = max(exec_max, spent)
+
+    return PacingStats(
+        scans=n,
+        period_s=period,
+        late_mean_s=late_mean,
+        late_std_s=(late_m2 / (n - 1)) ** 0.5 if n > 1 else 0.0,
+        late_max_s=late_max,
+        overruns=overruns,
+        exec_mean_s=exec_sum / n if n else 0.0,
+        exec_max_s=exec_max,
+    )
+
+
+class UdpPlantEndpoint:
+    # Exchange for run_paced over UDP, for a PLC or soft controller:
+    #   controller -> simulator: "<d"   CV (the latest one received is held)
+    #   simulator -> controller: "<Qdd" scan, sim time [s], PV; every scan,
+    #                            to `peer`, or to whoever last sent a CV
+    # Non-blocking; a scan never waits on the network.
+    _CV = struct.Struct("<d")
+    _PV = struct.Struct("<Qdd")
+
+    def __init__(
+        self,
+        host: str = "127.0.0.1",
+        port: int = 0,
+        *,
+        peer: Optional[Tuple[str, int]] = None,
+        cv0: float = 0.0,
+    ):
+        self.cv = float(cv0)
+        self.peer = peer
+        self.received = 0
+        self._reply_to_sender = peer is None
+        self._sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self._sock.bind((host, int(port)))
+        self._sock.setblocking(False)
+
+    @property
+    def address(self) -> Tuple[str, int]:
+        return self._sock.getsockname()
+
+    def __call__(self, scan: int, t_s: float, pv: float) -> float:
+        while True:
+            try:
+                data, addr = self._sock.recvfrom(64)
+            except (BlockingIOError, InterruptedError):
+                break
+            except ConnectionResetError:
+                continue  # Windows reports an unreachable peer here
+            if len(data) == self._CV.size:
+                self.cv = self._CV.unpack(data)[0]
+                self.received += 1
+                if self._reply_to_sender:
+                    self.peer = addr
+        if self.peer is not None:
+            try:
+                self._sock.sendto(self._PV.pack(scan, t_s, pv), self.peer)
+            except OSError:
+                pass  # controller not listening yet; keep scanning
+        return self.cv
+
+    def close(self) -> None:
+        self._sock.close()
+
+    def __enter__(self) -> "UdpPlantEndpoint":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
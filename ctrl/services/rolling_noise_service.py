@@ -0,0 +1,33 @@
+from __future__ import annotations
+
+from typing import Optional
+
+import numpy as np
+
+from ctrl.models import RollingNoiseStats, TimeSeriesData
+from ctrl.services import rolling_variance
+
+
+def rolling_noise_stats(ts: TimeSeriesData, *, window: Optional[int] = None) -> RollingNoiseStats:
+    # r_x and q_x_dot of a sliding window of `window` finite samples, reported
+    # at the window's centre sample. Each value equals what compute_tuning
+    # would give for that window selected as a STEADY / RAMP span.
+    x = np.asarray(ts.x, dtype=float)
+    n = x.size
+    keep = np.flatnonzero(np.isfinite(x))
+    xf = x[keep]
+
+    w = int(window) if window is not None else int(np.clip(keep.size // 100, 32, 100_000))
+    if w < 4:
+        raise ValueError("window must be >= 4 samples")
+
+    r_x = np.full(n, np.nan)
+    q_x_dot = np.full(n, np.nan)
+
+    if xf.size >= w:
+        centre = keep[np.arange(xf.size - w + 1) + w // 2]
+        r_x[centre] = rolling_variance(xf, w)
+        # the w finite samples of a window give w - 2 second differences
+        q_x_dot[centre] = rolling_variance(np.diff(xf, n=2), w - 2)
+
+    return RollingNoiseStats(t=ts.t, r_x=r_x, q_x_dot=q_x_dot, window=w)
@@ -1,34 +1,94 @@
 from __future__ import annotations
 
-import csv
 import os
-import random
+
+import numpy as np
 
 from ctrl.models import RampHoldProfile
 
+# Samples generated and written per block by generate_signal_csv.
+_BLOCK = 1 << 16
 
-def ramp_hold_value(profile: RampHoldProfile, t_ms: int) -> float:
+
+def ramp_hold_values(profile: RampHoldProfile, t_ms: np.ndarray) -> np.ndarray:
+    # Vectorized ramp/hold evaluation; same arithmetic as the scalar form.
     period = profile.T_UP_MS + profile.T_HOLD_HI_MS + profile.T_DOWN_MS + profile.T_HOLD_LO_MS
-    u = t_ms % period
+    if period <= 0:
+        raise ValueError("Ramp/hold period must be > 0 ms")
+
+    u = np.mod(np.asarray(t_ms, dtype=np.int64), period)
+    span = profile.X_HI - profile.X_LO
 
-    if u < profile.T_UP_MS:
-        frac = u / max(profile.T_UP_MS, 1)
-        return profile.X_LO + frac * (profile.X_HI - profile.X_LO)
+    up = u < profile.T_UP_MS
+    hold_hi = ~up & (u < profile.T_UP_MS + profile.T_HOLD_HI_MS)
+    down_u = u - (profile.T_UP_MS + profile.T_HOLD_HI_MS)
+    down = ~up & ~hold_hi & (down_u < profile.T_DOWN_MS)
 
-    u -= profile.T_UP_MS
-    if u < profile.T_HOLD_HI_MS:
-        return profile.X_HI
+    x = np.full(u.shape, float(profile.X_LO))
+    x[hold_hi] = profile.X_HI
+    x[up] = profile.X_LO + (u[up] / max(profile.T_UP_MS, 1)) * span
+    x[down] = profile.X_HI - (down_u[down] / max(profile.T_DOWN_MS, 1)) * span
+    return x
+
+
+def ramp_hold_value(profile: RampHoldProfile, t_ms: int) -> float:
+    return float(ramp_hold_values(profile, np.array([t_ms]))[0])
 
-    u -= profile.T_HOLD_HI_MS
-    if u < profile.T_DOWN_MS:
-        frac = u / max(profile.T_DOWN_MS, 1)
-        return profile.X_HI - frac * (profile.X_HI - profile.X_LO)
 
-    return profile.X_LO
+def signal_sample_count(dt_ms: int, seconds: int) -> int:
+    if int(dt_ms) <= 0:
+        raise ValueError("DT_MS must be > 0")
+    if int(seconds) <= 0:
+        raise ValueError("SECONDS must be > 0")
+    return int((int(seconds) * 1000) / int(dt_ms))
+
+
+def iter_signal_blocks(
+    n: int,
+    *,
+    dt_ms: int,
+    profile: RampHoldProfile,
+    noise_amp: float,
+    rng_seed: int,
+    time_unit_seconds: bool = True,
+    block: int = _BLOCK,
+):
+    # (t, x) blocks of the generated signal. The noise comes from one
+    # default_rng stream drawn block by block, which yields the same values
+    # as a single draw of n, so any prefix is reproducible on its own.
+    sigma_x = float(noise_amp) / 3.0
+    rng = np.random.default_rng(int(rng_seed))
+    dt_ms = int(dt_ms)
+
+    for lo in range(0, n, block):
+        t_ms = np.arange(lo, min(lo + block, n), dtype=np.int64) * dt_ms
+        x = ramp_hold_values(profile, t_ms) + rng.normal(0.0, sigma_x, size=t_ms.size)
+        t = (t_ms / 1000.0) if time_unit_seconds else t_ms.astype(float)
+        yield t, x
 
 
-def gaussian_noise(sigma: float, rng: random.Random) -> float:
-    return rng.gauss(0.0, sigma)
+def signal_preview(
+    *,
+    dt_ms: int = 50,
+    seconds: int = 20,
+    profile: RampHoldProfile = RampHoldProfile(),
+    noise_amp: float = 10.0,
+    rng_seed: int = 12345,
+    time_unit_seconds: bool = True,
+    max_samples: int | None = None,
+) -> tuple[np.ndarray, np.ndarray]:
+    # The first min(n, max_samples) samples exactly as generate_signal_csv writes them.
+    n = signal_sample_count(dt_ms, seconds)
+    if max_samples is not None:
+        n = min(n, int(max_samples))
+    blocks = list(iter_signal_blocks(
+        n, dt_ms=dt_ms, profile=profile, noise_amp=noise_amp, rng_seed=rng_seed,
+        time_unit_seconds=time_unit_seconds,
+    ))
+    if not blocks:
+        return np.empty(0), np.empty(0)
+    t, x = zip(*blocks)
+    return np.concatenate(t), np.concatenate(x)
 
 
 def get_app_dir() -> str:
@@ -44,25 +104,31 @@ def generate_signal_csv(
     noise_amp: float = 10.0,
     rng_seed: int = 12345,
     time_unit_seconds: bool = True,
+    out_dir: str | None = None,
 ) -> str:
-    app_dir = get_app_dir()
-    out_path = os.path.join(app_dir, out_filename)
+    out_path = os.path.join(out_dir if out_dir is not None else get_app_dir(), out_filename)
 
-    sigma_x = float(noise_amp) / 3.0
-    rng = random.Random(int(rng_seed))
+    n = signal_sample_count(dt_ms, seconds)
+    write_signal_blocks(out_path, iter_signal_blocks(
+        n, dt_ms=dt_ms, profile=profile, noise_amp=noise_amp, rng_seed=rng_seed,
+        time_unit_seconds=time_unit_seconds,
+    ))
+    return out_path
 
-    total_samples = int((int(seconds) * 1000) / int(dt_ms))
 
+def write_signal_blocks(out_path: str, blocks) -> int:
+    # Writes (t, x) blocks as a "time,x" CSV; returns the number of rows.
+    rows = np.empty(0)
+    total = 0
     with open(out_path, "w", newline="") as f:
-        w = csv.writer(f)
-        w.writerow(["time", "x"])
-
-        for i in range(total_samples):
-            t_ms = i * int(dt_ms)
-            x_true = ramp_hold_value(profile, t_ms)
-            x_meas = x_true + gaussian_noise(sigma_x, rng)
-
-            t_out = (t_ms / 1000.0) if time_unit_seconds else float(t_ms)
-            w.writerow([f"{t_out:.6f}", f"{x_meas:.6f}"])
-
-    return out_path
+        f.write("time,x\r\n")
+        for t, x in blocks:
+            m = t.size
+            if rows.size < 2 * m:
+                rows = np.empty(2 * m)
+            rows[0:2 * m:2] = t
+            rows[1:2 * m:2] = x
+            # one %-format call per block; csv.writer's default \r\n row ending
+            f.write(("%.6f,%.6f\r\n" * m) % tuple(rows[:2 * m].tolist()))
+            total += m
+    return total
@@ -0,0 +1,276 @@
+from __future__ import annotations
+
+import math
+from typing import Optional, Sequence
+
+import numpy as np
+
+from .math_helpers import linear_recursion
+from .signal_pipeline_service import SignalStage
+
+# Impairments are ordinary pipeline stages, so they run block by block in a
+# SignalPipeline or over a whole recording at once with apply_stages(). Each
+# draws from its own default_rng stream in fixed-size pieces, so the output
+# does not depend on how the signal is split into blocks.
+
+
+def apply_stages(t: np.ndarray, x: np.ndarray, stages: Sequence[SignalStage]) -> tuple[np.ndarray, np.ndarray]:
+    # One pass of freshly reset stages over existing arrays, e.g. to impair
+    # a loaded recording: x through apply(), then t through retime().
+    t = np.asarray(t, dtype=float)
+    x = np.asarray(x, dtype=float)
+    for stage in stages:
+        stage.reset()
+    for stage in stages:
+        x = stage.apply(t, x)
+    t_out = t
+    for stage in stages:
+        t_out = stage.retime(t_out)
+    return t_out, x
+
+
+class AR1NoiseStage(SignalStage):
+    # First-order autoregressive noise e[k] = phi * e[k-1] + w[k], scaled so
+    # its stationary standard deviation is sigma. Starts in steady state.
+    def __init__(self, sigma: float, phi: float, *, seed: Optional[int] = None):
+        if sigma < 0:
+            raise ValueError("Noise sigma must be >= 0")
+        if not (-1.0 < phi < 1.0):
+            raise ValueError("AR(1) phi must be in (-1, 1)")
+        self.sigma = float(sigma)
+        self.phi = float(phi)
+        self.seed = seed
+        self.reset()
+
+    def reset(self):
+        self._rng = np.random.default_rng(self.seed)
+        self._e: Optional[float] = None
+
+    def apply(self, t, x):
+        if t.size == 0:
+            return x
+        w = self._rng.standard_normal(t.size) * (self.sigma * math.sqrt(1.0 - self.phi ** 2))
+        if self._e is None:
+            # first sample drawn from the stationary distribution
+            w[0] *= 1.0 / math.sqrt(1.0 - self.phi ** 2)
+        e = linear_recursion(self.phi, w, self._e)
+        self._e = float(e[-1])
+        return x + e
+
+
+class PinkNoiseStage(SignalStage):
+    # Approximately 1/f noise: the sum of `poles` AR(1) processes of equal
+    # variance whose corner frequencies are one octave apart, from half the
+    # sample rate down. The spectrum falls as 1/f across those octaves and
+    # flattens below the lowest corner. sigma is the total standard deviation.
+    def __init__(self, sigma: float, *, poles: int = 12, seed: Optional[int] = None):
+        if sigma < 0:
+            raise ValueError("Noise sigma must be >= 0")
+        if poles < 1:
+            raise ValueError("poles must be >= 1")
+        self.sigma = float(sigma)
+        self.poles = int(poles)
+        self.seed = seed
+        # corner at fs / 2^(i+1)  ->  phi_i = exp(-2 pi fc / fs)
+        self._phi = np.exp(-2.0 * np.pi / 2.0 ** (np.arange(self.poles) + 1))
+        self._gain = np.sqrt(1.0 - self._phi ** 2)
+        self.reset()
+
+    def reset(self):
+        self._rng = np.random.default_rng(self.seed)
+        self._e: Optional[np.ndarray] = None
+
+    def apply(self, t, x):
+        if t.size == 0:
+            return x
+        w = self._rng.standard_normal((t.size, self.poles)).T * self._gain[:, None]
+        if self._e is None:
+            w[:, 0] /= self._gain
+        # one pole at a time: linear_recursion sizes its blocks for the
+        # fastest-decaying row, which would slow the slow poles down
+        total = np.zeros(t.size)
+        e_last = np.empty(self.poles)
+        for i in range(self.poles):
+            e = linear_recursion(self._phi[i], w[i], None if self._e is None else self._e[i])
+            e_last[i] = e[-1]
+            total += e
+        self._e = e_last
+        return x + total * (self.sigma / math.sqrt(self.poles))
+
+
+class QuantizeStage(SignalStage):
+    # ADC quantization to multiples of lsb (about lo when given), saturating
+    # at [lo, hi]. NaN passes through.
+    def __init__(self, lsb: float, *, lo: Optional[float] = None, hi: Optional[float] = None):
+        if not (lsb > 0):
+            raise ValueError("Quantization step must be > 0")
+        if lo is not None and hi is not None and hi < lo:
+            raise ValueError("Quantization range must have hi >= lo")
+        self.lsb = float(lsb)
+        self.lo = lo
+        self.hi = hi
+
+    @classmethod
+    def from_adc(cls, bits: int, lo: float, hi: float) -> "QuantizeStage":
+        if bits < 1:
+            raise ValueError("ADC bits must be >= 1")
+        return cls((hi - lo) / ((1 << int(bits)) - 1), lo=lo, hi=hi)
+
+    def apply(self, t, x):
+        origin = 0.0 if self.lo is None else float(self.lo)
+        y = np.round((x - origin) / self.lsb) * self.lsb + origin
+        if self.lo is not None or self.hi is not None:
+            y = np.clip(y, self.lo, self.hi)
+        return y
+
+
+class SampleHoldStage(SignalStage):
+    # Stale readings: the output only updates at the first sample of each
+    # period_s window (every sample when period_s is None), and each update
+    # is missed with probability p_stale, holding the previous value.
+    def __init__(
+        self,
+        period_s: Optional[float] = None,
+        *,
+        p_stale: float = 0.0,
+        seed: Optional[int] = None,
+        t0: float = 0.0,
+    ):
+        if period_s is not None and not (period_s > 0):
+            raise ValueError("Hold period must be > 0 s")
+        if not (0.0 <= p_stale < 1.0):
+            raise ValueError("p_stale must be in [0, 1)")
+        self.period_s = period_s
+        self.p_stale = float(p_stale)
+        self.seed = seed
+        self.t0 = float(t0)
+        self.reset()
+
+    def reset(self):
+        self._rng = np.random.default_rng(self.seed)
+        self._held: Optional[float] = None
+        self._window: Optional[int] = None
+
+    def apply(self, t, x):
+        n = t.size
+        if n == 0:
+            return x
+        if self.period_s is None:
+            update = np.ones(n, dtype=bool)
+        else:
+            g = np.floor((t - self.t0) / self.period_s + 1e-9).astype(np.int64)
+            prev = g[0] - 1 if self._window is None else self._window
+            update = np.diff(g, prepend=prev) != 0
+            self._window = int(g[-1])
+        if self.p_stale > 0.0:
+            update &= self._rng.random(n) >= self.p_stale
+        if self._held is None:
+            update[0] = True
+
+        last = np.maximum.accumulate(np.where(update, np.arange(n), -1))
+        y = np.where(last >= 0, x[np.maximum(last, 0)], self._held if self._held is not None else np.nan)
+        self._held = float(y[-1])
+        return y
+
+
+class DropoutStage(SignalStage):
+    # NaN dropouts in bursts: about `fraction` of all samples are lost, in
+    # runs of mean_len samples on average (geometric lengths and gaps).
+    _BATCH = 256
+
+    def __init__(self, fraction: float, *, mean_len: float = 1.0, seed: Optional[int] = None):
+        if not (0.0 <= fraction < 1.0):
+            raise ValueError("Dropout fraction must be in [0, 1)")
+        if mean_len < 1.0:
+            raise ValueError("mean_len must be >= 1 sample")
+        self.fraction = float(fraction)
+        self.mean_len = float(mean_len)
+        self.seed = seed
+        # gaps are geometric on {0, 1, ...} with mean L (1 - f) / f
+        self._p_gap = self.fraction / (self.fraction + self.mean_len * (1.0 - self.fraction))
+        self.reset()
+
+    def reset(self):
+        self._rng = np.random.default_rng(self.seed)
+        self._k = 0  # samples seen
+        self._edges = np.empty(0, dtype=np.int64)  # pending state flips
+        self._tail = 0  # last flip drawn
+        self._dropping = False  # state before _edges[0]
+
+    def _extend(self, k1: int) -> None:
+        # Edges come in (burst start, burst end) pairs drawn in fixed-size
+        # batches, so the stream is independent of the block sizes.
+        parts = [self._edges]
+        while self._tail < k1:
+            lens = np.empty(2 * self._BATCH, dtype=np.int64)
+            lens[0::2] = self._rng.geometric(self._p_gap, self._BATCH) - 1
+            lens[1::2] = self._rng.geometric(1.0 / self.mean_len, self._BATCH)
+            edges = self._tail + np.cumsum(lens)
+            parts.append(edges)
+            self._tail = int(edges[-1])
+        self._edges = np.concatenate(parts)
+
+    def apply(self, t, x):
+        n = t.size
+        if n == 0 or self.fraction == 0.0:
+            self._k += n
+            return x
+        k0, k1 = self._k, self._k + n
+        self._extend(k1)
+
+        # state at k is the parity of the flips at or before k
+        k = np.arange(k0, k1, dtype=np.int64)
+        flips = np.searchsorted(self._edges, k, side="right")
+        drop = (flips % 2 == 1) ^ self._dropping
+
+        done = int(np.searchsorted(self._edges, k1, side="right"))
+        self._dropping ^= bool(done % 2)
+        self._edges = self._edges[done:]
+        self._k = k1
+        return np.where(drop, np.nan, x)
+
+
+class SpikeStage(SignalStage):
+    # Isolated outliers: each sample is hit with probability p, offset by
+    # +/- amplitude with equal odds.
+    def __init__(self, p: float, amplitude: float, *, seed: Optional[int] = None):
+        if not (0.0 <= p <= 1.0):
+            raise ValueError("Spike probability must be in [0, 1]")
+        self.p = float(p)
+        self.amplitude = float(amplitude)
+        self.seed = seed
+        self.reset()
+
+    def reset(self):
+        self._rng = np.random.default_rng(self.seed)
+
+    def apply(self, t, x):
+        u = self._rng.random(t.size)
+        hit = u < self.p
+        sign = np.where(u < 0.5 * self.p, -1.0, 1.0)
+        return np.where(hit, x + sign * self.amplitude, x)
+
+
+class TimestampJitterStage(SignalStage):
+    # Gaussian error on the recorded timestamps only; the signal itself is
+    # still sampled on the nominal grid. max_abs_s clips the error (keep it
+    # under dt / 2 to preserve sample order).
+    def __init__(self, sigma_s: float, *, max_abs_s: Optional[float] = None, seed: Optional[int] = None):
+        if sigma_s < 0:
+            raise ValueError("Jitter sigma must be >= 0")
+        self.sigma_s = float(sigma_s)
+        self.max_abs_s = max_abs_s
+        self.seed = seed
+        self.reset()
+
+    def reset(self):
+        self._rng = np.random.default_rng(self.seed)
+
+    def apply(self, t, x):
+        return x
+
+    def retime(self, t):
+        j = self._rng.normal(0.0, self.sigma_s, size=t.size)
+        if self.max_abs_s is not None:
+            np.clip(j, -self.max_abs_s, self.max_abs_s, out=j)
+        return t + j
@@ -0,0 +1,291 @@
+from __future__ import annotations
+
+import abc
+import math
+from typing import Iterator, Optional, Sequence
+
+import numpy as np
+
+from ctrl.models import RampHoldProfile
+
+from .signal_generator_service import ramp_hold_values, write_signal_blocks
+
+# Samples per block; memory use is a few arrays of this length whatever n is.
+_BLOCK = 1 << 16
+
+
+class SignalStage(abc.ABC):
+    # One link of a SignalPipeline. apply(t, x) gets a block of sample times
+    # (seconds, increasing across calls) and the previous stage's output and
+    # returns this stage's output. State carried between blocks lives on the
+    # stage and is cleared by reset(), so a run does not depend on how it is
+    # split into blocks (beyond rounding in running sums). retime() maps the
+    # nominal times to the recorded ones once every stage has seen them.
+    def reset(self) -> None:
+        pass
+
+    @abc.abstractmethod
+    def apply(self, t: np.ndarray, x: np.ndarray) -> np.ndarray:
+        ...
+
+    def retime(self, t: np.ndarray) -> np.ndarray:
+        return t
+
+
+class RampHoldStage(SignalStage):
+    def __init__(self, profile: RampHoldProfile = RampHoldProfile(), *, t0: float = 0.0):
+        self.profile = profile
+        self.t0 = float(t0)
+
+    def apply(self, t, x):
+        t_ms = np.rint((t - self.t0) * 1000.0).astype(np.int64)
+        return x + ramp_hold_values(self.profile, t_ms)
+
+
+class StepStage(SignalStage):
+    def __init__(self, amplitude: float, *, t_step: float = 0.0):
+        self.amplitude = float(amplitude)
+        self.t_step = float(t_step)
+
+    def apply(self, t, x):
+        return x + np.where(t >= self.t_step, self.amplitude, 0.0)
+
+
+class SineStage(SignalStage):
+    def __init__(self, amplitude: float, freq_hz: float, *, phase_rad: float = 0.0):
+        self.amplitude = float(amplitude)
+        self.freq_hz = float(freq_hz)
+        self.phase_rad = float(phase_rad)
+
+    def apply(self, t, x):
+        return x + self.amplitude * np.sin(2.0 * np.pi * self.freq_hz * t + self.phase_rad)
+
+
+class ChirpStage(SignalStage):
+    # Sweep from f0_hz to f1_hz over duration_s starting at t0, then either
+    # repeat the sweep or carry on at f1_hz with continuous phase.
+    # Zero before t0.
+    def __init__(
+        self,
+        amplitude: float,
+        f0_hz: float,
+        f1_hz: float,
+        duration_s: float,
+        *,
+        method: str = "linear",
+        t0: float = 0.0,
+        repeat: bool = False,
+    ):
+        if duration_s <= 0:
+            raise ValueError("Chirp duration must be > 0 s")
+        if method not in ("linear", "log"):
+            raise ValueError(f"Unknown chirp method: {method!r}")
+        if method == "log" and (f0_hz <= 0 or f1_hz <= 0):
+            raise ValueError("Log chirp frequencies must be > 0 Hz")
+        self.amplitude = float(amplitude)
+        self.f0_hz = float(f0_hz)
+        self.f1_hz = float(f1_hz)
+        self.duration_s = float(duration_s)
+        self.method = method
+        self.t0 = float(t0)
+        self.repeat = bool(repeat)
+
+    def _sweep_phase(self, tau):
+        # cycles elapsed after tau seconds of sweep, 0 <= tau <= duration_s
+        f0, f1, T = self.f0_hz, self.f1_hz, self.duration_s
+        if self.method == "linear" or f0 == f1:
+            return f0 * tau + 0.5 * (f1 - f0) / T * tau * tau
+        k = math.log(f1 / f0)
+        return f0 * T / k * np.expm1(k * tau / T)
+
+    def apply(self, t, x):
+        T = self.duration_s
+        tau = t - self.t0
+        if self.repeat:
+            cycles = self._sweep_phase(np.mod(tau, T))
+        else:
+            within = np.minimum(tau, T)
+            cycles = self._sweep_phase(within) + self.f1_hz * (tau - within)
+        y = self.amplitude * np.sin(2.0 * np.pi * cycles)
+        return x + np.where(tau >= 0.0, y, 0.0)
+
+
+class PRBSStage(SignalStage):
+    # Maximal-length pseudo-random binary sequence from a Fibonacci LFSR on
+    # the primitive trinomial x^order + x^m + 1, each bit held for bit_s:
+    # +amplitude for a one, -amplitude for a zero. The period is
+    # 2^order - 1 bits; seed picks the starting state.
+    _TAPS = {7: 6, 9: 5, 10: 7, 11: 9, 15: 14, 17: 14, 18: 11, 20: 17, 23: 18, 31: 28}
+
+    def __init__(self, amplitude: float, *, bit_s: float, order: int = 7, seed: int = 1, t0: float = 0.0):
+        if order not in self._TAPS:
+            raise ValueError(f"PRBS order must be one of {sorted(self._TAPS)}")
+        if bit_s <= 0:
+            raise ValueError("PRBS bit time must be > 0 s")
+        self.amplitude = float(amplitude)
+        self.bit_s = float(bit_s)
+        self.order = int(order)
+        self.seed = int(seed)
+        self.t0 = float(t0)
+
+        # s[k] = s[k - order] ^ s[k - lag], with lag the larger of the two
+        # equivalent tap spacings. Squaring the polynomial over GF(2) keeps
+        # the recurrence valid with both lags scaled by 2^j, so a whole
+        # stride of 2^j * lag bits comes out of one xor.
+        n = self.order
+        self._lag = max(self._TAPS[n], n - self._TAPS[n])
+        j = max(0, math.ceil(math.log2(1024 / self._lag)))
+        self._depth = n << j
+        self._stride = self._lag << j
+        self.reset()
+
+    def reset(self):
+        n = self.order
+        state = self.seed % ((1 << n) - 1) + 1
+        bits = np.zeros(self._depth, dtype=np.uint8)
+        bits[:n] = [(state >> i) & 1 for i in range(n)]
+        for k in range(n, self._depth, self._lag):
+            e = min(k + self._lag, self._depth)
+            bits[k:e] = bits[k - n:e - n] ^ bits[k - self._lag:e - self._lag]
+        self._hist = bits
+        self._next = self._depth  # absolute index of the bit after _hist
+
+    def _bits(self, i0: int, i1: int) -> np.ndarray:
+        # bits i0..i1 inclusive; i0 may not fall behind the history kept
+        depth, stride = self._depth, self._stride
+        base = self._next - depth
+        if i0 < base:
+            raise ValueError("PRBSStage needs non-decreasing sample times")
+        buf = self._hist
+        need = i1 + 1 - self._next
+        if need > 0:
+            buf = np.concatenate((buf, np.empty(need, dtype=np.uint8)))
+            for k in range(depth, buf.size, stride):
+                e = min(k + stride, buf.size)
+                buf[k:e] = buf[k - depth:e - depth] ^ buf[k - stride:e - stride]
+            self._hist = buf[-depth:]
+            self._next += need
+        return buf[i0 - base:i1 + 1 - base]
+
+    def apply(self, t, x):
+        if t.size == 0:
+            return x
+        # tiny bias so a sample landing on a bit edge is not floored back
+        idx = np.floor((t - self.t0) / self.bit_s + 1e-9).astype(np.int64)
+        idx = np.maximum(idx, 0)
+        i0 = int(idx.min())
+        bits = self._bits(i0, int(idx.max()))
+        return x + self.amplitude * (2.0 * bits[idx - i0] - 1.0)
+
+
+class DriftStage(SignalStage):
+    # Linear drift of rate_per_s from t0, plus an optional random walk whose
+    # standard deviation grows as walk_sigma * sqrt(elapsed seconds).
+    def __init__(
+        self,
+        rate_per_s: float = 0.0,
+        *,
+        walk_sigma: float = 0.0,
+        seed: Optional[int] = None,
+        t0: float = 0.0,
+    ):
+        self.rate_per_s = float(rate_per_s)
+        self.walk_sigma = float(walk_sigma)
+        self.seed = seed
+        self.t0 = float(t0)
+        self.reset()
+
+    def reset(self):
+        self._rng = np.random.default_rng(self.seed)
+        self._t_last: Optional[float] = None
+        self._level = 0.0
+
+    def apply(self, t, x):
+        y = x + self.rate_per_s * (t - self.t0)
+        if self.walk_sigma == 0.0 or t.size == 0:
+            return y
+        prev = t[0] if self._t_last is None else self._t_last
+        dt = np.diff(t, prepend=prev)
+        steps = self._rng.standard_normal(t.size) * (self.walk_sigma * np.sqrt(np.maximum(dt, 0.0)))
+        walk = self._level + np.cumsum(steps)
+        self._level = float(walk[-1])
+        self._t_last = float(t[-1])
+        return y + walk
+
+
+class NoiseStage(SignalStage):
+    # White Gaussian noise; one default_rng stream across blocks.
+    def __init__(self, sigma: float, *, seed: Optional[int] = None):
+        if sigma < 0:
+            raise ValueError("Noise sigma must be >= 0")
+        self.sigma = float(sigma)
+        self.seed = seed
+        self.reset()
+
+    def reset(self):
+        self._rng = np.random.default_rng(self.seed)
+
+    def apply(self, t, x):
+        return x + self._rng.normal(0.0, self.sigma, size=t.size)
+
+
+class SignalPipeline:
+    # Stages applied in order to a zero signal on the uniform time base
+    # t = t0 + k * dt_s, one block at a time. then() chains another stage.
+    def __init__(
+        self,
+        stages: Sequence[SignalStage] = (),
+        *,
+        dt_s: float,
+        t0: float = 0.0,
+        block: int = _BLOCK,
+    ):
+        if not (dt_s > 0):
+            raise ValueError("dt_s must be > 0")
+        if block < 1:
+            raise ValueError("block must be >= 1")
+        self.stages = tuple(stages)
+        self.dt_s = float(dt_s)
+        self.t0 = float(t0)
+        self.block = int(block)
+
+    def then(self, stage: SignalStage) -> "SignalPipeline":
+        return SignalPipeline(self.stages + (stage,), dt_s=self.dt_s, t0=self.t0, block=self.block)
+
+    def sample_count(self, seconds: float) -> int:
+        if seconds <= 0:
+            raise ValueError("seconds must be > 0")
+        return int(math.floor(seconds / self.dt_s + 1e-9))
+
+    def reset(self) -> None:
+        for stage in self.stages:
+            stage.reset()
+
+    def iter_blocks(self, n: int) -> Iterator[tuple[np.ndarray, np.ndarray]]:
+        # Restarts every stage, then yields (t, x) blocks covering n samples.
+        self.reset()
+        for lo in range(0, int(n), self.block):
+            k = np.arange(lo, min(lo + self.block, int(n)), dtype=np.int64)
+            t = self.t0 + k * self.dt_s
+            x = np.zeros(k.size)
+            for stage in self.stages:
+                x = stage.apply(t, x)
+            for stage in self.stages:
+                t = stage.retime(t)
+            yield t, x
+
+    def render(self, n: int) -> tuple[np.ndarray, np.ndarray]:
+        t = np.empty(int(n))
+        x = np.empty(int(n))
+        lo = 0
+        for tb, xb in self.iter_blocks(n):
+            t[lo:lo + tb.size] = tb
+            x[lo:lo + xb.size] = xb
+            lo += tb.size
+        return t, x
+
+    def write_csv(self, out_path: str, n: int, *, time_unit_seconds: bool = True) -> int:
+        blocks = self.iter_blocks(n)
+        if not time_unit_seconds:
+            blocks = ((t * 1000.0, x) for t, x in blocks)
+        return write_signal_blocks(out_path, blocks)
@@ -0,0 +1,201 @@
+from __future__ import annotations
+
+from typing import Optional, Tuple
+
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+from ctrl.models import SpanCandidate, SpanSelections, TimeSeriesData
+
+
+def _window_stats(x: np.ndarray, w: int, hop: int, *, chunk_elems: int = 1 << 20):
+    # Least-squares line through each window x[i*hop : i*hop + w]:
+    # returns mean, slope (per sample) and residual variance.
+    win = sliding_window_view(x, w)[::hop]
+    m = win.shape[0]
+
+    j = np.arange(w) - 0.5 * (w - 1)
+    s_jj = w * (w * w - 1.0) / 12.0
+
+    mean = np.empty(m)
+    slope = np.empty(m)
+    resid = np.empty(m)
+    rows = max(1, chunk_elems // w)
+    for lo in range(0, m, rows):
+        blk = win[lo:lo + rows]
+        d = blk - blk[:, :1]
+        mu = d.mean(axis=1)
+        d -= mu[:, None]
+        beta = (d @ j) / s_jj
+        m2 = np.einsum("ij,ij->i", d, d) - beta * beta * s_jj
+        mean[lo:lo + rows] = mu + blk[:, 0]
+        slope[lo:lo + rows] = beta
+        resid[lo:lo + rows] = np.maximum(m2, 0.0) / (w - 2)
+
+    return mean, slope, resid, s_jj
+
+
+def _pick_window(x: np.ndarray, *, w_min: int = 16, w_max: int = 1 << 16, break_f: float = 10.0,
+                 max_break_frac: float = 0.1):
+    # Largest window that still fits inside most segments. Each window at
+    # 2w is made of two windows at w (hop w / 2), so a Chow F-test of one
+    # line against two tells whether it straddles a corner. Doubles w until
+    # more than max_break_frac of the 2w windows do; returns w and its stats.
+    n = x.size
+    floor = (1e-9 * float(np.max(np.abs(x)))) ** 2 if n else 0.0
+    w = w_min
+    stats = _window_stats(x, w, w // 2)
+    while 2 * w <= min(w_max, n // 4):
+        nxt = _window_stats(x, 2 * w, w)
+        rss = stats[2] * (w - 2)
+        m = nxt[2].size
+        halves = rss[0:2 * m:2] + rss[2:2 * m + 2:2] + floor * w
+        f = (nxt[2] * (2 * w - 2) - halves) / 2.0 / (halves / (2 * w - 4))
+        if np.mean(f > break_f) > max_break_frac:
+            break
+        w, stats = 2 * w, nxt
+    return w, stats
+
+
+def _runs(mean, slope, s2, s_jj: float, hop: int, w: int, z: float, slope_rtol: float):
+    # [first, last] window of each run. A window extends the current run
+    # while its slope agrees with the run's own slope (the mean of its
+    # windows) within z standard errors plus slope_rtol, and its mean lies
+    # on the run's line from the previous window. Comparing against the run
+    # rather than the neighbour keeps runs from creeping through the
+    # gradual slope change across a corner.
+    line_tol = z * np.sqrt(s2 * (2.0 / w))
+    se2 = s2 / s_jj
+    mean, slope, se2, line_tol = (a.tolist() for a in (mean, slope, se2, line_tol))
+
+    first = [0]
+    slope_sum, se2_sum, count = slope[0], se2[0], 1
+    for i in range(1, len(slope)):
+        beta = slope_sum / count
+        tol = z * (se2[i] + se2_sum / (count * count)) ** 0.5 + slope_rtol * max(abs(slope[i]), abs(beta))
+        step = mean[i] - mean[i - 1] - beta * hop
+        if abs(slope[i] - beta) <= tol and abs(step) <= max(line_tol[i - 1], line_tol[i]):
+            slope_sum += slope[i]
+            se2_sum += se2[i]
+            count += 1
+        else:
+            first.append(i)
+            slope_sum, se2_sum, count = slope[i], se2[i], 1
+
+    first = np.array(first)
+    last = np.append(first[1:] - 1, len(slope) - 1)
+    return first, last
+
+
+def _run_sums(values: np.ndarray, first: np.ndarray, last: np.ndarray) -> np.ndarray:
+    c = np.concatenate(([0.0], np.cumsum(values)))
+    return c[last + 1] - c[first]
+
+
+def detect_span_candidates(
+    ts: TimeSeriesData,
+    *,
+    window: Optional[int] = None,
+    max_candidates: int = 5,
+    steady_drift: float = 3.0,
+    ramp_drift: float = 10.0,
+    z: float = 4.0,
+    slope_rtol: float = 0.02,
+) -> Tuple[Tuple[SpanCandidate, ...], Tuple[SpanCandidate, ...]]:
+    # Rank STEADY and RAMP spans, best first.
+    # Half-overlapping windows get a least-squares line each. Unless given,
+    # the window is picked from the data (_pick_window), so it follows the
+    # segment lengths rather than the recording length. Consecutive windows
+    # form a run while they agree with the run's slope and line (_runs).
+    # Each run is then classified by
+    # drift = |slope| * run length / residual sigma:
+    #   steady: drift < steady_drift, no noisier than 3x the median window
+    #   ramp:   drift > ramp_drift
+    # Runs of a single window are dropped.
+    # Non-finite samples are dropped first, as the span statistics do.
+    x = np.asarray(ts.x, dtype=float)
+    keep = np.flatnonzero(np.isfinite(x))
+    xf = x[keep]
+    n = xf.size
+    if window is not None:
+        w = int(window)
+        if w < 4:
+            raise ValueError("window must be >= 4 samples")
+        if n < 2 * w:
+            return (), ()
+        mean, slope, s2, s_jj = _window_stats(xf, w, max(w // 2, 1))
+    else:
+        if n < 32:
+            return (), ()
+        w, (mean, slope, s2, s_jj) = _pick_window(xf)
+    hop = max(w // 2, 1)
+
+    s = np.sqrt(s2)
+    noisy = s[s > 0.0]
+    sigma_ref = float(np.median(noisy)) if noisy.size else 0.0
+
+    first, last = _runs(mean, slope, s2, s_jj, hop, w, z, slope_rtol)
+    # The outer windows of a run can still hold a few samples of the
+    # neighbouring segment; drop them where the run has windows to spare.
+    inner = last - first >= 2
+    first = first + (inner & (first > 0))
+    last = last - (inner & (last < slope.size - 1))
+    count = (last - first + 1).astype(float)
+    length = (last - first) * hop + w
+    var_run = _run_sums(s2, first, last) / count
+    beta_run = _run_sums(slope, first, last) / count
+    sigma_run = np.sqrt(var_run)
+
+    # Judged against the typical noise too, so a quiet (or noiseless) run
+    # that absorbed a corner window is not mistaken for a slow ramp.
+    sigma_drift = np.maximum(sigma_run, sigma_ref)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        drift = np.where(sigma_drift > 0.0, np.abs(beta_run) * length / sigma_drift,
+                         np.where(beta_run == 0.0, 0.0, np.inf))
+        noise_ratio = np.where(var_run > 0.0, np.minimum(1.0, sigma_ref ** 2 / var_run), 1.0)
+
+    # A lone window is usually a corner between two segments.
+    merged = count >= 2
+    steady = merged & (drift < steady_drift) & (sigma_run <= 3.0 * sigma_ref)
+    ramp = merged & (drift > ramp_drift)
+    scores = {
+        "steady": np.where(steady, length * noise_ratio, -np.inf),
+        "ramp": np.where(ramp, length.astype(float), -np.inf),
+    }
+
+    dt = float(ts.dt_s)
+    per_s = 1.0 / dt if np.isfinite(dt) and dt > 0 else float("nan")
+    out = []
+    for kind in ("steady", "ramp"):
+        score = scores[kind]
+        best = np.argsort(-score, kind="stable")[:max_candidates]
+        best = best[np.isfinite(score[best])]
+        out.append(tuple(
+            SpanCandidate(
+                kind=kind,
+                a=int(keep[first[i] * hop]),
+                b=int(keep[last[i] * hop + w - 1]) + 1,
+                score=float(score[i]),
+                slope_per_s=float(beta_run[i] * per_s),
+                sigma_x=float(sigma_run[i]),
+            )
+            for i in best
+        ))
+
+    return out[0], out[1]
+
+
+def suggest_spans(
+    ts: TimeSeriesData,
+    spans: Optional[SpanSelections] = None,
+    **kwargs,
+) -> SpanSelections:
+    # Apply the top-ranked candidate of each kind; kinds with no candidate
+    # keep whatever selection they already had.
+    spans = spans if spans is not None else SpanSelections()
+    steady, ramp = detect_span_candidates(ts, max_candidates=1, **kwargs)
+    if steady:
+        spans.set_span("steady", steady[0].a, steady[0].b)
+    if ramp:
+        spans.set_span("ramp", ramp[0].a, ramp[0].b)
+    return spans
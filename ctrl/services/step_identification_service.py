@@ -6,6 +6,8 @@ from typing import Optional, Tuple, Literal
 import numpy as np
 
 from ctrl.models import StepIdResult, StepTuneSelections
+from ctrl.services import default_csv_cache
+from ctrl.services.csv_service import pick_column, sniff_csv_dialect
 
 PVModelType = Literal["FOPDT", "IPDT", "SOPDT_UNDERDAMPED"]
 TuningMethod = Literal["IMC_PID", "IMC_PI", "SIMC_PI"]
@@ -28,49 +30,61 @@ def load_step_csv(
     time_col: str = "time",
     cv_col: Optional[str] = "CV",
     pv_col: str = "PV",
+    use_cache: bool = True,
 ) -> StepSeries:
-    try:
-        data = np.genfromtxt(path, delimiter=",", names=True, dtype=float, encoding="utf-8")
-        cols = list(data.dtype.names or [])
-        if not cols:
-            raise ValueError("No header detected")
-
-        def pick(primary: Optional[str], alts: Tuple[str, ...]) -> Optional[np.ndarray]:
-            colset = set(cols)
-            if primary and primary in colset:
-                return np.asarray(data[primary], float)
-            for a in alts:
-                if a in colset:
-                    return np.asarray(data[a], float)
-            return None
-
-        t = pick(time_col, ("t", "Time", "TIME", "seconds", "sec", "Secs", "s"))
-        pv = pick(pv_col, ("pv", "PV", "y", "Y", "process", "Process", "feedback", "Feedback"))
-        cv = None
-        if cv_col is not None:
-            cv = pick(cv_col, ("CO", "co", "cv", "CV", "u", "U", "command", "Command",
-                               "control", "Control", "output", "Output", "CO%", "CV%"))
-
-    except Exception:
-        import pandas as pd
-        df = pd.read_csv(path)
-        cols = [c.strip() for c in df.columns]
-        colmap = {c.strip(): c for c in df.columns}
-
-        def pick(primary: Optional[str], alts: Tuple[str, ...]) -> Optional[np.ndarray]:
-            if primary and primary in colmap:
-                return df[colmap[primary]].to_numpy(dtype=float)
-            for a in alts:
-                if a in colmap:
-                    return df[colmap[a]].to_numpy(dtype=float)
-            return None
-
-        t = pick(time_col, ("t", "Time", "TIME", "seconds", "sec", "Secs", "s"))
-        pv = pick(pv_col, ("pv", "PV", "y", "Y", "process", "Process", "feedback", "Feedback"))
-        cv = None
-        if cv_col is not None:
-            cv = pick(cv_col, ("CO", "co", "cv", "CV", "u", "U", "command", "Command",
-                               "control", "Control", "output", "Output", "CO%", "CV%"))
+    if not use_cache:
+        return _parse_step_csv(path, time_unit, time_col, cv_col, pv_col)
+
+    def parse():
+        ts = _parse_step_csv(path, time_unit, time_col, cv_col, pv_col)
+        return {"t": ts.t, "cv": ts.cv, "pv": ts.pv}, {"dt_s": ts.dt_s}
+
+    options = {"time_unit": time_unit.lower(), "time_col": time_col, "cv_col": cv_col, "pv_col": pv_col}
+    arrays, meta = default_csv_cache().load(path, "load_step_csv", options, parse)
+    # cached arrays are read-only, so pv_raw can share pv's buffer
+    return StepSeries(
+        t=arrays["t"], cv=arrays["cv"], pv=arrays["pv"], pv_raw=arrays["pv"],
+        dt_s=float(meta["dt_s"]), source_path=path,
+    )
+
+
+_TIME_ALIASES = ("t", "Time", "TIME", "seconds", "sec", "Secs", "s")
+_PV_ALIASES = ("pv", "PV", "y", "Y", "process", "Process", "feedback", "Feedback")
+_CV_ALIASES = ("CO", "co", "cv", "CV", "u", "U", "command", "Command",
+               "control", "Control", "output", "Output", "CO%", "CV%")
+
+
+def _parse_step_csv(
+    path: str,
+    time_unit: str,
+    time_col: str,
+    cv_col: Optional[str],
+    pv_col: str,
+) -> StepSeries:
+    # One pass: sniff delimiter/decimal, resolve aliases against the header,
+    # then parse only the selected columns.
+    import pandas as pd
+
+    delimiter, decimal = sniff_csv_dialect(path)
+    read = dict(sep=delimiter, decimal=decimal, encoding="utf-8-sig")
+    cols = [str(c).strip() for c in pd.read_csv(path, nrows=0, **read).columns]
+
+    time_name = pick_column(cols, time_col, _TIME_ALIASES)
+    pv_name = pick_column(cols, pv_col, _PV_ALIASES)
+    cv_name = pick_column(cols, cv_col, _CV_ALIASES) if cv_col is not None else None
+
+    t = pv = cv = None
+    if time_name is not None and pv_name is not None:
+        use = list(dict.fromkeys(n for n in (time_name, pv_name, cv_name) if n is not None))
+        df = pd.read_csv(path, usecols=lambda c: str(c).strip() in use, **read)
+        df.columns = [str(c).strip() for c in df.columns]
+
+        def col(name: str) -> np.ndarray:
+            return pd.to_numeric(df[name], errors="coerce").to_numpy(dtype=float)
+
+        t = col(time_name)
+        pv = col(pv_name)
+        cv = col(cv_name) if cv_name is not None else None
 
     if t is None or pv is None:
         raise ValueError(f"CSV must include time and PV columns. Found columns: {cols}")
@@ -1,8 +1,9 @@
 from __future__ import annotations
 
-from typing import Literal, Tuple
+from dataclasses import fields
+from functools import lru_cache
+from typing import Dict, Literal, Mapping, Sequence, Tuple
 import os
-import csv
 import numpy as np
 
 from ctrl.models import (
@@ -11,8 +12,11 @@ from ctrl.models import (
     SOPDTUnderdampedParams,
     StepSpec,
     ActuatorParams,
+    StepResponseEnsemble,
 )
 
+from .math_helpers import linear_recursion, linear_state_recursion
+
 PVModelType = Literal["FOPDT", "IPDT", "SOPDT_UNDERDAMPED"]
 
 
@@ -37,86 +41,316 @@ def apply_deadtime(u: np.ndarray, dt_s: float, theta_s: float) -> np.ndarray:
 
 
 # Actuator
+def _ramp_end(u: np.ndarray, k: int, y: float, sgn: float, max_step: float) -> int:
+    # First m > k at which a ramp of max_step per sample from y (first step
+    # landing on sample k) stops saturating, i.e. |u[m] - out[m-1]| <= max_step
+    # on the ramp's side; len(u) if it never does. Searched in growing windows.
+    n = u.size
+    lo = k + 1
+    width = 64
+    while lo < n:
+        hi = min(n, lo + width)
+        gap = sgn * (u[lo:hi] - y) - max_step * (np.arange(lo, hi) - k + 1)
+        hit = np.flatnonzero(gap <= 0.0)
+        if hit.size:
+            return lo + int(hit[0])
+        lo = hi
+        width *= 2
+    return n
+
+
+def rate_limit(u: np.ndarray, max_step: float) -> np.ndarray:
+    # out[k] = out[k-1] + clip(u[k] - out[k-1], -max_step, max_step), out[0] = u[0].
+    # Python only steps between segments: stretches where the output tracks u
+    # are copied, and saturated stretches are written as closed-form ramps.
+    u = np.asarray(u, dtype=float)
+    n = u.size
+    out = np.empty_like(u)
+    if n == 0:
+        return out
+    out[0] = u[0]
+    jumps = np.flatnonzero(np.abs(np.diff(u)) > max_step) + 1
+    if 50 * jumps.size > n:
+        # saturating almost everywhere (e.g. noise): segments would be a
+        # sample or two long, so a plain loop over Python floats is faster
+        y = float(u[0])
+        vals = u.tolist()
+        for k in range(1, n):
+            du = vals[k] - y
+            if du > max_step:
+                du = max_step
+            elif du < -max_step:
+                du = -max_step
+            y += du
+            vals[k] = y
+        out[:] = vals
+        return out
+
+    k = 1
+    while k < n:
+        # tracking: out[k-1] == u[k-1], so the next saturation is the next jump
+        i = int(np.searchsorted(jumps, k))
+        nxt = int(jumps[i]) if i < jumps.size else n
+        out[k:nxt] = u[k:nxt]
+        k = nxt
+
+        # saturated, possibly reversing straight into the opposite ramp
+        while k < n:
+            y = float(out[k - 1])
+            du = u[k] - y
+            if abs(du) <= max_step:
+                out[k] = u[k]
+                k += 1
+                break
+            sgn = 1.0 if du > 0.0 else -1.0
+            end = _ramp_end(u, k, y, sgn, max_step)
+            out[k:end] = y + sgn * max_step * np.arange(1, end - k + 1)
+            k = end
+    return out
+
+
 def actuator_block(cv_cmd: np.ndarray, dt_s: float, p: ActuatorParams) -> np.ndarray:
     # 1) Saturation (kinda weird for what min is doing, but it allowed a good way to set the max)
     u = np.clip(cv_cmd, float(p.pv_min), float(p.pv_max))
 
     # 2) Rate limiting
     if float(p.rate_limit) > 0.0:
-        r = float(p.rate_limit)
-        out = np.empty_like(u)
-        out[0] = u[0]
-        max_step = r * dt_s
-        for k in range(1, len(u)):
-            du = u[k] - out[k - 1]
-            if du > max_step:
-                du = max_step
-            elif du < -max_step:
-                du = -max_step
-            out[k] = out[k - 1] + du
-        u = out
+        u = rate_limit(u, float(p.rate_limit) * dt_s)
 
     # 3) First-order lag
     tau = float(p.tau_s)
     if tau > 0.0:
-        out = np.empty_like(u)
-        out[0] = u[0]
         a = dt_s / max(tau, 1e-12)
-        # Stable Euler: y += a*(u - y) (its a circle complexly)
-        for k in range(1, len(u)):
-            out[k] = out[k - 1] + a * (u[k] - out[k - 1])
-        u = out
+        # Stable Euler: y += a*(u - y) (its a circle complexly), run as the
+        # recursion y[k] = (1 - a) y[k-1] + a u[k] from y[0] = u[0]
+        b = a * u
+        b[0] = u[0]
+        u = linear_recursion(1.0 - a, b)
     return u
 
 
-def simulate_fopdt(t: np.ndarray, u: np.ndarray, dt_s: float, p: FOPDTParams) -> np.ndarray:
-    tau = max(float(p.tau_s), 1e-9)
-    K = float(p.K)
-    y = np.zeros_like(t, dtype=float)
-    for k in range(1, len(t)):
-        ydot = (K * u[k - 1] - y[k - 1]) / tau
-        y[k] = y[k - 1] + dt_s * ydot
+# Plants, discretized exactly for a zero-order-hold input: each model is a
+# sum of first-order modes r / (s - lam), and mode i of the output obeys
+#   z[k] = e^(lam dt) z[k-1] + c_prev * u[k-2] + c_cur * u[k-1]
+# where c_prev/c_cur split the held sample across the sub-sample part of the
+# dead time (c_prev = 0 without one). Coefficients are computed once per
+# (params, dt, fraction) and the recursion runs through linear_recursion.
+
+
+def _phi(lam: complex, h: float) -> complex:
+    # integral of e^(lam s) over [0, h]
+    return np.expm1(lam * h) / lam if lam != 0 else h
+
+
+def _phi_rows(lam: np.ndarray, h: np.ndarray) -> np.ndarray:
+    safe = np.where(lam == 0, 1.0, lam)
+    return np.where(lam == 0, h, np.expm1(lam * h) / safe)
+
+
+@lru_cache(maxsize=256)
+def _zoh_mode(lam: complex, dt_s: float, frac_s: float) -> Tuple[complex, complex, complex]:
+    a = np.exp(lam * dt_s)
+    rest = dt_s - frac_s
+    c_cur = _phi(lam, rest)
+    c_prev = np.exp(lam * rest) * _phi(lam, frac_s) if frac_s > 0.0 else 0.0
+    return a, c_prev, c_cur
+
+
+def split_deadtime(dt_s: float, theta_s: float) -> Tuple[int, float]:
+    # theta = whole samples + a remainder in [0, dt)
+    dt_s = max(dt_s, 1e-12)
+    theta_s = max(theta_s, 0.0)
+    m = int(np.floor(theta_s / dt_s + 1e-9))
+    frac = theta_s - m * dt_s
+    return m, (frac if frac > 1e-9 * dt_s else 0.0)
+
+
+def _held_inputs(u: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    # u[k-1] and u[k-2] for every k, with u[0] held before the start; the
+    # k = 0 entries are zero so every plant starts at rest.
+    u = np.asarray(u, dtype=float)
+    u1 = np.zeros_like(u)
+    u2 = np.zeros_like(u)
+    u1[1:] = u[:-1]
+    u2[1:] = u[:-1]
+    u2[2:] = u[:-2]
+    return u1, u2
+
+
+def _modal_response(modes, u: np.ndarray, dt_s: float, frac_s: float) -> np.ndarray:
+    # modes: (lam, residue, conj); conj modes stand for themselves plus
+    # their complex conjugate, i.e. contribute 2 Re(residue * z).
+    u1, u2 = _held_inputs(u)
+    y = np.zeros(u1.shape, dtype=float)
+    for lam, residue, conj in modes:
+        a, c_prev, c_cur = _zoh_mode(lam, dt_s, frac_s)
+        b = c_cur * u1 + c_prev * u2 if c_prev != 0 else c_cur * u1
+        z = linear_recursion(a, b)
+        y += (2.0 if conj else 1.0) * (residue * z).real
     return y
 
-def simulate_ipdt(t: np.ndarray, u: np.ndarray, dt_s: float, p: IPDTParams) -> np.ndarray:
-    K = float(p.K)
+
+def simulate_fopdt(t: np.ndarray, u: np.ndarray, dt_s: float, p: FOPDTParams, *, delay_frac_s: float = 0.0) -> np.ndarray:
+    tau = max(float(p.tau_s), 1e-9)
+    return _modal_response(((-1.0 / tau, float(p.K) / tau, False),), u, dt_s, delay_frac_s)
+
+
+def simulate_ipdt(t: np.ndarray, u: np.ndarray, dt_s: float, p: IPDTParams, *, delay_frac_s: float = 0.0) -> np.ndarray:
     leak_tau = float(p.leak_tau_s)
+    lam = -1.0 / leak_tau if leak_tau > 1e-9 else 0.0  # pure integrator: a = 1
+    return _modal_response(((lam, float(p.K), False),), u, dt_s, delay_frac_s)
+
+
+def _expm2(A: np.ndarray, h: float) -> np.ndarray:
+    # e^(A h) for a real 2x2 A, closed form (smooth through repeated roots)
+    tr2 = 0.5 * np.trace(A)
+    mu = np.sqrt(complex(tr2 * tr2 - np.linalg.det(A)))
+    x = mu * h
+    sinh_over = h * (1.0 + x * x / 6.0) if abs(x) < 1e-4 else np.sinh(x) / mu
+    E = np.exp(tr2 * h) * (np.cosh(x) * np.eye(2) + sinh_over * (A - tr2 * np.eye(2)))
+    return E.real
+
+
+def zoh_state_space(A: np.ndarray, B: np.ndarray, dt_s: float, frac_s: float = 0.0):
+    # s[k] = Ad s[k-1] + b_cur u[k-1] + b_prev u[k-2] for a real invertible
+    # 2x2 A; the two input terms split the hold interval as in _zoh_mode.
+    A_inv = np.linalg.inv(A)
+    rest = dt_s - frac_s
+    Ad = _expm2(A, dt_s)
+    b_cur = A_inv @ (_expm2(A, rest) - np.eye(2)) @ B
+    b_prev = _expm2(A, rest) @ A_inv @ (_expm2(A, frac_s) - np.eye(2)) @ B
+    return Ad, b_cur, b_prev
 
-    y = np.zeros_like(t, dtype=float)
-    for k in range(1, len(t)):
-        if leak_tau > 1e-9:
-            ydot = K * u[k-1] - (y[k-1] / leak_tau)
-        else:
-            ydot = K * u[k-1]
-        y[k] = y[k-1] + dt_s * ydot
-    return y
 
-def simulate_sopdt_underdamped(t: np.ndarray, u: np.ndarray, dt_s: float, p: SOPDTUnderdampedParams) -> np.ndarray:
+def _state_response(A: np.ndarray, B: np.ndarray, u: np.ndarray, dt_s: float, frac_s: float) -> np.ndarray:
+    # Same ZOH recursion with the 2x2 state as a whole; used where the modal
+    # split would cancel badly (near-repeated poles).
+    Ad, b_cur, b_prev = zoh_state_space(A, B, dt_s, frac_s)
+    u1, u2 = _held_inputs(u)
+    s = linear_state_recursion(Ad, u1[:, None] * b_cur + u2[:, None] * b_prev)
+    return s[:, 0]
+
+
+def simulate_sopdt_underdamped(
+    t: np.ndarray,
+    u: np.ndarray,
+    dt_s: float,
+    p: SOPDTUnderdampedParams,
+    *,
+    delay_frac_s: float = 0.0,
+) -> np.ndarray:
     zeta = float(p.zeta)
     wn = max(float(p.wn), 1e-6)
     K = float(p.K)
 
-    y = np.zeros_like(t, dtype=float)
-    ydot = 0.0
-
-    for k in range(1, len(t)):
-        u_k = float(u[k - 1])
-        yddot = (-2.0 * zeta * wn) * ydot - (wn * wn) * y[k - 1] + (K * wn * wn) * u_k
-        ydot = ydot + dt_s * yddot
-        y[k] = y[k - 1] + dt_s * ydot
+    # K wn^2 / ((s - l1)(s - l2))
+    root = wn * np.sqrt(complex(zeta * zeta - 1.0))
+    if abs(zeta * zeta - 1.0) < 1e-4:
+        A = np.array([[0.0, 1.0], [-wn * wn, -2.0 * zeta * wn]])
+        B = np.array([0.0, K * wn * wn])
+        return _state_response(A, B, u, dt_s, delay_frac_s)
+
+    l1 = -zeta * wn + root
+    l2 = -zeta * wn - root
+    r1 = K * wn * wn / (l1 - l2)
+    if zeta < 1.0:
+        modes = ((l1, r1, True),)
+    else:
+        modes = ((l1.real, r1.real, False), (l2.real, -r1.real, False))
+    return _modal_response(modes, u, dt_s, delay_frac_s)
+
+
+def _delayed_held_inputs(u: np.ndarray, m: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    # _held_inputs of u delayed by m[i] whole samples, one row per run
+    k = np.arange(u.size)
+    u1 = u[np.clip(k - 1 - m[:, None], 0, None)]
+    u2 = u[np.clip(k - 2 - m[:, None], 0, None)]
+    u1[:, 0] = 0.0
+    u2[:, 0] = 0.0
+    return u1, u2
+
+
+def _modal_rows(lam, residue, weight, u, m, frac, dt_s) -> np.ndarray:
+    # One mode per row: weight * Re(residue * z) with per-row coefficients.
+    rest = dt_s - frac
+    a = np.exp(lam * dt_s)
+    c_cur = _phi_rows(lam, rest)
+    c_prev = np.exp(lam * rest) * _phi_rows(lam, frac)
+    u1, u2 = _delayed_held_inputs(u, m)
+    z = linear_recursion(a, c_cur[:, None] * u1 + c_prev[:, None] * u2)
+    return weight[:, None] * (residue[:, None] * z).real
+
+
+def _simulate_rows(model: str, cols: Dict[str, np.ndarray], u: np.ndarray, dt_s: float) -> np.ndarray:
+    dt = max(dt_s, 1e-12)
+    theta = np.maximum(cols["theta_s"], 0.0)
+    m = np.floor(theta / dt + 1e-9).astype(np.int64)
+    frac = theta - m * dt
+    frac = np.where(frac > 1e-9 * dt, frac, 0.0)
+    K = cols["K"]
+    ones = np.ones_like(K)
 
+    if model == "FOPDT":
+        tau = np.maximum(cols["tau_s"], 1e-9)
+        return _modal_rows(-1.0 / tau, K / tau, ones, u, m, frac, dt_s)
+    if model == "IPDT":
+        leak = cols["leak_tau_s"]
+        lam = np.where(leak > 1e-9, -1.0 / np.where(leak > 1e-9, leak, 1.0), 0.0)
+        return _modal_rows(lam, K, ones, u, m, frac, dt_s)
+
+    # SOPDT: as simulate_sopdt_underdamped, row by row where near-critical
+    zeta = cols["zeta"]
+    wn = np.maximum(cols["wn"], 1e-6)
+    root = wn * np.sqrt((zeta * zeta - 1.0).astype(complex))
+    l1 = -zeta * wn + root
+    l2 = -zeta * wn - root
+    near = np.abs(zeta * zeta - 1.0) < 1e-4
+    r1 = K * wn * wn / np.where(near, 1.0, l1 - l2)
+    over = (zeta > 1.0) & ~near
+
+    y = np.zeros((K.size, u.size))
+    ok = ~near
+    y[ok] = _modal_rows(l1[ok], r1[ok], np.where(over, 1.0, 2.0)[ok], u, m[ok], frac[ok], dt_s)
+    if over.any():
+        y[over] += _modal_rows(l2[over], -r1[over], ones[over], u, m[over], frac[over], dt_s)
+    for i in np.flatnonzero(near):
+        A = np.array([[0.0, 1.0], [-wn[i] * wn[i], -2.0 * zeta[i] * wn[i]]])
+        B = np.array([0.0, K[i] * wn[i] * wn[i]])
+        y[i] = _state_response(A, B, apply_deadtime(u, dt_s, m[i] * dt_s), dt_s, float(frac[i]))
     return y
 
 
-def simulate_step_response(
-    *,
-    spec: StepSpec,
-    actuator: ActuatorParams,
-    model: PVModelType,
-    fopdt: FOPDTParams | None = None,
-    ipdt: IPDTParams | None = None,
-    sopdt: SOPDTUnderdampedParams | None = None,
-) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+_MODEL_PARAMS = {
+    "FOPDT": FOPDTParams,
+    "IPDT": IPDTParams,
+    "SOPDT_UNDERDAMPED": SOPDTUnderdampedParams,
+}
+
+
+def _param_columns(model: str, params) -> Dict[str, np.ndarray]:
+    # A sequence of params dataclasses, or a mapping of field -> scalar or
+    # 1-D array (missing fields take the dataclass default), as columns.
+    if model not in _MODEL_PARAMS:
+        raise ValueError(f"Unknown model: {model}")
+    cls = _MODEL_PARAMS[model]
+    names = [f.name for f in fields(cls)]
+    if isinstance(params, Mapping):
+        unknown = set(params) - set(names)
+        if unknown:
+            raise ValueError(f"Unknown {model} parameters: {sorted(unknown)}")
+        default = cls()
+        raw = [params.get(name, getattr(default, name)) for name in names]
+    else:
+        params = list(params)
+        raw = [[getattr(p, name) for p in params] for name in names]
+
+    cols = np.broadcast_arrays(*(np.atleast_1d(np.asarray(v, dtype=float)) for v in raw))
+    if cols[0].ndim != 1 or cols[0].size == 0:
+        raise ValueError("Model parameters must broadcast to a non-empty 1-D batch")
+    return dict(zip(names, cols))
+
+
+def _step_inputs(spec: StepSpec, actuator: ActuatorParams):
     dt_s = max(float(spec.dt_s), 1e-6)
     n = int(round(float(spec.duration_s) / dt_s)) + 1
     if n < 2:
@@ -128,22 +362,70 @@ def simulate_step_response(
     cv_eff = actuator_block(cv_cmd, dt_s, actuator)
 
     u = cv_eff - float(spec.cv0)
+    return t, dt_s, cv_cmd, cv_eff, u
+
+
+def simulate_step_response_batch(
+    *,
+    spec: StepSpec,
+    actuator: ActuatorParams,
+    model: PVModelType,
+    params,
+    percentiles: Sequence[float] = (5.0, 50.0, 95.0),
+    max_block_elems: int = 1 << 22,
+) -> StepResponseEnsemble:
+    # Many parameter sets of one model against the same step and actuator,
+    # e.g. params={"K": rng.normal(2, 0.2, 10_000), "tau_s": ..., "theta_s": 0.3}.
+    # Runs are simulated together in blocks of rows; percentiles are taken
+    # across runs at every sample.
+    cols = _param_columns(model, params)
+    t, dt_s, cv_cmd, cv_eff, u = _step_inputs(spec, actuator)
+
+    runs = next(iter(cols.values())).size
+    pv = np.empty((runs, t.size))
+    rows = max(1, int(max_block_elems) // t.size)
+    for lo in range(0, runs, rows):
+        block = {k: v[lo:lo + rows] for k, v in cols.items()}
+        pv[lo:lo + rows] = _simulate_rows(model, block, u, dt_s)
+    pv += float(actuator.pv0)
+
+    q = tuple(float(v) for v in percentiles)
+    return StepResponseEnsemble(
+        model=model,
+        t=t,
+        cv_cmd=cv_cmd,
+        cv_eff=cv_eff,
+        pv=pv,
+        percentiles=q,
+        pv_percentiles=np.percentile(pv, q, axis=0) if q else np.empty((0, t.size)),
+        pv_mean=pv.mean(axis=0),
+    )
+
+
+def simulate_step_response(
+    *,
+    spec: StepSpec,
+    actuator: ActuatorParams,
+    model: PVModelType,
+    fopdt: FOPDTParams | None = None,
+    ipdt: IPDTParams | None = None,
+    sopdt: SOPDTUnderdampedParams | None = None,
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    t, dt_s, cv_cmd, cv_eff, u = _step_inputs(spec, actuator)
 
     if model == "FOPDT":
-        p = fopdt or FOPDTParams()
-        u_d = apply_deadtime(u, dt_s, float(p.theta_s))
-        y = simulate_fopdt(t, u_d, dt_s, p)
+        p, sim = fopdt or FOPDTParams(), simulate_fopdt
     elif model == "IPDT":
-        p = ipdt or IPDTParams()
-        u_d = apply_deadtime(u, dt_s, float(p.theta_s))
-        y = simulate_ipdt(t, u_d, dt_s, p)
+        p, sim = ipdt or IPDTParams(), simulate_ipdt
     elif model == "SOPDT_UNDERDAMPED":
-        p = sopdt or SOPDTUnderdampedParams()
-        u_d = apply_deadtime(u, dt_s, float(p.theta_s))
-        y = simulate_sopdt_underdamped(t, u_d, dt_s, p)
+        p, sim = sopdt or SOPDTUnderdampedParams(), simulate_sopdt_underdamped
     else:
         raise ValueError(f"Unknown model: {model}")
 
+    m, frac = split_deadtime(dt_s, float(p.theta_s))
+    u_d = apply_deadtime(u, dt_s, m * dt_s)
+    y = sim(t, u_d, dt_s, p, delay_frac_s=frac)
+
     pv = float(actuator.pv0) + y
     return t, cv_cmd, pv, cv_eff
 
@@ -155,14 +437,15 @@ def export_step_csv(
     cv_cmd: np.ndarray,
     pv: np.ndarray,
     time_unit_seconds: bool = True,
+    out_dir: str | None = None,
 ) -> str:
-    out_path = os.path.join(get_app_dir(), out_filename)
+    out_path = os.path.join(out_dir if out_dir is not None else get_app_dir(), out_filename)
 
+    t_out = np.asarray(t, dtype=float) if time_unit_seconds else np.asarray(t, dtype=float) * 1000.0
+    rows = np.column_stack((t_out, np.asarray(cv_cmd, dtype=float), np.asarray(pv, dtype=float)))
     with open(out_path, "w", newline="") as f:
-        w = csv.writer(f)
-        w.writerow(["time", "CV", "PV"])
-        for i in range(len(t)):
-            t_out = float(t[i]) if time_unit_seconds else float(t[i] * 1000.0)
-            w.writerow([f"{t_out:.6f}", f"{cv_cmd[i]:.6f}", f"{pv[i]:.6f}"])
+        f.write("time,CV,PV\r\n")
+        # one %-format call; csv.writer's default \r\n row ending
+        f.write(("%.6f,%.6f,%.6f\r\n" * len(rows)) % tuple(rows.ravel().tolist()))
 
     return out_path
@@ -1,5 +1,7 @@
 from __future__ import annotations
 
+from typing import Iterable, Optional, Tuple
+
 from ctrl.models import (
     TimeSeriesData,
     SpanSelections,
@@ -8,29 +10,79 @@ from ctrl.models import (
 
 import numpy as np
 
-from ctrl.services import rx_from_steady_span, qx_dot_from_ramp_span_excel_like
+from ctrl.services import StreamingSpanStats
+
+# Above this many samples the prefix-sum index (several float64 arrays the
+# size of x) would cost more memory than a memory-mapped trace saves, so
+# spans are reduced chunk by chunk instead.
+_INDEX_MAX_SAMPLES = 1 << 24
+_SPAN_CHUNK = 1 << 22
 
 
 def compute_tuning(ts: TimeSeriesData, spans: SpanSelections) -> TuningResult:
     steady_span = spans.steady.as_tuple()
     ramp_span = spans.ramp.as_tuple()
 
+    if ts.x.size > _INDEX_MAX_SAMPLES:
+        return compute_tuning_from_stats(
+            _span_stats(ts.x, steady_span),
+            _span_stats(ts.x, ramp_span),
+            ts.dt_s,
+            steady_span=steady_span,
+            ramp_span=ramp_span,
+        )
+
     r_x = float("nan")
     sigma_x = float("nan")
 
+    # O(1) per span once the prefix-sum index exists, so span drags stay cheap.
+    index = ts.span_index
+
     if steady_span is not None:
         a, b = steady_span
-        r_x, sigma_x = rx_from_steady_span(ts.x, a, b)
+        r_x, sigma_x = index.steady_variance(a, b)
 
     q_x_dot = float("nan")
     dv_count = 0
 
     if ramp_span is not None:
         a, b = ramp_span
-        q_x_dot, dv_count = qx_dot_from_ramp_span_excel_like(ts.x, a, b)
+        q_x_dot, dv_count = index.ramp_q_x_dot(a, b)
+
+    return _tuning_result(r_x, sigma_x, q_x_dot, dv_count, ts.dt_s, steady_span, ramp_span)
+
+
+def span_stats_from_chunks(chunks: Iterable[np.ndarray]) -> StreamingSpanStats:
+    stats = StreamingSpanStats()
+    for chunk in chunks:
+        stats.update(chunk)
+    return stats
+
+
+def _span_stats(x: np.ndarray, span: Optional[Tuple[int, int]]) -> Optional[StreamingSpanStats]:
+    if span is None:
+        return None
+    a, b = span
+    a, b = max(a, 0), min(b, x.size)
+    return span_stats_from_chunks(x[lo:min(lo + _SPAN_CHUNK, b)] for lo in range(a, b, _SPAN_CHUNK))
+
+
+def compute_tuning_from_stats(
+    steady: Optional[StreamingSpanStats],
+    ramp: Optional[StreamingSpanStats],
+    dt_s: float,
+    *,
+    steady_span: Optional[Tuple[int, int]] = None,
+    ramp_span: Optional[Tuple[int, int]] = None,
+) -> TuningResult:
+    # For spans too large to slice: accumulate each with StreamingSpanStats
+    # (per chunk, or per worker and merged) and build the result from those.
+    r_x, sigma_x = steady.r_x() if steady is not None else (float("nan"), float("nan"))
+    q_x_dot, dv_count = ramp.q_x_dot() if ramp is not None else (float("nan"), 0)
+    return _tuning_result(r_x, sigma_x, q_x_dot, dv_count, dt_s, steady_span, ramp_span)
 
-    dt = ts.dt_s
 
+def _tuning_result(r_x, sigma_x, q_x_dot, dv_count, dt, steady_span, ramp_span) -> TuningResult:
     if np.isfinite(q_x_dot) and np.isfinite(dt):
         q_x_user = q_x_dot * (dt ** 2)
         q_x_consistent = 0.25 * q_x_dot * (dt ** 2)
@@ -1,5 +1,6 @@
 from __future__ import annotations
 
+import os
 import tkinter as tk
 from tkinter import filedialog, messagebox
 import numpy as np
@@ -22,10 +23,22 @@ from ctrl.models import (
 
 from ctrl.services import (
     load_csv,
+    load_csv_memmap,
     compute_tuning,
+    auto_tune_kalman,
+    suggest_spans,
     export_spans_json,
 )
 
+# CSVs larger than this are converted once to memory-mapped arrays.
+MEMMAP_CSV_BYTES = 512 * 1024 * 1024
+
+
+def open_series(path: str, time_unit: str) -> TimeSeriesData:
+    if os.path.getsize(path) > MEMMAP_CSV_BYTES:
+        return load_csv_memmap(path, time_unit=time_unit)
+    return load_csv(path, time_unit=time_unit)
+
 
 class Ctrl:
     def __init__(self):
@@ -57,6 +70,8 @@ class Ctrl:
             on_time_unit_changed=self.on_time_unit_changed,
             on_span_selected=self.on_span_selected,
             on_tuning_changed=self.on_tuning_changed,
+            on_auto_tune=self.on_auto_tune,
+            on_auto_spans=self.on_auto_spans,
         )
 
         self.signal_generator_page = SignalGeneratorPage(
@@ -95,7 +110,7 @@ class Ctrl:
             return
 
         try:
-            self.ts = load_csv(path, time_unit=self.view.time_unit())
+            self.ts = open_series(path, self.view.time_unit())
         except Exception as e:
             messagebox.showerror("Load error", str(e))
             return
@@ -112,12 +127,19 @@ class Ctrl:
         if self.ts is None:
             return
         try:
-            self.ts = load_csv(self.ts.source_path, time_unit=self.view.time_unit())
+            if isinstance(self.ts.t, np.memmap) and self.ts.t_raw is None:
+                # rescaling in memory would materialize t; the other unit
+                # has (or gets) its own memory-mapped copy
+                self.ts = load_csv_memmap(self.ts.source_path, time_unit=self.view.time_unit())
+            else:
+                self.ts = self.ts.with_time_unit(self.view.time_unit())
         except Exception as e:
             messagebox.showerror("Time unit error", str(e))
             return
 
+        # Spans are sample indices, so they carry over unchanged.
         self.view.plot.set_series(self.ts.t, self.ts.x)
+        self.view.plot.set_spans(self.spans.steady.as_tuple(), self.spans.ramp.as_tuple())
         self.recompute()
 
     def on_span_selected(self, span_type: str, a: int, b: int) -> None:
@@ -130,6 +152,24 @@ class Ctrl:
         self.view.plot.set_spans(self.spans.steady.as_tuple(), self.spans.ramp.as_tuple())
         self.recompute()
 
+    def on_auto_spans(self) -> None:
+        if self.ts is None:
+            messagebox.showinfo("Nothing to scan", "Load a CSV first.")
+            return
+
+        try:
+            suggest_spans(self.ts, self.spans)
+        except Exception as e:
+            messagebox.showerror("Span detection error", str(e))
+            return
+
+        if not (self.spans.steady.is_valid() or self.spans.ramp.is_valid()):
+            messagebox.showinfo("Auto spans", "No steady or ramp span found.")
+            return
+
+        self.view.plot.set_spans(self.spans.steady.as_tuple(), self.spans.ramp.as_tuple())
+        self.recompute()
+
     def on_tuning_changed(self) -> None:
         st = self.view.tuning_controls.get_state()
         try:
@@ -145,6 +185,20 @@ class Ctrl:
 
         self.recompute()
 
+    def on_auto_tune(self) -> None:
+        if self.ts is None:
+            messagebox.showinfo("Nothing to tune", "Load a CSV first.")
+            return
+
+        try:
+            tuned = auto_tune_kalman(self.ts, self.result)
+        except Exception as e:
+            messagebox.showerror("Auto-tune error", str(e))
+            return
+
+        self.view.tuning_controls.set_manual(r_x=tuned.r_x, q_x=tuned.q_x, q_x_dot=tuned.q_x_dot)
+        self.on_tuning_changed()
+
     def on_export_json(self) -> None:
         if self.ts is None:
             messagebox.showinfo("Nothing to export", "Load a CSV first.")
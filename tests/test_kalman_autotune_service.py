@@ -0,0 +1,53 @@
+import numpy as np
+import pytest
+
+from ctrl.models import TimeSeriesData, TuningResult
+from ctrl.services import auto_tune_kalman
+
+R_X, Q_X, Q_X_DOT = 1e-2, 1e-8, 1e-1
+
+
+def _series(n: int, seed: int, dt: float = 1e-3) -> TimeSeriesData:
+    # constant-velocity model with known noise: random-walk velocity,
+    # position noise q_x and measurement noise r_x
+    rng = np.random.default_rng(seed)
+    v = np.cumsum(rng.normal(0.0, np.sqrt(Q_X_DOT), n))
+    p = np.cumsum(v * dt + rng.normal(0.0, np.sqrt(Q_X), n))
+    x = p + rng.normal(0.0, np.sqrt(R_X), n)
+    return TimeSeriesData(t=np.arange(n) * dt, x=x, dt_s=dt, source_path="")
+
+
+def _start(r_x: float, q_x: float, q_x_dot: float) -> TuningResult:
+    return TuningResult(
+        r_x=r_x,
+        sigma_x=float(np.sqrt(r_x)),
+        q_x_dot=q_x_dot,
+        dv_count=0,
+        q_x_user=q_x,
+        q_x_consistent=q_x,
+        q_xv_consistent=q_x,
+        steady_span=None,
+        ramp_span=None,
+    )
+
+
+@pytest.mark.parametrize("seed", [0, 1])
+@pytest.mark.parametrize("off", [1 / 30, 30.0])
+def test_tunes_to_true_noise_from_distant_start(seed, off):
+    # start 1.5 decades off in every parameter; 20k samples pin r_x to ~1%
+    # and q_x_dot to ~10% (q_x is not identifiable next to q_x_dot here)
+    start = _start(R_X * off, Q_X / off, Q_X_DOT / off)
+    res = auto_tune_kalman(_series(20_000, seed), start)
+    assert abs(np.log(res.r_x / R_X)) < np.log(1.05)
+    assert abs(np.log(res.q_x_dot / Q_X_DOT)) < np.log(1.25)
+    assert res.r_x != pytest.approx(start.r_x, rel=1e-3)
+
+
+def test_refines_past_the_start_point():
+    # the grid alone returned the start point's r_x; the finishing steps move
+    # it onto the likelihood's maximum
+    ts = _series(20_000, 0)
+    coarse = auto_tune_kalman(ts, polish=0)
+    res = auto_tune_kalman(ts)
+    assert res.log_likelihood >= coarse.log_likelihood
+    assert abs(np.log(res.r_x / R_X)) < abs(np.log(coarse.r_x / R_X))
@@ -0,0 +1,134 @@
+import numpy as np
+import pytest
+
+from ctrl.models import KalmanRunConfig
+from ctrl.services import kalman_service
+from ctrl.services import (
+    is_uniform_time_base,
+    run_batched_kalman,
+    run_chunked_kalman,
+    run_procedural_kalman,
+    run_steady_state_kalman,
+)
+
+CFG = KalmanRunConfig(r_x=1.0, q_x=1e-4, q_x_dot=1e-3)
+
+
+def _trace(n: int, offset: float, dt: float = 1e-3) -> tuple[np.ndarray, np.ndarray]:
+    # a week-long recording's worth of offset, stamped to the microsecond
+    t = np.round(offset + np.arange(n) * dt, 6)
+    x = 100.0 * np.sin(np.arange(n) * dt) + np.random.default_rng(0).normal(0.0, 1.0, n)
+    return t, x
+
+
+@pytest.fixture
+def tail_calls(monkeypatch):
+    # counts _steady_state_tail calls, which only the fast path makes
+    calls = []
+    tail = kalman_service._steady_state_tail
+
+    def spy(*args, **kwargs):
+        calls.append(args[3].shape)
+        return tail(*args, **kwargs)
+
+    monkeypatch.setattr(kalman_service, "_steady_state_tail", spy)
+    return calls
+
+
+@pytest.mark.parametrize("offset", [0.0, 600_000.0, 604_800.0])
+def test_rounded_timestamps_at_large_offset_are_uniform(offset):
+    t, _ = _trace(200_000, offset)
+    assert is_uniform_time_base(t)
+
+
+def test_jittered_timestamps_are_not_uniform():
+    t, _ = _trace(200_000, 600_000.0)
+    t += np.random.default_rng(1).normal(0.0, 1e-5, t.size)
+    assert not is_uniform_time_base(np.sort(t))
+
+
+def test_steady_state_takes_fast_path_at_large_offset(tail_calls):
+    t, x = _trace(200_000, 600_000.0)
+    y, y_dot = run_steady_state_kalman(t, x, CFG)
+    assert len(tail_calls) == 1
+
+    y_ref, y_dot_ref = run_procedural_kalman(t, x, CFG)
+    assert np.max(np.abs(y - y_ref)) <= 1e-9 * np.max(np.abs(x))
+    assert np.max(np.abs(y_dot - y_dot_ref)) <= 1e-9 * np.max(np.abs(y_dot_ref))
+
+
+def test_chunked_takes_fast_path_on_memmap_at_large_offset(tmp_path, tail_calls):
+    t, x = _trace(200_000, 600_000.0)
+    t_mm = np.memmap(tmp_path / "t.f64", dtype=float, mode="w+", shape=t.shape)
+    x_mm = np.memmap(tmp_path / "x.f64", dtype=float, mode="w+", shape=x.shape)
+    t_mm[:], x_mm[:] = t, x
+    t_mm.flush()
+    x_mm.flush()
+    t_mm = np.memmap(tmp_path / "t.f64", dtype=float, mode="r", shape=t.shape)
+    x_mm = np.memmap(tmp_path / "x.f64", dtype=float, mode="r", shape=x.shape)
+
+    y, y_dot = run_chunked_kalman(t_mm, x_mm, CFG, chunk=1 << 16)
+    assert len(tail_calls) > 1
+
+    y_ref, y_dot_ref = run_steady_state_kalman(t, x, CFG)
+    assert np.max(np.abs(y - y_ref)) <= 1e-9 * np.max(np.abs(x))
+    assert np.max(np.abs(y_dot - y_dot_ref)) <= 1e-9 * np.max(np.abs(y_dot_ref))
+
+
+def _configs(m: int) -> list[KalmanRunConfig]:
+    # noise ratios from fast filters to ones that take the whole trace to settle
+    rng = np.random.default_rng(2)
+    return [
+        KalmanRunConfig(
+            r_x=10 ** rng.uniform(-2, 1),
+            q_x=10 ** rng.uniform(-6, -2),
+            q_x_dot=10 ** rng.uniform(-5, -1),
+            p00=10 ** rng.uniform(-2, 3),
+            p11=10 ** rng.uniform(-2, 3),
+        )
+        for _ in range(m)
+    ]
+
+
+def test_batched_matches_procedural(monkeypatch):
+    settled = []
+    settle_row = kalman_service._settle_row
+
+    def spy(*args):
+        settled.append(settle_row(*args))
+        return settled[-1]
+
+    monkeypatch.setattr(kalman_service, "_settle_row", spy)
+
+    n = 10_000
+    t = np.arange(n) * 1e-3
+    x = 100.0 * np.sin(t) + np.random.default_rng(0).normal(0.0, 1.0, n)
+    cfgs = _configs(40)
+    Y, Y_dot = run_batched_kalman(t, x, cfgs)
+    # some rows finished in closed form, some of those only at the end
+    assert settled and n - 1 in settled
+
+    for i, cfg in enumerate(cfgs):
+        y, y_dot = run_procedural_kalman(t, x, cfg)
+        assert np.max(np.abs(Y[i] - y)) <= 1e-12 * np.max(np.abs(x))
+        assert np.max(np.abs(Y_dot[i] - y_dot)) <= 1e-11 * np.max(np.abs(y_dot))
+
+
+def test_batched_takes_fast_path_at_large_offset(monkeypatch):
+    calls = []
+    settling_rows = kalman_service._settling_rows
+
+    def spy(*args, **kwargs):
+        calls.append(args[2].size)
+        return settling_rows(*args, **kwargs)
+
+    monkeypatch.setattr(kalman_service, "_settling_rows", spy)
+
+    t, x = _trace(20_000, 600_000.0)
+    cfgs = _configs(10)
+    Y, _ = run_batched_kalman(t, x, cfgs)
+    assert calls == [len(cfgs)]
+
+    for i, cfg in enumerate(cfgs):
+        y, _ = run_procedural_kalman(t, x, cfg)
+        assert np.max(np.abs(Y[i] - y)) <= 1e-9 * np.max(np.abs(x))